@@ -0,0 +1,86 @@
+"""
+Approximate retrieval for large FAQ corpora
+Impact-ordered inverted index: candidates come from the highest-weight
+postings of the query's most important terms, then are re-ranked exactly.
+"""
+
+import numpy as np
+
+from retrieval import SparseRetriever, select_top_k
+
+
+class ApproximateRetriever(SparseRetriever):
+    """
+    Candidate prefilter + exact re-ranking over the normalized CSR matrix.
+
+    For every term, the FAQ rows containing it are stored in decreasing
+    order of their TF-IDF weight. A query only looks at the first
+    probe_depth rows of each of its max_query_terms most important terms
+    (ranked by query weight x best row weight). The union of those rows is
+    scored exactly and the top k returned.
+
+    probe_depth and max_query_terms are the recall/latency knob: larger
+    values find more of the exact top k at a higher cost. Queries with
+    fewer than k candidates, or with candidates covering a quarter of the
+    index or more, fall back to the exact scan.
+    """
+
+    def __init__(self, faq_vectors, top_k=5, normalized=False, probe_depth=2000,
+                 max_query_terms=8):
+        super().__init__(faq_vectors, top_k=top_k, normalized=normalized)
+        self.probe_depth = probe_depth
+        self.max_query_terms = max_query_terms
+        self._build_postings()
+
+    def _build_postings(self):
+        """Build impact-ordered postings: per term, rows sorted by weight descending"""
+        csc = self.matrix.tocsc()
+        n_terms = csc.shape[1]
+        lengths = np.diff(csc.indptr)
+        terms = np.repeat(np.arange(n_terms), lengths)
+
+        # Sort every posting list by weight descending, row ascending on ties
+        order = np.lexsort((csc.indices, -csc.data, terms))
+        self.postings_indptr = csc.indptr
+        self.postings_rows = csc.indices[order]
+
+        # The first posting of every term holds its largest weight
+        self.max_weights = np.zeros(n_terms)
+        non_empty = lengths > 0
+        self.max_weights[non_empty] = csc.data[order][csc.indptr[:-1][non_empty]]
+
+    def candidates(self, query_vector):
+        """Return the sorted candidate rows for a single sparse query vector"""
+        query_vector = query_vector.tocsr()
+        terms = query_vector.indices
+        if len(terms) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Most important query terms first
+        upper_bounds = query_vector.data * self.max_weights[terms]
+        terms = terms[np.argsort(-upper_bounds, kind='stable')][:self.max_query_terms]
+
+        starts = self.postings_indptr[terms]
+        ends = np.minimum(self.postings_indptr[terms + 1], starts + self.probe_depth)
+        rows = [self.postings_rows[start:end] for start, end in zip(starts, ends)]
+        return np.unique(np.concatenate(rows))
+
+    def search(self, query_vector, k=None):
+        """
+        Return (indices, similarities) of the approximate top k FAQ rows,
+        best first; similarities are exact for the returned rows
+        """
+        if k is None:
+            k = self.top_k
+        candidates = self.candidates(query_vector)
+        if len(candidates) < k or 4 * len(candidates) >= self.n_faqs:
+            return super().search(query_vector, k)
+
+        similarities = self.matrix[candidates] @ self.dense_query(query_vector)
+        selected = select_top_k(similarities, k)
+        return candidates[selected], similarities[selected]
+
+    def search_batch(self, query_vectors, k=None):
+        """Approximate search() for every row of a query matrix"""
+        query_vectors = query_vectors.tocsr()
+        return [self.search(query_vectors[row], k) for row in range(query_vectors.shape[0])]
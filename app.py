@@ -1,103 +1,328 @@
-"""
-Flask Web Application for FAQ Chatbot
-Provides a web interface for the chatbot with modern UI
-"""
-
-from flask import Flask, render_template, request, jsonify, session
-from chatbot import FAQChatbot
-import json
-import os
-import numpy as np
-
-app = Flask(__name__)
-app.secret_key = 'faq_chatbot_secret_key_2024'
-
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder for numpy data types"""
-    def default(self, obj):
-        if isinstance(obj, (np.integer, np.int32, np.int64)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float32, np.float64)):
-            return float(obj)
-        elif isinstance(obj, np.bool_):
-            return bool(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
-
-app.json_encoder = NumpyEncoder
-
-# Initialize chatbot
-try:
-    chatbot = FAQChatbot()
-    print("✅ Chatbot initialized successfully")
-except Exception as e:
-    print(f"❌ Error initializing chatbot: {e}")
-    import traceback
-    traceback.print_exc()
-    chatbot = None
-
-@app.route('/')
-def index():
-    """Main page with chat interface"""
-    return render_template('index.html')
-
-@app.route('/chat', methods=['POST'])
-def chat():
-    """Handle chat messages and return responses"""
-    try:
-        data = request.get_json()
-        user_message = data.get('message', '').strip()
-        
-        if not user_message:
-            return jsonify({
-                'success': False,
-                'message': 'Please enter a message'
-            })
-        
-        if chatbot is None:
-            return jsonify({
-                'success': False,
-                'message': 'Chatbot is not available. Please restart the server.'
-            })
-        
-        # Get chatbot response
-        response = chatbot.get_response(user_message)
-        
-        # Ensure all values are JSON serializable
-        processed_response = {
-            'success': True,
-            'response': str(response['answer']),
-            'confidence': float(response['confidence']),
-            'matched_question': str(response['matched_question']) if response['matched_question'] else None,
-            'is_match': bool(response['is_match']),
-            'debug_info': {
-                'processed_question': str(response['debug_info']['processed_question']),
-                'similarity_threshold': float(response['debug_info']['similarity_threshold']),
-                'top_matches': [
-                    {
-                        'question': str(match['question']),
-                        'similarity': float(match['similarity']),
-                        'index': int(match['index'])
-                    }
-                    for match in response['debug_info'].get('top_matches', [])
-                ]
-            }
-        }
-        
-        return jsonify(processed_response)
-        
-    except Exception as e:
-        print(f"Error in chat endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'message': f'Error processing message: {str(e)}'
-        })
-
-# ... [rest of your routes remain unchanged] ...
-
-if __name__ == '__main__':
-    os.makedirs('templates', exist_ok=True)
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+"""
+Flask Web Application for FAQ Chatbot
+Provides a web interface for the chatbot with modern UI
+"""
+
+from flask import Flask, Response, render_template, request, jsonify, session
+from flask.json.provider import DefaultJSONProvider
+from chatbot import format_response, VERBOSITY_LEVELS
+from faq_collections import CollectionManager, UnknownCollectionError, DEFAULT_COLLECTION
+from index_store import resolve_index_path
+from metrics import METRICS, REQUESTS, observe_stage
+import os
+import serialization
+import threading
+import time
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider serializing responses with serialization.dumps (orjson
+    when installed) straight to bytes. Flask 2.3 ignores app.json_encoder;
+    the provider is the supported way to replace the encoder.
+    """
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return serialization.dumps(obj).decode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serialization.dumps(obj), mimetype=self.mimetype)
+
+app = Flask(__name__)
+app.secret_key = 'faq_chatbot_secret_key_2024'
+app.json = FastJSONProvider(app)
+
+# Directory of the persisted FAQ index shared by all worker processes
+INDEX_PATH = resolve_index_path()
+
+# Chatbot is built by warm_up(), not at import time
+chatbot = None
+# Named FAQ collections; "default" is the chatbot above
+collections = None
+_warm_up_lock = threading.Lock()
+# Seconds before a failed warm-up is retried; requests in between fail fast
+WARM_UP_RETRY_SECONDS = 30
+_warm_up_failed_at = None
+
+def warm_up():
+    """
+    Build the chatbot and load its index.
+    Call it once per worker before serving traffic, e.g. from gunicorn's
+    post_worker_init hook; otherwise the first request warms up lazily.
+    """
+    global chatbot, collections, _warm_up_failed_at
+    with _warm_up_lock:
+        retry_due = (_warm_up_failed_at is None
+                     or time.monotonic() - _warm_up_failed_at >= WARM_UP_RETRY_SECONDS)
+        if chatbot is None and retry_due:
+            try:
+                manager = CollectionManager()
+                manager.register(DEFAULT_COLLECTION, index_path=INDEX_PATH, pinned=True)
+                chatbot = manager.get(DEFAULT_COLLECTION)
+                collections = manager
+                _warm_up_failed_at = None
+                print("✅ Chatbot initialized successfully")
+            except Exception as e:
+                print(f"❌ Error initializing chatbot: {e}")
+                import traceback
+                traceback.print_exc()
+                _warm_up_failed_at = time.monotonic()
+    return chatbot
+
+def get_chatbot():
+    """Return the chatbot, warming it up on first use"""
+    if chatbot is not None:
+        return chatbot
+    return warm_up()
+
+def get_collection_chatbot(name):
+    """
+    Return the chatbot of a named FAQ collection, or None if the server
+    failed to warm up. Raises UnknownCollectionError for unknown names.
+    """
+    if name == DEFAULT_COLLECTION or get_chatbot() is None:
+        return get_chatbot()
+    return collections.get(name)
+
+def _unknown_collection(endpoint, name):
+    REQUESTS.inc(endpoint, 'unknown_collection')
+    return jsonify({
+        'success': False,
+        'message': f"Unknown FAQ collection '{name}'"
+    }), 404
+
+def _invalid_verbosity(endpoint, verbosity):
+    REQUESTS.inc(endpoint, 'invalid')
+    return jsonify({
+        'success': False,
+        'message': f"Unknown verbosity '{verbosity}', expected one of {', '.join(VERBOSITY_LEVELS)}"
+    })
+
+# Maximum number of messages accepted by /chat/batch
+MAX_BATCH_SIZE = 100
+
+@app.route('/')
+def index():
+    """Main page with chat interface"""
+    return render_template('index.html')
+
+@app.route('/chat', methods=['POST'])
+def chat():
+    """Handle chat messages and return responses"""
+    try:
+        data = request.get_json()
+        collection = data.get('collection', DEFAULT_COLLECTION)
+        try:
+            chatbot = get_collection_chatbot(collection)
+        except UnknownCollectionError:
+            return _unknown_collection('/chat', collection)
+        verbosity = data.get('verbosity', 'full')
+        if verbosity not in VERBOSITY_LEVELS:
+            return _invalid_verbosity('/chat', verbosity)
+        user_message = data.get('message', '')
+        if not isinstance(user_message, str):
+            REQUESTS.inc('/chat', 'invalid')
+            return jsonify({
+                'success': False,
+                'message': 'The message must be a string'
+            }), 400
+        user_message = user_message.strip()
+        
+        if not user_message:
+            REQUESTS.inc('/chat', 'invalid')
+            return jsonify({
+                'success': False,
+                'message': 'Please enter a message'
+            })
+        
+        if chatbot is None:
+            REQUESTS.inc('/chat', 'unavailable')
+            return jsonify({
+                'success': False,
+                'message': 'Chatbot is not available. Please restart the server.'
+            })
+        
+        # Get chatbot response
+        response = chatbot.get_response(user_message)
+        
+        start = METRICS.start_timer()
+        processed_response = jsonify(format_response(response, verbosity))
+        observe_stage('serialize', start)
+        
+        REQUESTS.inc('/chat', 'success')
+        return processed_response
+        
+    except Exception as e:
+        REQUESTS.inc('/chat', 'error')
+        print(f"Error in chat endpoint: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'Error processing message: {str(e)}'
+        })
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Handle a batch of chat messages and return one response per message"""
+    try:
+        data = request.get_json()
+        collection = data.get('collection', DEFAULT_COLLECTION)
+        try:
+            chatbot = get_collection_chatbot(collection)
+        except UnknownCollectionError:
+            return _unknown_collection('/chat/batch', collection)
+        verbosity = data.get('verbosity', 'full')
+        if verbosity not in VERBOSITY_LEVELS:
+            return _invalid_verbosity('/chat/batch', verbosity)
+        messages = data.get('messages', [])
+        
+        if not isinstance(messages, list) or not messages:
+            REQUESTS.inc('/chat/batch', 'invalid')
+            return jsonify({
+                'success': False,
+                'message': 'Please send a non-empty list of messages'
+            })
+        
+        if len(messages) > MAX_BATCH_SIZE:
+            REQUESTS.inc('/chat/batch', 'invalid')
+            return jsonify({
+                'success': False,
+                'message': f'A batch can contain at most {MAX_BATCH_SIZE} messages'
+            })
+        
+        for position, message in enumerate(messages):
+            if not isinstance(message, str) or not message.strip():
+                REQUESTS.inc('/chat/batch', 'invalid')
+                return jsonify({
+                    'success': False,
+                    'message': f'Message {position} must be a non-empty string'
+                }), 400
+        
+        if chatbot is None:
+            REQUESTS.inc('/chat/batch', 'unavailable')
+            return jsonify({
+                'success': False,
+                'message': 'Chatbot is not available. Please restart the server.'
+            })
+        
+        # Match all messages in one batched pass
+        responses = chatbot.get_responses([message.strip() for message in messages])
+        
+        start = METRICS.start_timer()
+        processed_response = jsonify({
+            'success': True,
+            'responses': [format_response(response, verbosity) for response in responses]
+        })
+        observe_stage('batch_serialize', start)
+        
+        REQUESTS.inc('/chat/batch', 'success')
+        return processed_response
+        
+    except Exception as e:
+        REQUESTS.inc('/chat/batch', 'error')
+        print(f"Error in batch chat endpoint: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'Error processing messages: {str(e)}'
+        })
+
+@app.route('/cache/stats')
+def cache_stats():
+    """Return response cache counters for sizing the cache"""
+    collection = request.args.get('collection', DEFAULT_COLLECTION)
+    try:
+        chatbot = get_collection_chatbot(collection)
+    except UnknownCollectionError:
+        return _unknown_collection('/cache/stats', collection)
+    if chatbot is None:
+        return jsonify({
+            'success': False,
+            'message': 'Chatbot is not available. Please restart the server.'
+        })
+    
+    return jsonify({
+        'success': True,
+        'cache': chatbot.cache_stats()
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Expose request, stage latency and cache metrics in Prometheus text format"""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+def _cache_metrics():
+    """Read the response cache counters at scrape time"""
+    if chatbot is None:
+        return []
+    stats = chatbot.cache_stats()
+    return [
+        ('faq_response_cache_hits_total', 'counter', 'Response cache hits', stats['hits']),
+        ('faq_response_cache_misses_total', 'counter', 'Response cache misses', stats['misses']),
+        ('faq_response_cache_evictions_total', 'counter', 'Response cache evictions', stats['evictions']),
+        ('faq_response_cache_size', 'gauge', 'Entries in the response cache', stats['size'])
+    ] + _preprocess_metrics(chatbot.nlp_processor.preprocess_stats()) + _spelling_metrics(
+        chatbot.nlp_processor.spelling_stats()
+    )
+
+def _preprocess_metrics(stats):
+    memo = stats['memo']
+    return [
+        ('faq_preprocess_memo_hits_total', 'counter', 'Preprocess memo hits', memo['hits']),
+        ('faq_preprocess_memo_misses_total', 'counter', 'Preprocess memo misses', memo['misses']),
+        ('faq_preprocess_memo_evictions_total', 'counter', 'Preprocess memo evictions', memo['evictions']),
+        ('faq_token_cache_misses_total', 'counter', 'Token cache misses', stats['token_cache']['misses']),
+        ('faq_token_cache_evictions_total', 'counter', 'Token cache evictions', stats['token_cache']['evictions']),
+        ('faq_token_cache_size', 'gauge', 'Distinct tokens in the token cache', stats['token_cache']['size'])
+    ]
+
+def _spelling_metrics(stats):
+    if not stats['enabled']:
+        return []
+    return [
+        ('faq_spelling_lookups_total', 'counter', 'Out-of-vocabulary query words looked up', stats['lookups']),
+        ('faq_spelling_corrections_total', 'counter', 'Query words replaced by spelling correction',
+         stats['corrections']),
+        ('faq_spelling_corrected_questions_total', 'counter', 'Questions with a corrected word',
+         stats['corrected_questions'])
+    ]
+
+METRICS.register_collector(_cache_metrics)
+
+@app.route('/collections')
+def collection_stats():
+    """List the FAQ collections and the memory held by the loaded ones"""
+    if get_chatbot() is None:
+        return jsonify({
+            'success': False,
+            'message': 'Chatbot is not available. Please restart the server.'
+        })
+    
+    return jsonify({
+        'success': True,
+        'collections': collections.names(),
+        **collections.stats()
+    })
+
+def _collection_metrics():
+    """Read the collection manager counters at scrape time"""
+    if collections is None:
+        return []
+    stats = collections.stats()
+    return [
+        ('faq_collections_loaded', 'gauge', 'FAQ collections in memory', len(stats['loaded'])),
+        ('faq_collections_memory_bytes', 'gauge', 'Estimated bytes held by loaded FAQ collections', stats['memory_bytes']),
+        ('faq_collection_loads_total', 'counter', 'FAQ collections loaded', stats['loads']),
+        ('faq_collection_evictions_total', 'counter', 'FAQ collections evicted to stay within the memory budget', stats['evictions'])
+    ]
+
+METRICS.register_collector(_collection_metrics)
+
+if __name__ == '__main__':
+    os.makedirs('templates', exist_ok=True)
+    warm_up()
+    # The debugger runs arbitrary code from the browser; only enable it locally
+    app.run(debug=os.environ.get('FAQ_DEBUG') == '1', host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""
+Async ASGI entry point for FAQ Chatbot
+Serves the /chat JSON API from an event loop and runs matching in a pool
+of worker processes, each holding its own FAQ collections.
+
+Run with uvicorn:
+uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+or: python asgi_app.py
+
+Configuration (environment variables):
+FAQ_WORKERS           number of matching processes (default: CPU count)
+FAQ_MAX_PENDING       requests queued or running before new ones get 503 (default: 8 per worker)
+FAQ_REQUEST_TIMEOUT   seconds before a request gets 504 (default: 5)
+FAQ_SHUTDOWN_GRACE    seconds to let in-flight requests finish on shutdown (default: 10)
+FAQ_INDEX_PATH        persisted index shared by the workers (see index_store.py)
+FAQ_COLLECTIONS_PATH, FAQ_COLLECTIONS_MEMORY_MB   named FAQ collections (see faq_collections.py)
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from chatbot import VERBOSITY_LEVELS
+from index_store import resolve_index_path
+from serialization import dumps
+
+# CollectionManager of the current worker process, created by _init_worker
+_worker_collections = None
+
+
+def _init_worker(index_path):
+    """Build the worker's collections and load the default one from the shared persisted index"""
+    global _worker_collections
+    from faq_collections import CollectionManager, DEFAULT_COLLECTION
+    collections = CollectionManager()
+    collections.register(DEFAULT_COLLECTION, index_path=index_path, pinned=True)
+    collections.get(DEFAULT_COLLECTION)
+    _worker_collections = collections
+
+
+def _worker_get_response(message, collection, verbosity='full'):
+    """
+    Match one message against a collection in a worker process.
+    Returns (status, payload) following the /chat contract.
+    """
+    from chatbot import format_response
+    from faq_collections import UnknownCollectionError
+    try:
+        chatbot = _worker_collections.get(collection)
+    except UnknownCollectionError:
+        return 404, {'success': False, 'message': f"Unknown FAQ collection '{collection}'"}
+    return 200, format_response(chatbot.get_response(message), verbosity)
+
+
+def _worker_ping():
+    """Return once the worker's default collection is ready"""
+    return _worker_collections is not None
+
+
+class AsyncChatApp:
+    """
+    Minimal ASGI application with the same /chat contract as app.py.
+    Requests beyond max_pending are rejected with 503 instead of queuing
+    without bound, and a request that does not finish within
+    request_timeout seconds gets 504. A job counts against max_pending
+    until the worker is done with it, even after its request timed out.
+    If a worker dies the pool is replaced and the request gets 503.
+    """
+
+    def __init__(self, workers=None, max_pending=None, request_timeout=5.0,
+                 shutdown_grace=10.0, index_path=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 8 * self.workers
+        self.request_timeout = request_timeout
+        self.shutdown_grace = shutdown_grace
+        self.index_path = index_path or resolve_index_path()
+        self.pool = None
+        self._pending = 0
+        self._closing = False
+        self._idle = None
+
+    @classmethod
+    def from_env(cls):
+        """Create the app from FAQ_* environment variables"""
+        return cls(
+            workers=int(os.environ.get('FAQ_WORKERS', 0)) or None,
+            max_pending=int(os.environ.get('FAQ_MAX_PENDING', 0)) or None,
+            request_timeout=float(os.environ.get('FAQ_REQUEST_TIMEOUT', 5.0)),
+            shutdown_grace=float(os.environ.get('FAQ_SHUTDOWN_GRACE', 10.0))
+        )
+
+    def _start_pool(self):
+        # Forking a process that runs an event loop is unsafe, so spawn workers
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.index_path,)
+        )
+
+    def _replace_broken_pool(self, pool):
+        """Swap a pool whose worker died for a fresh one, once per broken pool"""
+        if self.pool is not pool or self._closing:
+            return
+        self.pool = self._start_pool()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self):
+        """Free the max_pending slot of a finished job; runs on the event loop"""
+        self._pending -= 1
+        if self._pending == 0:
+            self._idle.set()
+
+    def _release_from(self, loop):
+        """Done callback of a job; runs in the executor's thread"""
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # The event loop already closed after shutdown
+            pass
+
+    async def startup(self):
+        """Start the worker pool and warm up the workers before serving"""
+        self.pool = self._start_pool()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closing = False
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.pool, _worker_ping) for _ in range(self.workers)
+        ])
+
+    async def shutdown(self):
+        """Stop accepting requests, let in-flight ones finish, then stop the pool"""
+        self._closing = True
+        if self._idle is not None:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=self.shutdown_grace)
+            except asyncio.TimeoutError:
+                pass
+        if self.pool is not None:
+            pool, self.pool = self.pool, None
+            # Joining the workers blocks, so keep it off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: pool.shutdown(wait=True, cancel_futures=True)
+            )
+
+    async def get_response(self, message, collection='default', verbosity='full'):
+        """
+        Match a message against a FAQ collection in the worker pool.
+        Returns (status, payload) following the /chat contract;
+        verbosity='slim' leaves out debug_info.
+        """
+        if self._closing or self.pool is None:
+            return 503, {'success': False, 'message': 'Server is shutting down. Please try again.'}
+
+        if self._pending >= self.max_pending:
+            return 503, {'success': False, 'message': 'Server is busy. Please try again.'}
+
+        pool = self.pool
+        try:
+            job = pool.submit(_worker_get_response, message, collection, verbosity)
+        except BrokenProcessPool:
+            self._replace_broken_pool(pool)
+            return 503, {'success': False, 'message': 'Worker restarted. Please try again.'}
+
+        # The slot is held until the worker finishes, not until the request
+        # gives up waiting, so timed-out jobs still count against max_pending
+        self._pending += 1
+        self._idle.clear()
+        loop = asyncio.get_running_loop()
+        job.add_done_callback(lambda _: self._release_from(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout=self.request_timeout)
+        except asyncio.TimeoutError:
+            return 504, {'success': False, 'message': 'Request timed out. Please try again.'}
+        except BrokenProcessPool:
+            self._replace_broken_pool(pool)
+            return 503, {'success': False, 'message': 'Worker restarted. Please try again.'}
+        except Exception as e:
+            return 200, {'success': False, 'message': f'Error processing message: {str(e)}'}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            event = await receive()
+            if event['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif event['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        if scope['path'] != '/chat':
+            await _send_json(send, 404, {'success': False, 'message': 'Not found'})
+            return
+        if scope['method'] != 'POST':
+            await _send_json(send, 405, {'success': False, 'message': 'Method not allowed'})
+            return
+
+        body = b''
+        while True:
+            event = await receive()
+            body += event.get('body', b'')
+            if not event.get('more_body', False):
+                break
+
+        try:
+            data = json.loads(body or b'{}')
+            user_message = data.get('message', '')
+            collection = str(data.get('collection', 'default'))
+            verbosity = data.get('verbosity', 'full')
+        except (ValueError, AttributeError):
+            await _send_json(send, 400, {'success': False, 'message': 'Invalid JSON body'})
+            return
+
+        if verbosity not in VERBOSITY_LEVELS:
+            await _send_json(send, 400, {'success': False, 'message': f"Unknown verbosity '{verbosity}'"})
+            return
+
+        if not isinstance(user_message, str):
+            await _send_json(send, 400, {'success': False, 'message': 'The message must be a string'})
+            return
+        user_message = user_message.strip()
+        if not user_message:
+            await _send_json(send, 200, {'success': False, 'message': 'Please enter a message'})
+            return
+
+        status, payload = await self.get_response(user_message, collection, verbosity)
+        await _send_json(send, status, payload)
+
+
+async def _send_json(send, status, payload):
+    body = dumps(payload)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii'))
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+app = AsyncChatApp.from_env()
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is required to serve the ASGI app: pip install uvicorn")
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), lifespan='on')
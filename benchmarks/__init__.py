@@ -0,0 +1,5 @@
+"""
+Benchmarks for the FAQ Chatbot
+Run individual benchmarks from the project root, e.g.
+python -m benchmarks.bench_get_response
+"""
@@ -0,0 +1,75 @@
+"""
+Benchmark approximate retrieval against the exact scorer
+Reports recall@k (share of the exact top k found) and latency of the
+ApproximateRetriever for several probe depths.
+
+Usage: python -m benchmarks.bench_ann [n_faqs] [n_queries] [k]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from nlp_processor import NLPProcessor
+from ann_index import ApproximateRetriever
+from benchmarks.synthetic import generate_faqs, generate_queries
+
+PROBE_DEPTHS = (250, 1000, 4000, 16000)
+
+
+def time_search(retriever, query_vectors, k):
+    """Return (per-query result indices, latencies in ms)"""
+    results, latencies = [], []
+    for i in range(query_vectors.shape[0]):
+        start = time.perf_counter()
+        indices, _ = retriever.search(query_vectors[i], k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(indices)
+    return results, np.array(latencies)
+
+
+def recall_at_k(exact_results, approximate_results, exact_scores):
+    """
+    Share of the exact top k whose similarity is reached by the approximate
+    top k; ties at the k-th score count as found
+    """
+    found = 0
+    total = 0
+    for exact, approximate, scores in zip(exact_results, approximate_results, exact_scores):
+        approximate_scores = np.sort(scores[approximate])[::-1]
+        expected = np.sort(scores[exact])[::-1]
+        found += int(np.sum(approximate_scores >= expected - 1e-12))
+        total += len(exact)
+    return found / total if total else 1.0
+
+
+def main(n_faqs=1000000, n_queries=200, k=5):
+    print(f"Training on {n_faqs} synthetic FAQs...")
+    nlp = NLPProcessor(top_k=k)
+    nlp.train_vectorizer([faq["question"] for faq in generate_faqs(n_faqs)])
+    queries = generate_queries(n_queries, n_faqs=n_faqs)
+    query_vectors = nlp.vectorizer.transform([nlp.preprocess_text(q) for q in queries])
+
+    exact = nlp.retriever
+    exact_scores = [exact.score(query_vectors[i]) for i in range(n_queries)]
+    exact_results, latencies = time_search(exact, query_vectors, k)
+    print(f"{'exact':<22} recall@{k} 1.000   p50 {np.percentile(latencies, 50):7.3f} ms   "
+          f"p99 {np.percentile(latencies, 99):7.3f} ms")
+
+    start = time.perf_counter()
+    approximate = ApproximateRetriever(exact.matrix, top_k=k, normalized=True)
+    print(f"Built impact-ordered postings in {time.perf_counter() - start:.2f} s")
+
+    for depth in PROBE_DEPTHS:
+        approximate.probe_depth = depth
+        results, latencies = time_search(approximate, query_vectors, k)
+        recall = recall_at_k(exact_results, results, exact_scores)
+        print(f"{f'probe_depth={depth}':<22} recall@{k} {recall:.3f}   "
+              f"p50 {np.percentile(latencies, 50):7.3f} ms   "
+              f"p99 {np.percentile(latencies, 99):7.3f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    main(*args)
@@ -0,0 +1,54 @@
+"""
+Benchmark index build time against the number of preprocessing workers
+Times preprocess_corpus and train_vectorizer for n_jobs = 1, 2, 4, ...
+up to the CPU count and checks that every run gives the serial output.
+
+Usage: python -m benchmarks.bench_build [n_faqs] [max_jobs]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from nlp_processor import NLPProcessor
+from benchmarks.synthetic import generate_faqs
+
+
+def main(n_faqs=500000, max_jobs=None):
+    questions = [faq["question"] for faq in generate_faqs(n_faqs)]
+    max_jobs = max_jobs or os.cpu_count() or 1
+    job_counts = sorted({1, max_jobs} | {2 ** i for i in range(1, max_jobs.bit_length()) if 2 ** i <= max_jobs})
+    print(f"Building the index for {n_faqs} synthetic FAQs on {os.cpu_count()} CPUs")
+
+    reference_processed = None
+    reference_vectors = None
+    baseline = None
+    for n_jobs in job_counts:
+        nlp = NLPProcessor(n_jobs=n_jobs)
+
+        start = time.perf_counter()
+        processed = nlp.preprocess_corpus(questions)
+        preprocess_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        faq_vectors = nlp.train_vectorizer(questions)
+        build_seconds = time.perf_counter() - start
+
+        if reference_processed is None:
+            reference_processed, reference_vectors = processed, faq_vectors
+            baseline = build_seconds
+        identical = (processed == reference_processed
+                     and np.array_equal(faq_vectors.indptr, reference_vectors.indptr)
+                     and np.array_equal(faq_vectors.indices, reference_vectors.indices)
+                     and np.array_equal(faq_vectors.data, reference_vectors.data))
+
+        print(f"n_jobs={n_jobs:<3} preprocess {preprocess_seconds:7.2f} s   "
+              f"build {build_seconds:7.2f} s   speedup {baseline / build_seconds:5.2f}x   "
+              f"identical {identical}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,62 @@
+"""
+Benchmark compact index storage
+Builds the same synthetic corpus with the default float64 index and with
+compact=True, then reports bytes per FAQ, query latency and how many
+top-1 matches stay unchanged on a benchmark query set.
+
+Usage: python -m benchmarks.bench_compact [n_faqs] [n_queries]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from compact_index import index_nbytes
+from nlp_processor import NLPProcessor
+from benchmarks.synthetic import generate_faqs, generate_paraphrases, generate_queries
+
+
+def top1(nlp, queries):
+    """Return (top-1 indices, top-1 similarities, per-query latencies in ms)"""
+    indices, similarities, latencies = [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = nlp.match(query, threshold=0.0, top_k=1)
+        latencies.append((time.perf_counter() - start) * 1000)
+        indices.append(result['index'])
+        similarities.append(result['similarity'])
+    return np.array(indices), np.array(similarities, dtype=np.float64), np.array(latencies)
+
+
+def main(n_faqs=200000, n_queries=2000):
+    faqs = generate_faqs(n_faqs)
+    questions = [faq["question"] for faq in faqs]
+    queries = generate_queries(n_queries // 2, n_faqs=n_faqs)
+    queries += [query for query, _ in generate_paraphrases(faqs, n_queries - len(queries))]
+    print(f"{n_faqs} synthetic FAQs, {len(queries)} benchmark queries")
+
+    results = {}
+    for name, compact in [("float64 + dict", False), ("compact", True)]:
+        nlp = NLPProcessor(compact=compact, preprocess_cache_size=0)
+        nlp.train_vectorizer(questions)
+        sizes = index_nbytes(nlp)
+        indices, similarities, latencies = top1(nlp, queries)
+        results[name] = (indices, similarities)
+        print(f"{name:<15} matrix {sizes['matrix_bytes'] / 2 ** 20:8.2f} MiB   "
+              f"vocabulary {sizes['vocabulary_bytes'] / 2 ** 10:8.1f} KiB   "
+              f"{sizes['bytes_per_faq']:6.1f} bytes/FAQ   "
+              f"p50 {np.percentile(latencies, 50):6.3f} ms")
+
+    (base_indices, base_similarities), (indices, similarities) = results.values()
+    same = base_indices == indices
+    # A changed index only counts as a changed answer if it is not a tie
+    ties = np.abs(base_similarities - similarities) <= 1e-6
+    print(f"top-1 unchanged {same.mean():.2%}   changed only among tied scores "
+          f"{np.sum(~same & ties)}   changed {np.sum(~same & ~ties)}   "
+          f"max similarity error {np.abs(base_similarities - similarities).max():.2e}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
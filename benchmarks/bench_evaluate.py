@@ -0,0 +1,53 @@
+"""
+Benchmark offline evaluation
+Scores labeled synthetic queries (paraphrases labeled with their source
+FAQ plus unrelated queries labeled "no match") with the batched evaluator
+and, for a sample, with one match() call per query, and reports queries
+per second and the recommended threshold.
+
+Usage: python -m benchmarks.bench_evaluate [n_faqs] [n_queries]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from evaluate import evaluate
+from nlp_processor import NLPProcessor
+from benchmarks.synthetic import generate_faqs, generate_paraphrases, generate_queries
+
+
+def main(n_faqs=10000, n_queries=100000):
+    faqs = generate_faqs(n_faqs)
+    nlp = NLPProcessor(preprocess_cache_size=0)
+    nlp.train_vectorizer([faq["question"] for faq in faqs])
+
+    pairs = generate_paraphrases(faqs, n_queries * 4 // 5)
+    unrelated = generate_queries(n_queries - len(pairs), n_faqs=n_faqs)
+    queries = [query for query, _ in pairs] + unrelated
+    expected = np.array([faq_index for _, faq_index in pairs] + [-1] * len(unrelated))
+    print(f"{n_faqs} synthetic FAQs, {len(queries)} labeled queries")
+
+    sample = queries[:1000]
+    start = time.perf_counter()
+    for query in sample:
+        nlp.match(query, top_k=1)
+    per_query = (time.perf_counter() - start) / len(sample)
+    print(f"match() per query       {1 / per_query:10,.0f} queries/s "
+          f"(~{per_query * len(queries):.1f} s for all)")
+
+    start = time.perf_counter()
+    report = evaluate(nlp, queries, expected)
+    seconds = time.perf_counter() - start
+    print(f"batched evaluation      {len(queries) / seconds:10,.0f} queries/s ({seconds:.1f} s, "
+          f"101 thresholds)")
+    recommended = report['recommended']
+    print(f"recommended threshold {report['recommended_threshold']:.2f}: "
+          f"precision {recommended['precision']:.3f} recall {recommended['recall']:.3f} "
+          f"f1 {recommended['f1']:.3f} accuracy {recommended['accuracy']:.3f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,58 @@
+"""
+Benchmark per-request latency of FAQChatbot.get_response
+Compares the legacy two-pass pipeline (find_best_match followed by
+get_similarity_analysis) with the single-pass match() pipeline.
+
+Usage: python -m benchmarks.bench_get_response [n_faqs] [n_queries]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from chatbot import FAQChatbot
+from benchmarks.synthetic import generate_faqs, generate_queries
+
+
+def _latencies(func, queries):
+    """Return per-call latencies in milliseconds"""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def _report(name, latencies):
+    print(f"{name:<12} mean {latencies.mean():7.3f} ms   "
+          f"p50 {np.percentile(latencies, 50):7.3f} ms   "
+          f"p95 {np.percentile(latencies, 95):7.3f} ms")
+
+
+def main(n_faqs=10000, n_queries=500):
+    print(f"Building chatbot over {n_faqs} synthetic FAQs...")
+    chatbot = FAQChatbot(faqs=generate_faqs(n_faqs), cache_size=0)
+    nlp = chatbot.nlp_processor
+    queries = generate_queries(n_queries, n_faqs=n_faqs)
+
+    def two_pass(query):
+        nlp.find_best_match(query, threshold=chatbot.similarity_threshold)
+        nlp.get_similarity_analysis(query)
+
+    # Warm up both paths once
+    two_pass(queries[0])
+    chatbot.get_response(queries[0])
+
+    before = _latencies(two_pass, queries)
+    after = _latencies(chatbot.get_response, queries)
+
+    _report("two-pass", before)
+    _report("single-pass", after)
+    print(f"Speedup (mean): {before.mean() / after.mean():.2f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
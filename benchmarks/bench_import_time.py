@@ -0,0 +1,80 @@
+"""
+Benchmark process startup import time
+Runs 'python -X importtime -c "import <module>"' in a fresh interpreter
+for each entry point and reports the cumulative import time, the slowest
+top-level imports and whether heavy libraries were loaded at import.
+
+Usage: python -m benchmarks.bench_import_time [--budget-ms 500] [module ...]
+Exits non-zero when an import exceeds the budget.
+"""
+
+import argparse
+import subprocess
+import sys
+
+DEFAULT_MODULES = ['nlp_processor', 'chatbot', 'app', 'asgi_app']
+
+# Libraries that should only load on first use, not at import
+HEAVY_MODULES = ['sklearn', 'scipy', 'nltk', 'textblob', 'numpy']
+
+
+def import_profile(module):
+    """
+    Return (total_us, [(cumulative_us, name)] of the module's direct
+    imports, heavy modules loaded) for importing module in a fresh process
+    """
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True
+    )
+
+    # -X importtime prints each import after its own imports; nesting is
+    # shown by two extra spaces of indentation per level
+    total_us = 0
+    children = []
+    pending = []
+    for line in result.stderr.splitlines():
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        cumulative_us = int(fields[1])
+        name = fields[2][1:]
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        if depth == 0:
+            if name == module:
+                total_us = cumulative_us
+                children = pending
+            pending = []
+        elif depth == 1:
+            pending.append((cumulative_us, name.strip()))
+
+    heavy = [name for name in result.stdout.strip().split(',') if name]
+    return total_us, sorted(children, reverse=True), heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="fail if importing a module takes longer than this")
+    parser.add_argument('--top', type=int, default=5, help="slowest top-level imports to show")
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    for module in args.modules:
+        total_us, top_level, heavy = import_profile(module)
+        print(f"{module:<15} {total_us / 1000:8.1f} ms   heavy modules loaded: {', '.join(heavy) or 'none'}")
+        for cumulative_us, name in top_level[:args.top]:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+        if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+            print(f"    over budget of {args.budget_ms:.0f} ms")
+            over_budget = True
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Benchmark chatbot cold start with and without the persisted index
+Compares training the TF-IDF vectorizer from scratch with memory-mapping
+a saved index built by index_store.
+
+Usage: python -m benchmarks.bench_index_load [n_faqs]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from chatbot import FAQChatbot
+from benchmarks.synthetic import generate_faqs
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(n_faqs=50000):
+    faqs = generate_faqs(n_faqs)
+    index_dir = os.path.join(tempfile.mkdtemp(), "faq_index")
+
+    train_time = _timed(lambda: FAQChatbot(faqs=faqs))
+    build_time = _timed(lambda: FAQChatbot(faqs=faqs, index_path=index_dir))
+    load_time = _timed(lambda: FAQChatbot(faqs=faqs, index_path=index_dir))
+
+    print(f"FAQs:                  {n_faqs}")
+    print(f"Train from scratch:    {train_time * 1000:10.1f} ms")
+    print(f"Build + save index:    {build_time * 1000:10.1f} ms")
+    print(f"Memory-map saved index:{load_time * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:2]]
+    main(*args)
@@ -0,0 +1,65 @@
+"""
+Benchmark hybrid keyword + TF-IDF scoring
+Builds the same synthetic corpus with scoring='tfidf' and scoring='hybrid',
+then reports build time, query latency and top-1 accuracy on paraphrases
+of the FAQ questions.
+
+The 'textblob' extractor needs the TextBlob tagger corpora; 'ngrams' uses
+the question's words and word pairs instead.
+
+Usage: python -m benchmarks.bench_keywords [n_faqs] [n_queries] [textblob|ngrams] [keyword_weight]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from nlp_processor import NLPProcessor
+from benchmarks.synthetic import generate_faqs, generate_paraphrases
+
+
+def ngram_keywords(text):
+    """Words and word pairs of text, a tagger-free stand-in for extract_keywords()"""
+    words = text.rstrip('?').split()
+    return words + [' '.join(pair) for pair in zip(words, words[1:])]
+
+
+def evaluate(nlp, pairs):
+    """Return (top-1 accuracy, per-query latencies in ms)"""
+    hits, latencies = 0, []
+    for query, faq_index in pairs:
+        start = time.perf_counter()
+        result = nlp.match(query, threshold=0.0, top_k=1)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += result['index'] == faq_index
+    return hits / len(pairs), np.array(latencies)
+
+
+def main(n_faqs=50000, n_queries=2000, extractor='ngrams', keyword_weight=0.3):
+    faqs = generate_faqs(n_faqs)
+    questions = [faq["question"] for faq in faqs]
+    pairs = generate_paraphrases(faqs, n_queries)
+    print(f"{n_faqs} synthetic FAQs, {len(pairs)} paraphrased queries, {extractor} keywords")
+
+    keyword_extractor = ngram_keywords if extractor == 'ngrams' else None
+    for scoring in ('tfidf', 'hybrid'):
+        nlp = NLPProcessor(scoring=scoring, keyword_weight=keyword_weight,
+                           keyword_extractor=keyword_extractor, preprocess_cache_size=0)
+        start = time.perf_counter()
+        nlp.train_vectorizer(questions)
+        build = time.perf_counter() - start
+        accuracy, latencies = evaluate(nlp, pairs)
+        print(f"{scoring:<7} build {build:7.2f} s   top-1 accuracy {accuracy:.2%}   "
+              f"p50 {np.percentile(latencies, 50):6.3f} ms   "
+              f"p99 {np.percentile(latencies, 99):6.3f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 50000,
+        int(args[1]) if len(args) > 1 else 2000,
+        args[2] if len(args) > 2 else 'ngrams',
+        float(args[3]) if len(args) > 3 else 0.3
+    )
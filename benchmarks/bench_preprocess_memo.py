@@ -0,0 +1,81 @@
+"""
+Benchmark memoized preprocessing on replayed query logs
+Replays a query log (one query per line) or, without one, synthetic
+traffic in which a few phrasings make up most requests, and reports
+preprocess_text and find_best_match CPU time and allocations with the
+memos off, with the token cache only and with both memos.
+
+Usage: python -m benchmarks.bench_preprocess_memo [n_requests] [query_log]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from nlp_processor import NLPProcessor
+from benchmarks.synthetic import generate_faqs, generate_queries
+
+CONFIGURATIONS = [
+    ("no memo", {'preprocess_cache_size': 0, 'token_cache_size': 0}),
+    ("token cache", {'preprocess_cache_size': 0}),
+    ("token + memo", {}),
+]
+
+
+def replay_log(n_requests, seed=0):
+    """Zipf-like synthetic traffic: a long tail of phrasings, most requests hit the head"""
+    rng = random.Random(seed)
+    phrasings = generate_queries(5000, seed=seed)
+    weights = [1 / (rank + 1) for rank in range(len(phrasings))]
+    return rng.choices(phrasings, weights=weights, k=n_requests)
+
+
+def measure(func, requests):
+    """
+    Return (CPU microseconds per request, peak KiB allocated per request);
+    allocations are sampled on every 10th request as tracing is slow
+    """
+    start = time.process_time()
+    for request in requests:
+        func(request)
+    cpu = (time.process_time() - start) / len(requests) * 1e6
+
+    sample = requests[::10]
+    allocated = 0
+    tracemalloc.start()
+    for request in sample:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func(request)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+    return cpu, allocated / len(sample) / 1024
+
+
+def main(n_requests=50000, query_log=None):
+    if query_log:
+        with open(query_log, encoding='utf-8') as f:
+            requests = [line.strip() for line in f if line.strip()][:n_requests]
+    else:
+        requests = replay_log(n_requests)
+    print(f"Replaying {len(requests)} requests ({len(set(requests))} distinct)")
+    faq_questions = [faq["question"] for faq in generate_faqs(1000)]
+
+    for name, options in CONFIGURATIONS:
+        nlp = NLPProcessor(**options)
+        preprocess_cpu, preprocess_kib = measure(nlp.preprocess_text, requests)
+
+        nlp = NLPProcessor(**options)
+        nlp.train_vectorizer(faq_questions)
+        match_cpu, match_kib = measure(nlp.find_best_match, requests)
+
+        print(f"{name:<13} preprocess_text {preprocess_cpu:6.2f} us {preprocess_kib:6.2f} KiB   "
+              f"find_best_match {match_cpu:7.2f} us {match_kib:6.2f} KiB   "
+              f"memo hit rate {nlp.preprocess_stats()['memo']['hit_rate']:.2f}")
+
+
+if __name__ == "__main__":
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    main(n_requests, sys.argv[2] if len(sys.argv) > 2 else None)
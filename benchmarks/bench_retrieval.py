@@ -0,0 +1,53 @@
+"""
+Benchmark top-k retrieval on large FAQ corpora
+Compares cosine_similarity + full argsort with the SparseRetriever
+(normalized CSR mat-vec + partial top-k selection) and the
+InvertedIndexRetriever (postings of the query terms only + MaxScore).
+
+Usage: python -m benchmarks.bench_retrieval [n_faqs] [n_queries] [k]
+"""
+
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from nlp_processor import NLPProcessor
+from inverted_index import InvertedIndexRetriever
+from benchmarks.synthetic import generate_faqs, generate_queries
+
+
+def main(n_faqs=300000, n_queries=200, k=5):
+    print(f"Training on {n_faqs} synthetic FAQs...")
+    nlp = NLPProcessor(top_k=k)
+    nlp.train_vectorizer([faq["question"] for faq in generate_faqs(n_faqs)])
+    queries = generate_queries(n_queries, n_faqs=n_faqs)
+    query_vectors = nlp.vectorizer.transform([nlp.preprocess_text(q) for q in queries])
+
+    def baseline(vector):
+        similarities = cosine_similarity(vector, nlp.faq_vectors).flatten()
+        return np.argsort(similarities)[::-1][:k]
+
+    def engine(vector):
+        return nlp.retriever.search(vector, k=k)[0]
+
+    inverted_retriever = InvertedIndexRetriever(nlp.faq_vectors, top_k=k, normalized=True)
+
+    def inverted(vector):
+        return inverted_retriever.search(vector, k=k)[0]
+
+    for name, func in [("cosine+argsort", baseline), ("retriever", engine), ("inverted", inverted)]:
+        latencies = []
+        for i in range(n_queries):
+            start = time.perf_counter()
+            func(query_vectors[i])
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies = np.array(latencies)
+        print(f"{name:<15} p50 {np.percentile(latencies, 50):7.3f} ms   "
+              f"p99 {np.percentile(latencies, 99):7.3f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    main(*args)
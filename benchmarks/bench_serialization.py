@@ -0,0 +1,45 @@
+"""
+Benchmark /chat payload size and serialization time
+Formats real chatbot responses in the full and slim verbosity modes and
+reports bytes per response and microseconds per response to build and
+encode the payload, with Flask's default json settings and with
+serialization.dumps (orjson when installed).
+
+Usage: python -m benchmarks.bench_serialization [n_faqs] [n_responses]
+"""
+
+import json
+import sys
+import time
+
+import serialization
+from chatbot import FAQChatbot, VERBOSITY_LEVELS, format_response
+from benchmarks.synthetic import generate_faqs, generate_queries
+
+ENCODERS = [
+    # Flask's DefaultJSONProvider: sorted keys, ASCII escapes, compact separators
+    ("flask json", lambda payload: json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')),
+    (f"fast ({serialization.backend()})", serialization.dumps),
+]
+
+
+def main(n_faqs=10000, n_responses=20000):
+    chatbot = FAQChatbot(faqs=generate_faqs(n_faqs), cache_size=0)
+    responses = [chatbot.get_response(query) for query in generate_queries(1000, n_faqs=n_faqs)]
+    responses = (responses * (n_responses // len(responses) + 1))[:n_responses]
+    print(f"{n_faqs} synthetic FAQs, {len(responses)} responses")
+
+    for verbosity in reversed(VERBOSITY_LEVELS):
+        for name, encode in ENCODERS:
+            start = time.perf_counter()
+            total_bytes = 0
+            for response in responses:
+                total_bytes += len(encode(format_response(response, verbosity)))
+            elapsed = time.perf_counter() - start
+            print(f"{verbosity:<5} {name:<15} {total_bytes / len(responses):7.1f} bytes   "
+                  f"{elapsed / len(responses) * 1e6:6.2f} us per response")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,68 @@
+"""
+Benchmark sharded scatter-gather retrieval
+Scores the same queries against one synthetic FAQ matrix with the
+unsharded exact engine and with 2, 4, ... up to CPU-count shards, checks
+that every top-k is identical and reports single-query latency.
+
+Usage: python -m benchmarks.bench_sharded [n_faqs] [n_queries] [max_shards]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from retrieval import SparseRetriever
+from sharded_index import ShardedRetriever
+from benchmarks.synthetic import generate_faqs, generate_queries
+
+
+def shard_counts(max_shards):
+    counts = []
+    n_shards = 2
+    while n_shards < max_shards:
+        counts.append(n_shards)
+        n_shards *= 2
+    return counts + [max_shards] if max_shards > 1 else counts
+
+
+def latencies(retriever, query_vectors, k=5):
+    """Return (results, per-query latencies in ms)"""
+    results, times = [], []
+    for row in range(query_vectors.shape[0]):
+        start = time.perf_counter()
+        results.append(retriever.search(query_vectors[row], k))
+        times.append((time.perf_counter() - start) * 1000)
+    return results, np.array(times)
+
+
+def main(n_faqs=1000000, n_queries=500, max_shards=None):
+    max_shards = max_shards or os.cpu_count() or 1
+    faqs = generate_faqs(n_faqs)
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=1000)
+    # TF-IDF rows are L2-normalized; normalized=True keeps both engines on the same array
+    faq_vectors = vectorizer.fit_transform(faq["question"] for faq in faqs)
+    query_vectors = vectorizer.transform(generate_queries(n_queries, n_faqs=n_faqs))
+    print(f"{n_faqs} synthetic FAQs, {n_queries} queries, {os.cpu_count()} CPUs")
+
+    expected, times = latencies(SparseRetriever(faq_vectors, normalized=True), query_vectors)
+    print(f"{'unsharded':<10} p50 {np.percentile(times, 50):7.3f} ms   p95 {np.percentile(times, 95):7.3f} ms")
+
+    for n_shards in shard_counts(max_shards):
+        retriever = ShardedRetriever(faq_vectors, normalized=True, n_shards=n_shards)
+        retriever.search(query_vectors[0])
+        results, times = latencies(retriever, query_vectors)
+        identical = all(
+            np.array_equal(indices, expected_indices) and np.array_equal(scores, expected_scores)
+            for (indices, scores), (expected_indices, expected_scores) in zip(results, expected)
+        )
+        retriever.close()
+        print(f"{n_shards:>2} shards  p50 {np.percentile(times, 50):7.3f} ms   "
+              f"p95 {np.percentile(times, 95):7.3f} ms   identical top-k: {identical}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    main(*args)
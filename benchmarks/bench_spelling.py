@@ -0,0 +1,79 @@
+"""
+Benchmark typo-tolerant matching
+Matches paraphrases of synthetic FAQ questions, clean and with injected
+typos, with spelling correction off and on, and reports the rate of
+queries matched to their source FAQ above the similarity threshold and
+the per-query latency.
+
+Usage: python -m benchmarks.bench_spelling [n_faqs] [n_queries]
+"""
+
+import random
+import string
+import sys
+import time
+
+import numpy as np
+
+from nlp_processor import NLPProcessor
+from benchmarks.synthetic import generate_faqs, generate_paraphrases
+
+THRESHOLD = 0.15
+
+
+def add_typo(word, rng):
+    """Apply one random deletion, insertion, substitution or transposition to word"""
+    position = rng.randrange(len(word) - 1)
+    edit = rng.choice(('delete', 'insert', 'substitute', 'transpose'))
+    if edit == 'delete':
+        return word[:position] + word[position + 1:]
+    if edit == 'insert':
+        return word[:position] + rng.choice(string.ascii_lowercase) + word[position:]
+    if edit == 'substitute':
+        return word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+
+def misspell(query, rng):
+    """Add a typo to one or two words of at least 5 letters"""
+    words = query.split()
+    long_words = [i for i, word in enumerate(words) if len(word) >= 5]
+    for i in rng.sample(long_words, min(len(long_words), rng.choice((1, 2)))):
+        words[i] = add_typo(words[i], rng)
+    return ' '.join(words)
+
+
+def evaluate(nlp, pairs):
+    """Return (rate of queries matched to their FAQ, per-query latencies in ms)"""
+    matched, latencies = 0, []
+    for query, faq_index in pairs:
+        start = time.perf_counter()
+        result = nlp.match(query, threshold=THRESHOLD, top_k=1)
+        latencies.append((time.perf_counter() - start) * 1000)
+        matched += result['is_match'] and result['index'] == faq_index
+    return matched / len(pairs), np.array(latencies)
+
+
+def main(n_faqs=10000, n_queries=2000):
+    rng = random.Random(3)
+    faqs = generate_faqs(n_faqs)
+    questions = [faq["question"] for faq in faqs]
+    clean = generate_paraphrases(faqs, n_queries)
+    typos = [(misspell(query, rng), faq_index) for query, faq_index in clean]
+    print(f"{n_faqs} synthetic FAQs, {n_queries} paraphrases with and without typos")
+
+    for correction in (False, True):
+        nlp = NLPProcessor(spelling_correction=correction, preprocess_cache_size=0)
+        nlp.train_vectorizer(questions)
+        for name, pairs in (("clean", clean), ("typos", typos)):
+            rate, latencies = evaluate(nlp, pairs)
+            print(f"correction {'on ' if correction else 'off'}  {name:<5} matched {rate:6.2%}   "
+                  f"p50 {np.percentile(latencies, 50):6.3f} ms   "
+                  f"p99 {np.percentile(latencies, 99):6.3f} ms")
+        if correction:
+            print(f"spelling stats: {nlp.spelling_stats()}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,40 @@
+"""
+Microbenchmark preprocess_text throughput per tokenizer
+Reports questions per second for every registered tokenizer and checks
+that each produces the same output as the NLTK tokenizer.
+
+Usage: python -m benchmarks.bench_tokenizers [n_questions]
+"""
+
+import sys
+import time
+
+from faq_data import get_questions
+from nlp_processor import NLPProcessor
+from tokenization import TOKENIZERS
+from benchmarks.synthetic import generate_faqs, generate_queries
+
+
+def main(n_questions=20000):
+    questions = get_questions()
+    questions += [faq["question"] for faq in generate_faqs(n_questions // 2)]
+    questions += generate_queries(n_questions - len(questions))
+
+    reference = None
+    for name in sorted(TOKENIZERS):
+        nlp = NLPProcessor(tokenizer=name)
+        nlp.preprocess_text(questions[0])
+
+        start = time.perf_counter()
+        processed = [nlp.preprocess_text(question) for question in questions]
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = processed
+        same = "identical" if processed == reference else "DIFFERENT"
+        print(f"{name:<8} {len(questions) / elapsed:12,.0f} questions/s   output {same}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:2]]
+    main(*args)
@@ -0,0 +1,184 @@
+"""
+Benchmark suite for FAQ Chatbot
+Builds synthetic FAQ corpora of several sizes and measures, per size:
+- train_vectorizer time
+- index memory (FAQ matrix + vocabulary)
+- p50/p95/p99 latency of find_best_match and get_response
+- requests per second through the Flask /chat route (test client)
+Results are written as JSON so runs can be compared between releases.
+
+Usage:
+python -m benchmarks.run_benchmarks --sizes bundled,1000,10000,100000 --output results.json
+python -m benchmarks.run_benchmarks --compare baseline.json --output results.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import scipy
+import sklearn
+
+from chatbot import FAQChatbot
+from faq_data import get_faqs
+from benchmarks.synthetic import generate_faqs, generate_paraphrases
+
+# Latency percentiles compared by --compare
+COMPARED_METRICS = [
+    ('find_best_match_ms', 'p95'),
+    ('get_response_ms', 'p95'),
+]
+
+
+def latency_summary(latencies_ms):
+    """Summarize a list of latencies in milliseconds"""
+    latencies = np.asarray(latencies_ms)
+    return {
+        'mean': float(latencies.mean()),
+        'p50': float(np.percentile(latencies, 50)),
+        'p95': float(np.percentile(latencies, 95)),
+        'p99': float(np.percentile(latencies, 99)),
+    }
+
+
+def time_calls(func, args):
+    """Call func on each argument and return the latencies in milliseconds"""
+    latencies = []
+    for arg in args:
+        start = time.perf_counter()
+        func(arg)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def index_memory_bytes(nlp_processor):
+    """Approximate memory held by the FAQ matrix and the vocabulary dict"""
+    matrix = nlp_processor.faq_vectors
+    total = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    vocabulary = nlp_processor.vectorizer.vocabulary_
+    total += sys.getsizeof(vocabulary)
+    total += sum(sys.getsizeof(term) + sys.getsizeof(column) for term, column in vocabulary.items())
+    return total
+
+
+def flask_requests_per_second(chatbot, queries):
+    """Replay queries through the Flask /chat route with the test client"""
+    import app as app_module
+
+    # Serve the benchmark corpus instead of the bundled FAQs
+    previous_chatbot = app_module.chatbot
+    app_module.chatbot = chatbot
+    try:
+        client = app_module.app.test_client()
+        start = time.perf_counter()
+        for query in queries:
+            client.post('/chat', json={'message': query})
+        elapsed = time.perf_counter() - start
+    finally:
+        app_module.chatbot = previous_chatbot
+    return len(queries) / elapsed
+
+
+def run_size(size, n_queries):
+    """Run every measurement for one corpus size"""
+    faqs = get_faqs() if size == 'bundled' else generate_faqs(int(size))
+    queries = [query for query, _ in generate_paraphrases(faqs, n_queries)]
+
+    start = time.perf_counter()
+    # Disable the response cache so repeated paraphrases are still matched
+    chatbot = FAQChatbot(faqs=faqs, cache_size=0)
+    train_seconds = time.perf_counter() - start
+
+    nlp = chatbot.nlp_processor
+    threshold = chatbot.similarity_threshold
+    chatbot.get_response(queries[0])
+
+    return {
+        'size': size,
+        'n_faqs': len(faqs),
+        'n_queries': len(queries),
+        'train_seconds': train_seconds,
+        'index_bytes': index_memory_bytes(nlp),
+        'find_best_match_ms': latency_summary(
+            time_calls(lambda q: nlp.find_best_match(q, threshold=threshold), queries)
+        ),
+        'get_response_ms': latency_summary(time_calls(chatbot.get_response, queries)),
+        'flask_requests_per_second': flask_requests_per_second(chatbot, queries),
+    }
+
+
+def environment():
+    """Describe the machine and library versions the benchmark ran on"""
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'scikit-learn': sklearn.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return a list of regressions: latency percentiles more than tolerance
+    (a fraction) above the baseline run for the same corpus size
+    """
+    baseline_by_size = {str(run['size']): run for run in baseline['results']}
+    regressions = []
+    for run in results['results']:
+        previous = baseline_by_size.get(str(run['size']))
+        if previous is None:
+            continue
+        for metric, percentile in COMPARED_METRICS:
+            old = previous[metric][percentile]
+            new = run[metric][percentile]
+            if new > old * (1 + tolerance):
+                regressions.append(
+                    f"{run['size']}: {metric} {percentile} {old:.3f} ms -> {new:.3f} ms"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FAQ Chatbot benchmark suite")
+    parser.add_argument('--sizes', default='bundled,1000,10000,100000',
+                        help="comma separated corpus sizes; 'bundled' uses faq_data.py")
+    parser.add_argument('--queries', type=int, default=500, help="queries per corpus size")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--compare', help="baseline JSON results to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed latency increase over the baseline (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = {'environment': environment(), 'results': []}
+    for size in args.sizes.split(','):
+        size = size.strip()
+        print(f"Benchmarking {size} FAQs...")
+        run = run_size(size, args.queries)
+        results['results'].append(run)
+        print(f"  train {run['train_seconds']:.2f} s, index {run['index_bytes'] / 1e6:.1f} MB, "
+              f"get_response p95 {run['get_response_ms']['p95']:.3f} ms, "
+              f"flask {run['flask_requests_per_second']:.0f} req/s")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Synthetic FAQ data for benchmarks
+Generates FAQ corpora and query sets of any size from a fixed vocabulary
+"""
+
+import random
+
+TOPICS = [
+    "python", "java", "javascript", "database", "server", "network", "git",
+    "docker", "kubernetes", "linux", "windows", "api", "function", "variable",
+    "loop", "class", "object", "module", "package", "library", "framework",
+    "compiler", "interpreter", "debugger", "exception", "thread", "process",
+    "memory", "cache", "index", "query", "table", "schema", "migration",
+    "deployment", "container", "cluster", "certificate", "password", "account",
+    "browser", "cookie", "session", "token", "request", "response", "header",
+    "endpoint", "webhook", "plugin", "extension", "editor", "terminal", "shell",
+    "script", "virtual", "environment", "dependency", "version", "release",
+    "branch", "commit", "merge", "repository", "pipeline", "build", "test",
+]
+
+VERBS = [
+    "install", "configure", "update", "remove", "create", "delete", "debug",
+    "deploy", "monitor", "optimize", "secure", "backup", "restore", "migrate",
+    "reset", "enable", "disable", "upgrade", "connect", "export", "import",
+]
+
+TEMPLATES = [
+    "What is {topic} {extra}?",
+    "How do I {verb} {topic} {extra}?",
+    "How can I {verb} a {topic} with {other}?",
+    "What is the difference between {topic} and {other}?",
+    "Why does my {topic} {extra} fail to {verb}?",
+    "Can I {verb} {topic} on {other}?",
+]
+
+PARAPHRASES = [
+    "how to {verb} {topic} {extra}",
+    "{topic} {extra} {verb} help",
+    "what does {topic} {extra} mean",
+    "{verb} {topic} {other} not working",
+    "explain {topic} and {other}",
+]
+
+
+def _extra_words(n_extra):
+    """Build pseudo-words so the vocabulary grows with the corpus size"""
+    syllables = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "sa"]
+    words = []
+    for i in range(n_extra):
+        word = ""
+        value = i
+        for _ in range(3):
+            word += syllables[value % len(syllables)]
+            value //= len(syllables)
+        words.append(word)
+    return words
+
+
+def generate_faqs(n_faqs, seed=42):
+    """Generate a list of n_faqs FAQ dicts with 'question' and 'answer' keys"""
+    rng = random.Random(seed)
+    extra = _extra_words(max(len(TOPICS), n_faqs // 10))
+    faqs = []
+    for i in range(n_faqs):
+        template = TEMPLATES[i % len(TEMPLATES)]
+        question = template.format(
+            topic=rng.choice(TOPICS),
+            other=rng.choice(TOPICS),
+            verb=rng.choice(VERBS),
+            extra=rng.choice(extra),
+        )
+        faqs.append({
+            "question": question,
+            "answer": f"Synthetic answer number {i} for: {question}",
+        })
+    return faqs
+
+
+def generate_queries(n_queries, seed=7, n_faqs=1000):
+    """Generate n_queries short user questions over the same vocabulary"""
+    rng = random.Random(seed)
+    extra = _extra_words(max(len(TOPICS), n_faqs // 10))
+    queries = []
+    for i in range(n_queries):
+        template = PARAPHRASES[i % len(PARAPHRASES)]
+        queries.append(template.format(
+            topic=rng.choice(TOPICS),
+            other=rng.choice(TOPICS),
+            verb=rng.choice(VERBS),
+            extra=rng.choice(extra),
+        ))
+    return queries
+
+
+def generate_paraphrases(faqs, n_queries, seed=11):
+    """
+    Generate n_queries paraphrases of randomly chosen FAQ questions.
+    Returns a list of (query, faq_index) pairs, where faq_index is the FAQ
+    the query was derived from. Paraphrases drop, reorder and lowercase
+    words the way users phrase short questions.
+    """
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(n_queries):
+        faq_index = rng.randrange(len(faqs))
+        words = faqs[faq_index]["question"].rstrip("?").split()
+        if len(words) > 3:
+            # Drop one word that is not the first
+            del words[rng.randrange(1, len(words))]
+        if rng.random() < 0.5:
+            rng.shuffle(words)
+        query = " ".join(words)
+        if rng.random() < 0.5:
+            query = query.lower()
+        pairs.append((query, faq_index))
+    return pairs
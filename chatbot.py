@@ -1,81 +1,273 @@
-"""
-FAQ Chatbot Implementation
-Main chatbot class that handles question matching and response generation
-"""
-
-from faq_data import get_faqs, get_questions, get_answers
-from nlp_processor import NLPProcessor
-import json
-
-class FAQChatbot:
-    def __init__(self):
-        """Initialize the FAQ chatbot with data and NLP processor"""
-        self.faqs = get_faqs()
-        self.questions = get_questions()
-        self.answers = get_answers()
-        
-        # Initialize NLP processor
-        self.nlp_processor = NLPProcessor()
-        
-        # Train the vectorizer on FAQ questions
-        self.nlp_processor.train_vectorizer(self.questions)
-        
-        # Set default threshold for matching
-        self.similarity_threshold = 0.15
-        
-    def get_response(self, user_question):
-        """
-        Get the best matching response for a user question
-        Returns a dictionary with response details
-        """
-        if not user_question.strip():
-            return {
-                'answer': "Please ask a question!",
-                'confidence': 0.0,
-                'matched_question': None,
-                'is_match': False,
-                'debug_info': None
-            }
-        
-        # Find best match
-        match_result = self.nlp_processor.find_best_match(
-            user_question, 
-            threshold=self.similarity_threshold
-        )
-        
-        # Prepare response
-        if match_result['is_match']:
-            answer = self.answers[match_result['index']]
-            confidence = match_result['similarity']
-            matched_question = match_result['question']
-        else:
-            answer = "I'm sorry, I couldn't find a good match for your question. Could you try rephrasing it or ask something else?"
-            confidence = match_result['similarity']
-            matched_question = None
-        
-        # Get similarity analysis and ensure proper format
-        top_matches = self.nlp_processor.get_similarity_analysis(user_question)
-        processed_matches = []
-        
-        if top_matches and isinstance(top_matches, list):
-            for match in top_matches:
-                if isinstance(match, dict):
-                    processed_matches.append({
-                        'question': str(match.get('question', '')),
-                        'similarity': float(match.get('similarity', 0.0)),
-                        'index': int(match.get('index', 0))
-                    })
-        
-        return {
-            'answer': answer,
-            'confidence': confidence,
-            'matched_question': matched_question,
-            'is_match': match_result['is_match'],
-            'debug_info': {
-                'processed_question': match_result['processed_question'],
-                'similarity_threshold': self.similarity_threshold,
-                'top_matches': processed_matches
-            }
-        }
-    
+"""
+FAQ Chatbot Implementation
+Main chatbot class that handles question matching and response generation
+"""
+
+from faq_data import get_faqs, get_questions, get_answers
+from nlp_processor import NLPProcessor
+from response_cache import LRUCache
+from metrics import METRICS, RESPONSES, MATCH_CONFIDENCE, observe_stage
+from collections import namedtuple
+import json
+import threading
+
+# Response payload verbosity: 'slim' leaves out debug_info
+VERBOSITY_LEVELS = ('slim', 'full')
+
+# debug_info of responses that were not matched, e.g. empty questions
+EMPTY_DEBUG_INFO = {
+    'processed_question': '',
+    'similarity_threshold': 0.0,
+    'top_matches': []
+}
+
+def format_response(response, verbosity='full'):
+    """
+    Convert a chatbot response into the /chat payload.
+    Responses already hold Python types, so no field is converted;
+    verbosity='slim' leaves out the debug_info block.
+    """
+    payload = {
+        'success': True,
+        'response': response['answer'],
+        'confidence': response['confidence'],
+        'matched_question': response['matched_question'],
+        'is_match': response['is_match']
+    }
+    if verbosity == 'full':
+        payload['debug_info'] = response['debug_info'] or EMPTY_DEBUG_INFO
+    return payload
+
+# Default minimum similarity for answering with a FAQ; tune it with evaluate.py
+DEFAULT_SIMILARITY_THRESHOLD = 0.15
+
+# Everything a response depends on: the FAQIndex matched against and the
+# similarity threshold. A new snapshot replaces the old one in a single
+# assignment whenever either changes, and each request reads it once, so
+# threads serving requests share one index without locking and a reload
+# or threshold change never mixes two versions in one response.
+ChatbotSnapshot = namedtuple('ChatbotSnapshot', ['index', 'threshold'])
+
+class FAQChatbot:
+    def __init__(self, faqs=None, index_path=None, cache_size=1024, cache_ttl=None,
+                 nlp_options=None, similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD):
+        """
+        Initialize the FAQ chatbot with data and NLP processor.
+        Uses the bundled FAQ data unless a list of FAQ dicts is given.
+        With index_path, the TF-IDF index is memory-mapped from disk and
+        only rebuilt when the FAQ questions change.
+        Responses are cached by preprocessed question in an LRU cache of
+        cache_size entries (0 disables it), optionally expiring after
+        cache_ttl seconds.
+        nlp_options are keyword arguments for NLPProcessor, e.g.
+        {'retrieval': 'approximate'} for very large FAQ bases.
+        similarity_threshold is the minimum similarity for answering with a
+        FAQ; evaluate.py recommends one from labeled queries.
+        """
+        if faqs is None:
+            self.faqs = get_faqs()
+            self.questions = get_questions()
+            self.answers = get_answers()
+        else:
+            self.faqs = faqs
+            self.questions = [faq["question"] for faq in faqs]
+            self.answers = [faq["answer"] for faq in faqs]
+        
+        # Initialize NLP processor
+        self.nlp_processor = NLPProcessor(**(nlp_options or {}))
+        
+        # Load the saved index, or train the vectorizer on FAQ questions
+        if index_path is not None:
+            from index_store import load_or_build_index
+            load_or_build_index(self.nlp_processor, self.questions, index_path, self.answers)
+        else:
+            self.nlp_processor.train_vectorizer(self.questions, self.answers)
+        
+        # Set threshold for matching; writers of the snapshot take the lock
+        self._snapshot_lock = threading.Lock()
+        self._snapshot = ChatbotSnapshot(self.nlp_processor.index, similarity_threshold)
+        
+        # Cache of responses keyed on the snapshot version and preprocessed question
+        self.response_cache = LRUCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_state = None
+        
+    @property
+    def similarity_threshold(self):
+        """Minimum similarity for answering with a FAQ"""
+        return self._snapshot.threshold
+    
+    @similarity_threshold.setter
+    def similarity_threshold(self, threshold):
+        with self._snapshot_lock:
+            self._snapshot = ChatbotSnapshot(self.nlp_processor.index, threshold)
+    
+    def snapshot(self):
+        """
+        Return the current ChatbotSnapshot. Only the first request after a
+        reload takes the lock, to publish a snapshot of the new index.
+        """
+        snapshot = self._snapshot
+        if snapshot.index is not self.nlp_processor.index:
+            with self._snapshot_lock:
+                # Re-read under the lock so a slow thread never publishes an older index
+                snapshot = self._snapshot
+                index = self.nlp_processor.index
+                if snapshot.index is not index:
+                    snapshot = self._snapshot = ChatbotSnapshot(index, snapshot.threshold)
+        return snapshot
+    
+    def get_response(self, user_question):
+        """
+        Get the best matching response for a user question
+        Returns a dictionary with response details
+        """
+        if not user_question.strip():
+            RESPONSES.inc('empty')
+            return self._empty_response()
+        
+        request_start = METRICS.start_timer()
+        
+        # Near-identical phrasings share the same preprocessed cache key
+        start = METRICS.start_timer()
+        processed_question = self.nlp_processor.preprocess_text(user_question)
+        observe_stage('preprocess', start)
+        
+        start = METRICS.start_timer()
+        snapshot = self.snapshot()
+        response_cache = self._get_response_cache(snapshot)
+        cache_key = self._cache_key(snapshot, processed_question)
+        response = response_cache.get(cache_key)
+        observe_stage('cache_lookup', start)
+        
+        if response is None:
+            # Find best match and top matches in a single pass
+            match_result = self.nlp_processor.match_preprocessed(
+                processed_question, 
+                threshold=snapshot.threshold,
+                user_question=user_question,
+                index=snapshot.index
+            )
+            
+            start = METRICS.start_timer()
+            response = self._build_response(match_result, snapshot.threshold)
+            observe_stage('build_response', start)
+            response_cache.put(cache_key, response)
+        
+        self._record_response(response)
+        observe_stage('get_response', request_start)
+        return response
+    
+    def get_responses(self, user_questions):
+        """
+        Get responses for a batch of user questions.
+        Non-empty questions are matched together in one batched pass.
+        Returns a list of response dictionaries in input order
+        """
+        responses = [None] * len(user_questions)
+        snapshot = self.snapshot()
+        response_cache = self._get_response_cache(snapshot)
+        
+        # Only non-empty questions that miss the cache go through the batch matcher
+        positions = []
+        processed_questions = []
+        for position, question in enumerate(user_questions):
+            if not question.strip():
+                continue
+            processed_question = self.nlp_processor.preprocess_text(question)
+            cached = response_cache.get(self._cache_key(snapshot, processed_question))
+            if cached is not None:
+                responses[position] = cached
+            else:
+                positions.append(position)
+                processed_questions.append(processed_question)
+        
+        match_results = self.nlp_processor.find_best_matches_preprocessed(
+            processed_questions,
+            threshold=snapshot.threshold,
+            user_questions=[user_questions[i] for i in positions],
+            index=snapshot.index
+        )
+        
+        for position, processed_question, match_result in zip(positions, processed_questions, match_results):
+            responses[position] = self._build_response(match_result, snapshot.threshold)
+            response_cache.put(self._cache_key(snapshot, processed_question), responses[position])
+        
+        for response in responses:
+            if response is not None:
+                self._record_response(response)
+            else:
+                RESPONSES.inc('empty')
+        
+        return [
+            response if response is not None else self._empty_response()
+            for response in responses
+        ]
+    
+    def cache_stats(self):
+        """Return hit, miss and eviction counters of the response cache"""
+        return self.response_cache.stats()
+    
+    def _get_response_cache(self, snapshot):
+        """
+        Return the response cache, clearing it first if the FAQ index or
+        the similarity threshold changed since it was filled
+        """
+        state = (snapshot.index.version, snapshot.threshold)
+        if state != self._cache_state:
+            self.response_cache.clear()
+            self._cache_state = state
+        return self.response_cache
+    
+    @staticmethod
+    def _cache_key(snapshot, processed_question):
+        """
+        Cache key of a question under a snapshot. Clearing only frees memory:
+        a response put by a request still on the previous snapshot is never
+        served under the new one.
+        """
+        return (snapshot.index.version, snapshot.threshold, processed_question)
+    
+    def _record_response(self, response):
+        """Count the response outcome and record its confidence"""
+        if not METRICS.enabled:
+            return
+        RESPONSES.inc('match' if response['is_match'] else 'no_match')
+        MATCH_CONFIDENCE.observe(response['confidence'])
+    
+    def _empty_response(self):
+        """Response returned for an empty question"""
+        return {
+            'answer': "Please ask a question!",
+            'confidence': 0.0,
+            'matched_question': None,
+            'is_match': False,
+            'debug_info': None
+        }
+    
+    def _build_response(self, match_result, threshold):
+        """Build the response dictionary from a match result at the given threshold"""
+        # Prepare response from the answer stored in the matched index
+        if match_result['is_match']:
+            answer = match_result['answer']
+            if answer is None:
+                answer = self.answers[match_result['index']]
+            confidence = match_result['similarity']
+            matched_question = match_result['question']
+        else:
+            answer = "I'm sorry, I couldn't find a good match for your question. Could you try rephrasing it or ask something else?"
+            confidence = match_result['similarity']
+            matched_question = None
+        
+        return {
+            'answer': answer,
+            'confidence': confidence,
+            'matched_question': matched_question,
+            'is_match': match_result['is_match'],
+            'debug_info': {
+                'processed_question': match_result['processed_question'],
+                'similarity_threshold': threshold,
+                'top_matches': match_result['top_matches']
+            }
+        }
+    
     # ... [rest of your methods remain unchanged] ...
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Compact index storage for FAQ Chatbot
+Shrinks the FAQ matrix to float32 weights with 32-bit indices and replaces
+the vocabulary dict with sorted UTF-8 terms searched by bisection.
+"""
+
+from array import array
+from collections.abc import Mapping
+import sys
+
+import numpy as np
+from scipy import sparse
+
+INT32_MAX = np.iinfo(np.int32).max
+
+
+def smallest_uint_typecode(max_value):
+    """Smallest array.array unsigned typecode that holds max_value"""
+    for typecode in ('B', 'H', 'I', 'L', 'Q'):
+        if max_value < 2 ** (8 * array(typecode).itemsize):
+            return typecode
+    raise OverflowError(f"{max_value} does not fit in 64 bits")
+
+
+class SortedVocabulary(Mapping):
+    """
+    Read-only term -> column mapping for a fitted vectorizer.
+
+    Terms are stored sorted, UTF-8 encoded and concatenated in one bytes
+    object with an offset per term, in the smallest integer type that
+    fits, so a term costs its bytes plus a few bytes of offsets instead
+    of a dict entry, a str and an int object. Lookups bisect the sorted
+    terms; UTF-8 byte order equals code point order. Columns are only
+    stored when they are not the sorted positions, which they already are
+    for scikit-learn vectorizers.
+    """
+
+    def __init__(self, vocabulary):
+        items = sorted(vocabulary.items())
+        encoded = [term.encode('utf-8') for term, _ in items]
+        self._blob = b''.join(encoded)
+
+        self._offsets = array(smallest_uint_typecode(len(self._blob)), [0])
+        position = 0
+        for term in encoded:
+            position += len(term)
+            self._offsets.append(position)
+
+        columns = [column for _, column in items]
+        if columns == list(range(len(columns))):
+            self._columns = None
+        else:
+            self._columns = array(smallest_uint_typecode(max(columns, default=0)), columns)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def _term_bytes(self, position):
+        return self._blob[self._offsets[position]:self._offsets[position + 1]]
+
+    def _column(self, position):
+        return position if self._columns is None else self._columns[position]
+
+    def __getitem__(self, term):
+        if not isinstance(term, str):
+            raise KeyError(term)
+        key = term.encode('utf-8')
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._term_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self) and self._term_bytes(low) == key:
+            return self._column(low)
+        raise KeyError(term)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self._term_bytes(position).decode('utf-8')
+
+    def items(self):
+        return ((term, self._column(position)) for position, term in enumerate(self))
+
+    @property
+    def nbytes(self):
+        """Bytes held by the terms, offsets and columns"""
+        total = sys.getsizeof(self._blob) + self._offsets.itemsize * len(self._offsets)
+        if self._columns is not None:
+            total += self._columns.itemsize * len(self._columns)
+        return total
+
+
+def compact_matrix(matrix):
+    """
+    Return matrix as a float32 CSR matrix with int32 indices and indptr
+    when they fit; scipy only supports 32- and 64-bit sparse indices
+    """
+    matrix = sparse.csr_matrix(matrix)
+    index_dtype = np.int32 if max(matrix.nnz, matrix.shape[1]) <= INT32_MAX else np.int64
+    return sparse.csr_matrix(
+        (
+            matrix.data.astype(np.float32, copy=False),
+            matrix.indices.astype(index_dtype, copy=False),
+            matrix.indptr.astype(index_dtype, copy=False)
+        ),
+        shape=matrix.shape,
+        copy=False
+    )
+
+
+def vocabulary_nbytes(vocabulary):
+    """Approximate bytes held by a vocabulary mapping"""
+    if isinstance(vocabulary, SortedVocabulary):
+        return vocabulary.nbytes
+    return sys.getsizeof(vocabulary) + sum(
+        sys.getsizeof(term) + sys.getsizeof(column) for term, column in vocabulary.items()
+    )
+
+
+def index_nbytes(nlp_processor):
+    """Return the bytes held by the FAQ matrix and vocabulary of the current index, in total and per FAQ"""
+    matrix = nlp_processor.faq_vectors
+    matrix_bytes = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    vocabulary_bytes = vocabulary_nbytes(nlp_processor.vectorizer.vocabulary_)
+    n_faqs = max(matrix.shape[0], 1)
+    return {
+        'matrix_bytes': matrix_bytes,
+        'vocabulary_bytes': vocabulary_bytes,
+        'bytes_per_faq': (matrix_bytes + vocabulary_bytes) / n_faqs
+    }
@@ -0,0 +1,258 @@
+"""
+Offline evaluation for FAQ Chatbot
+Scores a labeled query file against the FAQ index and sweeps the
+similarity threshold to recommend one.
+
+Every query is preprocessed, vectorized in one transform call and scored
+against all FAQs with sparse matrix products over large chunks of
+queries, so 100k+ labeled queries take seconds. For each threshold a
+query is answered with its best FAQ when the similarity reaches the
+threshold, and:
+- precision: answered queries whose FAQ is the expected one
+- recall: queries with an expected FAQ that are answered with it
+- accuracy: queries answered with the expected FAQ, or left unanswered
+  when no FAQ is expected
+
+The labeled file is JSONL with one {"query": ..., "expected": ...} object
+per line, or CSV with query and expected columns. expected is a FAQ index,
+a FAQ question, or null / "" / "no match" when no FAQ should be returned.
+
+Evaluate the bundled FAQs or a FAQ file (see faq_ingest.py):
+python evaluate.py labeled.jsonl [--faqs faqs.jsonl] [--metric f1] [--output report.json]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Queries scored per sparse matrix product; bounds the similarity matrix size
+EVALUATION_CHUNK_SIZE = 2000
+
+NO_MATCH_LABELS = ('', 'none', 'null', 'no match', 'no_match', '-1')
+
+METRIC_NAMES = ('precision', 'recall', 'f1', 'accuracy')
+
+
+def read_labeled_queries(path, faq_questions, file_format=None):
+    """
+    Read a labeled query file into (queries, expected), where expected is
+    an int array of FAQ indices with -1 for queries that should not match
+    """
+    if file_format is None:
+        file_format = 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'jsonl'
+    with open(path, encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            rows = [(row['query'], row.get('expected')) for row in csv.DictReader(f)]
+        else:
+            rows = []
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    rows.append((record['query'], record.get('expected')))
+
+    question_index = {question: index for index, question in enumerate(faq_questions)}
+    queries, expected = [], []
+    for line_number, (query, label) in enumerate(rows, 1):
+        queries.append(query)
+        expected.append(_parse_label(label, question_index, len(faq_questions), path, line_number))
+    return queries, np.array(expected, dtype=np.int64)
+
+
+def _parse_label(label, question_index, n_faqs, path, line_number):
+    if label is None or (isinstance(label, str) and label.strip().lower() in NO_MATCH_LABELS):
+        return -1
+    if isinstance(label, str) and label in question_index:
+        return question_index[label]
+    try:
+        index = int(label)
+    except (TypeError, ValueError):
+        raise ValueError(f"{path}:{line_number}: unknown FAQ '{label}'") from None
+    if not -1 <= index < n_faqs:
+        raise ValueError(f"{path}:{line_number}: FAQ index {index} out of range")
+    return index
+
+
+def best_matches(nlp_processor, queries, chunk_size=EVALUATION_CHUNK_SIZE):
+    """
+    Return (best FAQ index, similarity) arrays for queries, equal to the
+    top match of NLPProcessor.match() with exact retrieval
+    """
+    from scipy import sparse
+
+    index = nlp_processor.index
+    if index is None:
+        raise ValueError("Vectorizer must be trained first. Call train_vectorizer()")
+
+    processed = nlp_processor.preprocess_corpus(queries)
+    if index.keywords is not None:
+        # Hybrid scores are not a single matrix product
+        results = nlp_processor.find_best_matches_preprocessed(processed, threshold=0.0, top_k=1)
+        return (np.array([result['index'] for result in results], dtype=np.int64),
+                np.array([result['similarity'] for result in results]))
+
+    if index.spelling is not None:
+        processed = [nlp_processor.correct_spelling(question, index) for question in processed]
+
+    query_vectors = index.vectorizer.transform(processed)
+    matrix = index.retriever.matrix
+    best_indices = np.zeros(len(queries), dtype=np.int64)
+    best_scores = np.zeros(len(queries))
+    for start in range(0, len(queries), chunk_size):
+        chunk = sparse.csr_matrix(query_vectors[start:start + chunk_size], dtype=matrix.dtype)
+        similarities = sparse.csr_matrix(chunk @ matrix.T)
+        similarities.eliminate_zeros()
+        rows, columns, scores = row_maxima(similarities)
+        best_indices[start + rows] = columns
+        best_scores[start + rows] = scores
+    return best_indices, best_scores
+
+
+def row_maxima(similarities):
+    """
+    Return (rows, columns, values) of the largest stored value of every
+    non-empty row of a CSR matrix, taking the lowest column among ties like
+    select_top_k. Empty rows are left out; their best match is FAQ 0 at 0.
+    """
+    lengths = np.diff(similarities.indptr)
+    rows = np.flatnonzero(lengths)
+    if len(rows) == 0:
+        return rows, rows, np.zeros(0)
+    starts = similarities.indptr[:-1][rows]
+    maxima = np.maximum.reduceat(similarities.data, starts)
+
+    # Lowest column holding the row maximum
+    row_of_entry = np.repeat(rows, lengths[rows])
+    at_max = np.flatnonzero(similarities.data == np.repeat(maxima, lengths[rows]))
+    columns = np.full(len(rows), np.iinfo(np.int64).max)
+    np.minimum.at(columns, np.searchsorted(rows, row_of_entry[at_max]), similarities.indices[at_max])
+    return rows, columns, maxima.astype(np.float64)
+
+
+def threshold_sweep(best_indices, best_scores, expected, thresholds):
+    """
+    Return a dict of metric name -> array over thresholds for the
+    precision, recall, F1 and accuracy of answering each query with its
+    best FAQ when its similarity reaches the threshold
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    order = np.argsort(best_scores, kind='stable')
+    scores = best_scores[order]
+    correct = (best_indices == expected)[order] & (expected[order] >= 0)
+    negative = expected[order] < 0
+
+    # Queries at positions >= cut are answered at each threshold
+    cut = np.searchsorted(scores, thresholds, side='left')
+    n = len(scores)
+    correct_after = np.concatenate((np.cumsum(correct[::-1])[::-1], [0]))
+    negative_before = np.concatenate(([0], np.cumsum(negative)))
+
+    answered = n - cut
+    true_positives = correct_after[cut]
+    true_negatives = negative_before[cut]
+    positives = n - negative.sum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(answered > 0, true_positives / answered, 1.0)
+        recall = np.where(positives > 0, true_positives / max(positives, 1), 1.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    accuracy = (true_positives + true_negatives) / max(n, 1)
+    return {
+        'threshold': thresholds,
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'accuracy': accuracy
+    }
+
+
+def recommend_threshold(sweep, metric='f1'):
+    """Threshold with the best value of metric; the highest one among ties"""
+    values = sweep[metric]
+    best = np.flatnonzero(values == values.max())[-1]
+    return float(sweep['threshold'][best])
+
+
+def evaluate(nlp_processor, queries, expected, thresholds=None, metric='f1'):
+    """
+    Score labeled queries and sweep thresholds.
+    Returns a report dict with the sweep as lists, the recommended
+    threshold and its metrics, and the scoring time.
+    """
+    if thresholds is None:
+        thresholds = np.round(np.arange(0.0, 1.0001, 0.01), 4)
+    start = time.perf_counter()
+    best_indices, best_scores = best_matches(nlp_processor, queries)
+    seconds = time.perf_counter() - start
+
+    sweep = threshold_sweep(best_indices, best_scores, expected, thresholds)
+    threshold = recommend_threshold(sweep, metric)
+    position = int(np.flatnonzero(sweep['threshold'] == threshold)[0])
+    return {
+        'queries': len(queries),
+        'expected_matches': int((expected >= 0).sum()),
+        'scoring_seconds': seconds,
+        'metric': metric,
+        'recommended_threshold': threshold,
+        'recommended': {name: float(sweep[name][position]) for name in METRIC_NAMES},
+        'sweep': {name: values.tolist() for name, values in sweep.items()}
+    }
+
+
+def print_report(report, step=0.05):
+    """Print the sweep every step and the recommended threshold"""
+    sweep = report['sweep']
+    print(f"{report['queries']:,} labeled queries ({report['expected_matches']:,} with an expected FAQ) "
+          f"scored in {report['scoring_seconds']:.2f} s")
+    print(f"{'threshold':>9} {'precision':>9} {'recall':>9} {'f1':>9} {'accuracy':>9}")
+    for position, threshold in enumerate(sweep['threshold']):
+        if abs(threshold / step - round(threshold / step)) < 1e-9:
+            print(f"{threshold:>9.2f} " + ' '.join(f"{sweep[name][position]:>9.3f}" for name in METRIC_NAMES))
+    recommended = report['recommended']
+    print(f"✅ Recommended similarity_threshold: {report['recommended_threshold']:.2f} "
+          f"(best {report['metric']}: " + ', '.join(f"{name} {recommended[name]:.3f}" for name in METRIC_NAMES) + ")")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate FAQ matching and recommend a similarity threshold")
+    parser.add_argument('labeled', help="JSONL or CSV file of queries and expected FAQs")
+    parser.add_argument('--faqs', default=None,
+                        help="JSONL or CSV FAQ file (default: the bundled FAQs)")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default=None,
+                        help="Format of the labeled file (default: from the extension)")
+    parser.add_argument('--metric', choices=METRIC_NAMES, default='f1',
+                        help="Metric the recommended threshold maximizes")
+    parser.add_argument('--step', type=float, default=0.01, help="Threshold sweep step")
+    parser.add_argument('--n-jobs', type=int, default=1, help="Preprocessing processes (-1: one per CPU)")
+    parser.add_argument('--output', default=None, help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    from nlp_processor import NLPProcessor
+
+    if args.faqs:
+        from faq_ingest import iter_faq_file
+        faqs = list(iter_faq_file(args.faqs))
+    else:
+        from faq_data import get_faqs
+        faqs = get_faqs()
+    questions = [faq['question'] for faq in faqs]
+
+    nlp_processor = NLPProcessor(n_jobs=args.n_jobs)
+    nlp_processor.train_vectorizer(questions, [faq['answer'] for faq in faqs])
+    queries, expected = read_labeled_queries(args.labeled, questions, args.format)
+
+    thresholds = np.round(np.arange(0.0, 1.0 + args.step / 2, args.step), 6)
+    report = evaluate(nlp_processor, queries, expected, thresholds, args.metric)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Named FAQ collections for FAQ Chatbot
+Serves many FAQ sets from one process: each collection gets its own
+FAQChatbot, built on first use and evicted least recently used once the
+loaded collections exceed a memory budget.
+
+A collection named NAME is read from NAME.json in the collections
+directory, a JSON list of {"question": ..., "answer": ...} objects, or
+registered in code with CollectionManager.register(). The "default"
+collection is the bundled FAQ data.
+
+Configuration (environment variables):
+FAQ_COLLECTIONS_PATH        directory of collection files (default: faq_collections/)
+FAQ_COLLECTIONS_MEMORY_MB   memory budget for loaded collections (default: 512)
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_COLLECTION = "default"
+
+DEFAULT_COLLECTIONS_DIR = "faq_collections"
+
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+# Collection names double as file names, so keep them to a safe alphabet
+COLLECTION_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Arrays held by the retrieval engines besides the FAQ matrix
+_RETRIEVER_ARRAYS = ('postings_indptr', 'postings_rows', 'postings_weights', 'max_weights')
+
+# Requests between re-estimates of the loaded collections' memory, which
+# grows with their caches
+REESTIMATE_INTERVAL = 256
+
+
+class UnknownCollectionError(KeyError):
+    """Raised when no FAQ collection has the requested name"""
+
+
+def resolve_collections_path():
+    """Collections directory from FAQ_COLLECTIONS_PATH, defaulting to faq_collections/ next to this file"""
+    return os.environ.get(
+        'FAQ_COLLECTIONS_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_COLLECTIONS_DIR)
+    )
+
+
+def resolve_memory_budget():
+    """Memory budget in bytes from FAQ_COLLECTIONS_MEMORY_MB"""
+    return int(float(os.environ.get('FAQ_COLLECTIONS_MEMORY_MB', DEFAULT_MEMORY_BUDGET_MB)) * 1024 * 1024)
+
+
+def load_faq_file(path):
+    """Read a JSON list of {"question", "answer"} objects"""
+    with open(path, encoding='utf-8') as f:
+        faqs = json.load(f)
+    if not isinstance(faqs, list) or not faqs:
+        raise ValueError(f"{path} must contain a non-empty JSON list of FAQs")
+    return [{"question": str(faq["question"]), "answer": str(faq["answer"])} for faq in faqs]
+
+
+def estimate_memory(chatbot):
+    """
+    Approximate bytes held by a chatbot: the FAQ matrix, retrieval
+    structures, IDF weights, vocabulary, FAQ texts, keyword and spelling
+    indexes, and the response cache and preprocess memos, which grow with
+    traffic up to their size limits.
+    Memory-mapped arrays are counted too, as they occupy page cache.
+    """
+    from compact_index import vocabulary_nbytes
+
+    index = chatbot.nlp_processor.index
+    retriever = index.retriever
+    matrix = retriever.matrix
+    total = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    for name in _RETRIEVER_ARRAYS:
+        array = getattr(retriever, name, None)
+        if array is not None:
+            total += array.nbytes
+
+    vectorizer = index.vectorizer
+    total += vectorizer.idf_.nbytes
+    total += vocabulary_nbytes(vectorizer.vocabulary_)
+
+    total += sum(sys.getsizeof(question) for question in chatbot.questions)
+    total += sum(sys.getsizeof(answer) for answer in chatbot.answers)
+
+    for structure in (index.keywords, index.spelling):
+        if structure is not None:
+            total += structure.nbytes
+    total += chatbot.nlp_processor.memo_nbytes()
+    total += chatbot.response_cache.nbytes()
+    return total
+
+
+class CollectionManager:
+    """
+    Loads FAQ collections on first use and keeps the most recently used
+    ones in memory. After each load, least recently used collections are
+    evicted until the loaded ones fit memory_budget bytes again; the
+    collection just loaded and pinned collections are never evicted.
+    Every REESTIMATE_INTERVAL requests the sizes are re-estimated, so
+    collections whose caches grew are evicted the same way.
+
+    All collections share the process-wide NLTK stopwords, tokenizer and
+    libraries, so a tenant costs little more than its own index.
+    """
+
+    def __init__(self, collections_dir=None, memory_budget=None, index_dir=None,
+                 chatbot_options=None):
+        """
+        collections_dir holds NAME.json collection files; index_dir, if set,
+        persists each collection's index in index_dir/NAME so reloading an
+        evicted collection memory-maps it instead of retraining.
+        chatbot_options are keyword arguments for every FAQChatbot.
+        """
+        self.collections_dir = collections_dir if collections_dir is not None else resolve_collections_path()
+        self.memory_budget = memory_budget if memory_budget is not None else resolve_memory_budget()
+        self.index_dir = index_dir
+        self.chatbot_options = dict(chatbot_options or {})
+
+        # name -> (faqs or None for the bundled data, index_path, pinned)
+        self._registered = {DEFAULT_COLLECTION: (None, None, False)}
+        # name -> (chatbot, estimated bytes), least recently used first
+        self._loaded = OrderedDict()
+        # name -> lock serializing its load; kept only while loading or loaded
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+        self._requests = 0
+
+    def register(self, name, faqs=None, index_path=None, pinned=False):
+        """
+        Register a collection from a list of FAQ dicts (None for the bundled
+        data), replacing any loaded version. pinned collections stay loaded.
+        """
+        self._check_name(name)
+        with self._lock:
+            self._registered[name] = (faqs, index_path, pinned)
+            self._loaded.pop(name, None)
+
+    def names(self):
+        """Return the names of the registered and on-disk collections"""
+        names = set(self._registered)
+        if os.path.isdir(self.collections_dir):
+            for filename in os.listdir(self.collections_dir):
+                name, extension = os.path.splitext(filename)
+                if extension == '.json' and COLLECTION_NAME_PATTERN.match(name):
+                    names.add(name)
+        return sorted(names)
+
+    def loaded(self):
+        """Return the names of the loaded collections, least recently used first"""
+        with self._lock:
+            return list(self._loaded)
+
+    def get(self, name=DEFAULT_COLLECTION):
+        """Return the FAQChatbot for a collection, loading it on first use"""
+        self._check_name(name)
+        with self._lock:
+            self._requests += 1
+            reestimate = self._requests % REESTIMATE_INTERVAL == 0
+            entry = self._loaded.get(name)
+            if entry is not None:
+                self._loaded.move_to_end(name)
+        if entry is not None:
+            if reestimate:
+                self.refresh_sizes(keep=name)
+            return entry[0]
+
+        # Unknown names must not leave a load lock behind
+        if not self._exists(name):
+            raise UnknownCollectionError(f"Unknown FAQ collection '{name}'")
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        # Concurrent requests for the same collection wait for one load
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(name)
+                if entry is not None:
+                    self._loaded.move_to_end(name)
+                    return entry[0]
+
+            try:
+                chatbot = self._build(name)
+                size = estimate_memory(chatbot)
+            except Exception:
+                with self._lock:
+                    self._drop_load_lock(name, load_lock)
+                raise
+            with self._lock:
+                self._loaded[name] = (chatbot, size)
+                self.loads += 1
+                self._evict_over_budget(keep=name)
+            return chatbot
+
+    def evict(self, name):
+        """Unload a collection; returns True if it was loaded"""
+        with self._lock:
+            self._drop_load_lock(name)
+            return self._loaded.pop(name, None) is not None
+
+    def refresh_sizes(self, keep=None):
+        """
+        Re-estimate the memory of the loaded collections and evict least
+        recently used ones, other than keep, while over budget
+        """
+        with self._lock:
+            chatbots = [(name, chatbot) for name, (chatbot, _) in self._loaded.items()]
+        sizes = {name: (chatbot, estimate_memory(chatbot)) for name, chatbot in chatbots}
+        with self._lock:
+            for name, (chatbot, size) in sizes.items():
+                entry = self._loaded.get(name)
+                # Skip collections evicted or reloaded meanwhile
+                if entry is not None and entry[0] is chatbot:
+                    self._loaded[name] = (chatbot, size)
+            self._evict_over_budget(keep=keep)
+
+    def memory_usage(self):
+        """Estimated bytes held by the loaded collections"""
+        with self._lock:
+            return sum(size for _, size in self._loaded.values())
+
+    def stats(self):
+        """Return the loaded collections with their sizes and the load/eviction counters"""
+        with self._lock:
+            return {
+                'loaded': {name: size for name, (_, size) in self._loaded.items()},
+                'memory_bytes': sum(size for _, size in self._loaded.values()),
+                'memory_budget': self.memory_budget,
+                'loads': self.loads,
+                'evictions': self.evictions
+            }
+
+    def _check_name(self, name):
+        if not isinstance(name, str) or not COLLECTION_NAME_PATTERN.match(name):
+            raise UnknownCollectionError(f"Invalid FAQ collection name {name!r}")
+
+    def _exists(self, name):
+        """Whether a collection is registered or has a collection file"""
+        with self._lock:
+            if name in self._registered:
+                return True
+        return os.path.isfile(os.path.join(self.collections_dir, name + '.json'))
+
+    def _drop_load_lock(self, name, load_lock=None):
+        """Forget a collection's load lock (only load_lock, if given); call with the lock held"""
+        if load_lock is None or self._load_locks.get(name) is load_lock:
+            self._load_locks.pop(name, None)
+
+    def _build(self, name):
+        """Build the chatbot of a registered or on-disk collection"""
+        from chatbot import FAQChatbot
+
+        with self._lock:
+            registered = self._registered.get(name)
+        if registered is not None:
+            faqs, index_path, _ = registered
+        else:
+            path = os.path.join(self.collections_dir, name + '.json')
+            if not os.path.isfile(path):
+                raise UnknownCollectionError(f"Unknown FAQ collection '{name}'")
+            faqs, index_path = load_faq_file(path), None
+
+        if index_path is None and self.index_dir is not None:
+            index_path = os.path.join(self.index_dir, name)
+        return FAQChatbot(faqs=faqs, index_path=index_path, **self.chatbot_options)
+
+    def _evict_over_budget(self, keep):
+        """Evict least recently used collections until the budget is met; call with the lock held"""
+        total = sum(size for _, size in self._loaded.values())
+        for name in list(self._loaded):
+            if total <= self.memory_budget:
+                break
+            if name == keep or self._registered.get(name, (None, None, False))[2]:
+                continue
+            total -= self._loaded.pop(name)[1]
+            self._drop_load_lock(name)
+            self.evictions += 1
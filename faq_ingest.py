@@ -0,0 +1,277 @@
+"""
+Streaming FAQ ingestion for FAQ Chatbot
+Builds the FAQ index from JSONL or CSV files of any size, chunk by chunk.
+
+Questions are preprocessed in parallel and the TF-IDF vocabulary is built
+in two passes: the first counts terms, the second vectorizes with the
+selected vocabulary. Preprocessed text is spooled to a temporary file
+between the passes, and the term counts of the second pass to temporary
+array files, so the preprocessing and vectorizing buffers depend on the
+chunk size and worker count, not the file size. What does grow with the
+file is what the served index holds anyway (questions, answers and the
+FAQ matrix, built once from the spooled counts) plus the first pass's
+count of every distinct term, which TfidfVectorizer.fit needs as well.
+The resulting index matches the one train_vectorizer() builds from the
+same questions: same vocabulary and IDF weights, and FAQ vectors equal up
+to floating-point rounding.
+
+Ingest a file and save its index (see index_store.py):
+python faq_ingest.py faqs.jsonl index_dir [--n-jobs N] [--chunk-size N]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from parallel import iter_chunks, map_chunks
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Per-process state of the ingestion workers, set by the initializers
+_worker_processor = None
+_worker_analyzer = None
+_worker_counter = None
+
+
+def iter_faq_file(path, file_format=None):
+    """
+    Yield {"question", "answer"} dicts from a JSONL file (one object per
+    line) or a CSV file with question and answer columns.
+    file_format is 'jsonl' or 'csv'; by default it follows the extension.
+    """
+    if file_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        file_format = 'csv' if extension == '.csv' else 'jsonl'
+
+    with open(path, encoding='utf-8', newline='' if file_format == 'csv' else None) as f:
+        if file_format == 'csv':
+            rows = csv.DictReader(f)
+        elif file_format == 'jsonl':
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            raise ValueError(f"Unknown FAQ file format '{file_format}', expected 'jsonl' or 'csv'")
+
+        for number, row in enumerate(rows, 1):
+            question = row.get("question") if isinstance(row, dict) else None
+            answer = row.get("answer") if isinstance(row, dict) else None
+            if question is None or answer is None:
+                raise ValueError(f"{path}: FAQ {number} needs a question and an answer")
+            yield {"question": str(question), "answer": str(answer)}
+
+
+def _init_analyze_worker(tokenizer, vectorizer):
+    """Set up a worker for the first pass"""
+    global _worker_processor, _worker_analyzer
+    from nlp_processor import NLPProcessor
+    _worker_processor = NLPProcessor(tokenizer=tokenizer)
+    _worker_analyzer = vectorizer.build_analyzer()
+
+
+def _analyze_chunk(questions):
+    """Preprocess questions and count the vectorizer's terms in them"""
+    processed = [_worker_processor.preprocess_text(question) for question in questions]
+    counts = Counter()
+    for text in processed:
+        counts.update(_worker_analyzer(text))
+    return processed, counts
+
+
+def _init_count_worker(vectorizer, vocabulary):
+    """Set up a worker for the second pass"""
+    global _worker_counter
+    from sklearn.feature_extraction.text import CountVectorizer
+    _worker_counter = CountVectorizer(
+        lowercase=vectorizer.lowercase,
+        stop_words=vectorizer.stop_words,
+        ngram_range=vectorizer.ngram_range,
+        vocabulary=vocabulary
+    )
+
+
+def _count_chunk(processed):
+    """Term counts of preprocessed questions as a CSR matrix"""
+    return _worker_counter.transform(processed)
+
+
+def select_vocabulary(term_counts, max_features=None):
+    """
+    Map the most frequent max_features terms to column indices, in the
+    same order and with the same tie-breaking as TfidfVectorizer.fit
+    """
+    import numpy as np
+
+    terms = sorted(term_counts)
+    if max_features is not None and max_features < len(terms):
+        frequencies = np.array([term_counts[term] for term in terms], dtype=np.int64)
+        # Same selection as scikit-learn's CountVectorizer._limit_features
+        selected = (-frequencies).argsort()[:max_features]
+        terms = [terms[i] for i in np.sort(selected)]
+    return {term: column for column, term in enumerate(terms)}
+
+
+class CountSpool:
+    """
+    CSR count matrices appended row-wise to temporary files and read back
+    as a single float64 CSR matrix, so the chunks are never held in memory
+    together or stacked into a second copy
+    """
+
+    def __init__(self, n_columns):
+        self.n_columns = n_columns
+        self.rows = 0
+        self._files = {name: tempfile.TemporaryFile() for name in ('row_nnz', 'indices', 'data')}
+
+    def append(self, counts):
+        """Append the rows of a CSR count matrix with n_columns columns"""
+        import numpy as np
+
+        np.diff(counts.indptr).astype(np.int64).tofile(self._files['row_nnz'])
+        counts.indices.astype(np.int32).tofile(self._files['indices'])
+        counts.data.astype(np.float64).tofile(self._files['data'])
+        self.rows += counts.shape[0]
+
+    def to_csr(self):
+        """All appended rows as one float64 CSR matrix"""
+        import numpy as np
+        from scipy import sparse
+
+        for f in self._files.values():
+            f.flush()
+            f.seek(0)
+        indptr = np.zeros(self.rows + 1, dtype=np.int64)
+        np.cumsum(np.fromfile(self._files['row_nnz'], dtype=np.int64), out=indptr[1:])
+        indices = np.fromfile(self._files['indices'], dtype=np.int32)
+        data = np.fromfile(self._files['data'], dtype=np.float64)
+        return sparse.csr_matrix((data, indices, indptr), shape=(self.rows, self.n_columns), copy=False)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def ingest_faqs(nlp_processor, faqs, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=1, progress=None):
+    """
+    Build and publish nlp_processor's index from an iterable of FAQ dicts,
+    e.g. iter_faq_file(path), without materializing the questions for
+    preprocessing. progress(stage, rows, seconds) is called after every
+    chunk with the rows done and seconds spent in the current stage
+    ('analyze' or 'vectorize'). Returns the row count, elapsed seconds and
+    rows per second.
+    """
+    import numpy as np
+    from sklearn.base import clone
+    from sklearn.preprocessing import normalize
+
+    template = nlp_processor._vectorizer_template
+    questions = []
+    answers = []
+    start = time.perf_counter()
+
+    def question_chunks():
+        for chunk in iter_chunks(faqs, chunk_size):
+            questions.extend(faq["question"] for faq in chunk)
+            answers.extend(faq["answer"] for faq in chunk)
+            yield [faq["question"] for faq in chunk]
+
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+        # Pass 1: preprocess, spool the processed text and count terms
+        term_counts = Counter()
+        rows = 0
+        for processed, counts in map_chunks(
+            _analyze_chunk, question_chunks(), n_jobs,
+            initializer=_init_analyze_worker, initargs=(nlp_processor.tokenizer, template)
+        ):
+            spool.writelines(text + '\n' for text in processed)
+            term_counts.update(counts)
+            rows += len(processed)
+            if progress is not None:
+                progress('analyze', rows, time.perf_counter() - start)
+
+        if not questions:
+            raise ValueError("No FAQs to ingest")
+        vocabulary = select_vocabulary(term_counts, template.max_features)
+        if not vocabulary:
+            raise ValueError("empty vocabulary; the FAQ questions contain only stop words")
+        del term_counts
+
+        # Pass 2: count the selected terms chunk by chunk
+        spool.seek(0)
+        processed_chunks = iter_chunks((line.rstrip('\n') for line in spool), chunk_size)
+        document_frequency = np.zeros(len(vocabulary), dtype=np.int64)
+        rows = 0
+        stage_start = time.perf_counter()
+        with CountSpool(len(vocabulary)) as count_spool:
+            for counts in map_chunks(
+                _count_chunk, processed_chunks, n_jobs,
+                initializer=_init_count_worker, initargs=(template, vocabulary)
+            ):
+                count_spool.append(counts)
+                document_frequency += np.bincount(counts.indices, minlength=len(vocabulary))
+                rows += counts.shape[0]
+                if progress is not None:
+                    progress('vectorize', rows, time.perf_counter() - stage_start)
+            faq_vectors = count_spool.to_csr()
+
+    # Same smoothed IDF and L2 normalization as TfidfVectorizer
+    n_samples = len(questions) + 1
+    idf = np.log(n_samples / (document_frequency.astype(np.float64) + 1)) + 1
+    faq_vectors.data *= idf[faq_vectors.indices]
+    faq_vectors = normalize(faq_vectors, norm='l2', copy=False)
+
+    vectorizer = clone(template)
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = idf
+    nlp_processor.publish_index(vectorizer, faq_vectors, questions, answers, normalized=True)
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': len(questions),
+        'seconds': seconds,
+        'rows_per_second': len(questions) / seconds if seconds else 0.0
+    }
+
+
+def print_progress(stage, rows, seconds):
+    """Progress callback printing rows and rows per second on one line"""
+    rate = rows / seconds if seconds else 0.0
+    print(f"\r{stage}: {rows:,} rows ({rate:,.0f} rows/s)", end='', file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a FAQ index from a JSONL or CSV file")
+    parser.add_argument('path', help="JSONL or CSV file with question and answer fields")
+    # No default: the app's own index directory holds the bundled FAQs
+    parser.add_argument('index_dir', help="Directory to save the index in")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--n-jobs', type=int, default=1, help="Worker processes (-1: one per CPU)")
+    args = parser.parse_args(argv)
+
+    from index_store import save_index
+    from nlp_processor import NLPProcessor
+
+    index_dir = args.index_dir
+    nlp_processor = NLPProcessor()
+    stats = ingest_faqs(
+        nlp_processor, iter_faq_file(args.path, args.format),
+        chunk_size=args.chunk_size, n_jobs=args.n_jobs, progress=print_progress
+    )
+    print(file=sys.stderr)
+    save_index(nlp_processor, index_dir)
+    print(f"✅ Ingested {stats['rows']} FAQs in {stats['seconds']:.1f} s "
+          f"({stats['rows_per_second']:,.0f} rows/s) into {index_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Mutable FAQ store for FAQ Chatbot
+Adds, updates and removes FAQs without refitting the TF-IDF vectorizer on every edit
+"""
+
+import threading
+import time
+
+from scipy import sparse
+
+
+class FAQStore:
+    """
+    Edit the FAQs of a running FAQChatbot.
+
+    Edited questions are vectorized with the current vocabulary and IDF
+    weights and spliced into the FAQ matrix, so an edit costs one transform
+    instead of a full refit. Terms that are new to the vocabulary and IDF
+    drift are picked up by refresh(), which refits the vectorizer once
+    refresh_after_edits edits have accumulated or, if refresh_interval is
+    set, on a background timer.
+
+    Every edit publishes a complete new index in one assignment, so
+    in-flight requests keep matching against the index they started with.
+    """
+
+    def __init__(self, chatbot, refresh_after_edits=100, refresh_interval=None):
+        """Wrap chatbot; FAQs are addressed by ids that stay stable across edits"""
+        self.chatbot = chatbot
+        self.refresh_after_edits = refresh_after_edits
+        self.refresh_interval = refresh_interval
+
+        # Row i of the FAQ matrix belongs to self._ids[i]
+        self._ids = list(range(len(chatbot.faqs)))
+        self._next_id = len(self._ids)
+        self._stale_edits = 0
+        self._last_refresh = time.monotonic()
+        self._lock = threading.RLock()
+
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+        if refresh_interval is not None:
+            self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresh_thread.start()
+
+    @property
+    def stale_edits(self):
+        """Number of edits since the vectorizer was last refit"""
+        return self._stale_edits
+
+    def ids(self):
+        """Return the FAQ ids in index order"""
+        with self._lock:
+            return list(self._ids)
+
+    def get(self, faq_id):
+        """Return the FAQ dict with the given id"""
+        with self._lock:
+            return self.chatbot.faqs[self._position(faq_id)]
+
+    def add(self, question, answer):
+        """Add a FAQ and return its id"""
+        with self._lock:
+            nlp = self.chatbot.nlp_processor
+            index = nlp.index
+            new_row = nlp.vectorize_questions([question], index.vectorizer)
+            faq_vectors = sparse.vstack([index.retriever.matrix, new_row], format='csr')
+
+            keywords = nlp.splice_keywords(index, len(self._ids), len(self._ids), [question])
+            spelling = nlp.splice_spelling(index, [question])
+
+            faq_id = self._next_id
+            self._next_id += 1
+            faqs = self.chatbot.faqs + [{"question": question, "answer": answer}]
+            self._publish(faqs, faq_vectors, self._ids + [faq_id], keywords, spelling)
+            return faq_id
+
+    def update(self, faq_id, question=None, answer=None):
+        """Change the question and/or answer of a FAQ"""
+        with self._lock:
+            position = self._position(faq_id)
+            faq = dict(self.chatbot.faqs[position])
+            if answer is not None:
+                faq["answer"] = answer
+
+            nlp = self.chatbot.nlp_processor
+            index = nlp.index
+            faq_vectors = index.retriever.matrix
+            keywords = index.keywords
+            spelling = index.spelling
+            if question is not None and question != faq["question"]:
+                faq["question"] = question
+                new_row = nlp.vectorize_questions([question], index.vectorizer)
+                faq_vectors = sparse.vstack([
+                    faq_vectors[:position],
+                    new_row,
+                    faq_vectors[position + 1:]
+                ], format='csr')
+                keywords = nlp.splice_keywords(index, position, position + 1, [question])
+                spelling = nlp.splice_spelling(index, [question])
+
+            faqs = list(self.chatbot.faqs)
+            faqs[position] = faq
+            self._publish(faqs, faq_vectors, self._ids, keywords, spelling)
+
+    def remove(self, faq_id):
+        """Remove a FAQ"""
+        with self._lock:
+            position = self._position(faq_id)
+            if len(self._ids) == 1:
+                raise ValueError("Cannot remove the last FAQ")
+
+            nlp = self.chatbot.nlp_processor
+            index = nlp.index
+            faq_vectors = index.retriever.matrix
+            faq_vectors = sparse.vstack([
+                faq_vectors[:position],
+                faq_vectors[position + 1:]
+            ], format='csr')
+            keywords = nlp.splice_keywords(index, position, position + 1, [])
+
+            faqs = self.chatbot.faqs[:position] + self.chatbot.faqs[position + 1:]
+            ids = self._ids[:position] + self._ids[position + 1:]
+            self._publish(faqs, faq_vectors, ids, keywords, index.spelling)
+
+    def refresh(self):
+        """Refit the vectorizer on the current questions to update vocabulary and IDF weights"""
+        with self._lock:
+            self.chatbot.nlp_processor.train_vectorizer(self.chatbot.questions, self.chatbot.answers)
+            self._stale_edits = 0
+            self._last_refresh = time.monotonic()
+
+    def refresh_if_due(self):
+        """Refresh if enough edits accumulated or the refresh interval passed; returns True if refreshed"""
+        with self._lock:
+            if self._stale_edits == 0:
+                return False
+            due = self._stale_edits >= self.refresh_after_edits
+            if self.refresh_interval is not None:
+                due = due or time.monotonic() - self._last_refresh >= self.refresh_interval
+            if due:
+                self.refresh()
+            return due
+
+    def close(self):
+        """Stop the background refresh timer"""
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+            self._refresh_thread = None
+
+    def _position(self, faq_id):
+        try:
+            return self._ids.index(faq_id)
+        except ValueError:
+            raise KeyError(f"No FAQ with id {faq_id}")
+
+    def _publish(self, faqs, faq_vectors, ids, keywords, spelling):
+        """Publish the edited FAQs, matrix, keyword index and spelling corrector as a new index"""
+        nlp = self.chatbot.nlp_processor
+        questions = [faq["question"] for faq in faqs]
+        answers = [faq["answer"] for faq in faqs]
+        # Rows are transformed by a fitted TF-IDF vectorizer, so already normalized
+        nlp.publish_index(nlp.index.vectorizer, faq_vectors, questions, answers, normalized=True,
+                          keywords=keywords, spelling=spelling)
+        self._set_faqs(faqs)
+        self._ids = ids
+        self._stale_edits += 1
+
+        if self._stale_edits >= self.refresh_after_edits:
+            self.refresh()
+
+    def _set_faqs(self, faqs):
+        """Replace the chatbot's FAQ lists with new lists"""
+        self.chatbot.faqs = faqs
+        self.chatbot.questions = [faq["question"] for faq in faqs]
+        self.chatbot.answers = [faq["answer"] for faq in faqs]
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self.refresh_interval):
+            self.refresh_if_due()
@@ -0,0 +1,327 @@
+"""
+Persisted FAQ index for FAQ Chatbot
+Saves the fitted TF-IDF vocabulary, IDF weights and CSR FAQ matrix to disk
+and memory-maps them read-only at startup instead of retraining.
+
+Build the index for the bundled FAQs with:
+python index_store.py [index_dir]
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+# numpy and scipy are imported inside the functions that need them, so
+# resolving the index path does not pay for importing them
+
+# Bump when the on-disk layout changes so stale indexes are rebuilt
+INDEX_FORMAT_VERSION = 1
+
+DEFAULT_INDEX_DIR = "faq_index"
+
+MANIFEST_FILE = "manifest.json"
+VOCABULARY_FILE = "vocabulary.json"
+ARRAY_FILES = ("idf", "data", "indices", "indptr")
+
+# Keyword postings of hybrid scoring (see keyword_index.py), saved when present
+KEYWORDS_FILE = "keywords.json"
+KEYWORD_ARRAY_FILES = ("keyword_indptr", "keyword_rows")
+
+# Words spelling correction ignores (see spelling.py), saved when enabled
+SPELLING_IGNORE_FILE = "spelling_ignore.json"
+
+# Lock file next to the index directory serializing builds of that index
+LOCK_SUFFIX = ".lock"
+
+
+def resolve_index_path():
+    """Index directory from FAQ_INDEX_PATH, defaulting to faq_index/ next to this file"""
+    return os.environ.get(
+        'FAQ_INDEX_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_INDEX_DIR)
+    )
+
+
+def content_hash(faq_questions, config):
+    """
+    Hash the FAQ questions together with the processor configuration.
+    The index only depends on these, so answers can change without a rebuild.
+    """
+    payload = json.dumps({
+        'format_version': INDEX_FORMAT_VERSION,
+        'config': config,
+        'questions': list(faq_questions)
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def read_manifest(index_dir):
+    """Return the manifest of the index in index_dir, or None if there is none"""
+    try:
+        with open(os.path.join(index_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def index_lock(index_dir, shared=False):
+    """
+    Hold a lock on index_dir across processes and threads, so workers
+    cold-starting together build and swap the index one at a time.
+    shared=True lets readers load together while keeping writers out.
+    Without fcntl (Windows) nothing is locked; save_index then keeps the
+    index of whichever writer swapped it in first.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+
+    lock_path = os.path.abspath(index_dir).rstrip(os.sep) + LOCK_SUFFIX
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def save_index(nlp_processor, index_dir):
+    """
+    Save a trained NLPProcessor's vocabulary, IDF weights and FAQ matrix.
+    Files are written to a new hidden directory next to index_dir, and
+    index_dir, a symlink to the current one, is replaced in one rename
+    (see _swap_in), so readers never see a missing or partial index.
+    """
+    with index_lock(index_dir):
+        return _write_index(nlp_processor, index_dir)
+
+
+def _write_index(nlp_processor, index_dir):
+    """save_index() without taking the index lock"""
+    import numpy as np
+    from scipy import sparse
+
+    if nlp_processor.faq_vectors is None:
+        raise ValueError("Vectorizer must be trained first. Call train_vectorizer()")
+
+    config = nlp_processor.index_config()
+    matrix = sparse.csr_matrix(nlp_processor.faq_vectors)
+    vectorizer = nlp_processor.vectorizer
+
+    # Store the vocabulary as a list ordered by feature index
+    vocabulary = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        vocabulary[column] = term
+
+    parent = os.path.dirname(os.path.abspath(index_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.faq_index_', dir=parent)
+    try:
+        arrays = {
+            'idf': vectorizer.idf_,
+            'data': matrix.data,
+            'indices': matrix.indices,
+            'indptr': matrix.indptr
+        }
+        for name in ARRAY_FILES:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+
+        with open(os.path.join(tmp_dir, VOCABULARY_FILE), 'w', encoding='utf-8') as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+
+        keywords = nlp_processor.index.keywords
+        if keywords is not None:
+            keyword_arrays = {'keyword_indptr': keywords.indptr, 'keyword_rows': keywords.rows}
+            for name in KEYWORD_ARRAY_FILES:
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(keyword_arrays[name]))
+            with open(os.path.join(tmp_dir, KEYWORDS_FILE), 'w', encoding='utf-8') as f:
+                json.dump(keywords.keywords, f, ensure_ascii=False)
+
+        spelling = nlp_processor.index.spelling
+        if spelling is not None:
+            with open(os.path.join(tmp_dir, SPELLING_IGNORE_FILE), 'w', encoding='utf-8') as f:
+                json.dump(sorted(spelling.ignore), f, ensure_ascii=False)
+
+        manifest = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'content_hash': content_hash(nlp_processor.faq_questions, config),
+            'config': config,
+            'shape': list(matrix.shape)
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        try:
+            _swap_in(tmp_dir, index_dir)
+        except OSError:
+            # Another unlocked writer swapped its index in first; keep it
+            winner = read_manifest(index_dir)
+            if winner is None:
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            manifest = winner
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return manifest
+
+
+def _swap_in(new_dir, index_dir):
+    """
+    Make new_dir the index in index_dir. index_dir is a symlink to the
+    current index directory, repointed with os.replace in one atomic step,
+    after which the previous directory is deleted. An index_dir that is
+    still a plain directory (older saves) is moved aside first, and where
+    symlinks are unavailable new_dir is renamed to index_dir instead.
+    """
+    parent = os.path.dirname(new_dir)
+    previous = os.path.realpath(index_dir) if os.path.islink(index_dir) else None
+    old_dir = None
+    if previous is None and os.path.isdir(index_dir):
+        old_dir = tempfile.mkdtemp(prefix='.faq_index_old_', dir=parent)
+        os.rename(index_dir, os.path.join(old_dir, 'index'))
+
+    link = new_dir + '.link'
+    try:
+        os.symlink(os.path.basename(new_dir), link)
+    except (OSError, NotImplementedError):
+        os.rename(new_dir, index_dir)
+    else:
+        os.replace(link, index_dir)
+
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    # Only delete directories save_index created
+    if previous is not None and os.path.basename(previous).startswith('.faq_index_'):
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def resolve_index_dir(index_dir):
+    """
+    The directory holding the current version of the index in index_dir.
+    Read every file of one load from it, so a concurrent save cannot mix
+    two versions.
+    """
+    return os.path.realpath(index_dir)
+
+
+def load_index(index_dir, mmap=True, expected_hash=None):
+    """
+    Load a saved index.
+    Returns (manifest, vocabulary, idf, faq_matrix); with mmap=True the
+    arrays are read-only memory maps shared between processes.
+    expected_hash, if given, must match the manifest's content hash.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    index_dir = resolve_index_dir(index_dir)
+    manifest = read_manifest(index_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No FAQ index found in {index_dir}")
+    if manifest.get('format_version') != INDEX_FORMAT_VERSION:
+        raise ValueError(f"Unsupported FAQ index format in {index_dir}")
+    if expected_hash is not None and manifest.get('content_hash') != expected_hash:
+        raise ValueError(f"FAQ index in {index_dir} does not match the FAQ questions")
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+        for name in ARRAY_FILES
+    }
+
+    with open(os.path.join(index_dir, VOCABULARY_FILE), encoding='utf-8') as f:
+        vocabulary = {term: column for column, term in enumerate(json.load(f))}
+
+    # copy=False keeps the CSR arrays backed by the memory maps
+    faq_matrix = sparse.csr_matrix(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=tuple(manifest['shape']),
+        copy=False
+    )
+
+    return manifest, vocabulary, arrays['idf'], faq_matrix
+
+
+def load_keyword_postings(index_dir, mmap=True):
+    """
+    Load the keyword postings saved with an index as (keywords, indptr,
+    rows) for KeywordIndex.from_postings, or None if none were saved
+    """
+    import numpy as np
+
+    path = os.path.join(index_dir, KEYWORDS_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        keywords = json.load(f)
+    mmap_mode = 'r' if mmap else None
+    indptr, rows = (
+        np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode=mmap_mode) for name in KEYWORD_ARRAY_FILES
+    )
+    return keywords, indptr, rows
+
+
+def load_spelling_ignore(index_dir):
+    """Load the words spelling correction ignores saved with an index, or None if none were saved"""
+    path = os.path.join(index_dir, SPELLING_IGNORE_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_or_build_index(nlp_processor, faq_questions, index_dir, faq_answers=None, mmap=True):
+    """
+    Load the index in index_dir into nlp_processor, rebuilding it first if
+    it is missing or its content hash does not match faq_questions.
+    Concurrent callers wait for one rebuild under the index lock and then
+    load its result. Loads hold the lock shared, so no save swaps the
+    index mid-load, and check the loaded content hash.
+    Returns True if this call rebuilt the index.
+    """
+    expected_hash = content_hash(faq_questions, nlp_processor.index_config())
+
+    def stale():
+        manifest = read_manifest(index_dir)
+        return manifest is None or manifest.get('content_hash') != expected_hash
+
+    with index_lock(index_dir, shared=True):
+        if not stale():
+            nlp_processor.load_index(index_dir, faq_questions, faq_answers, mmap=mmap,
+                                     expected_hash=expected_hash)
+            return False
+
+    with index_lock(index_dir):
+        # Another worker may have rebuilt it while this one waited
+        rebuilt = stale()
+        if rebuilt:
+            nlp_processor.train_vectorizer(faq_questions, faq_answers)
+            _write_index(nlp_processor, index_dir)
+        nlp_processor.load_index(index_dir, faq_questions, faq_answers, mmap=mmap,
+                                 expected_hash=expected_hash)
+    return rebuilt
+
+
+def main(index_dir=DEFAULT_INDEX_DIR):
+    """Build the index for the bundled FAQs"""
+    from faq_data import get_questions
+    from nlp_processor import NLPProcessor
+
+    nlp_processor = NLPProcessor()
+    rebuilt = load_or_build_index(nlp_processor, get_questions(), index_dir)
+    state = "Built" if rebuilt else "Up to date:"
+    print(f"✅ {state} FAQ index in {index_dir} ({nlp_processor.faq_vectors.shape[0]} FAQs)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,124 @@
+"""
+Inverted-index retrieval for FAQ Chatbot
+Scores only FAQs that share a term with the query, with MaxScore pruning,
+and returns exactly the same top k as the full scan.
+"""
+
+import numpy as np
+
+from retrieval import SparseRetriever, select_top_k, _first_indices_not_in
+
+
+def rounding_slack(dtype, score_bound, n_terms):
+    """
+    Slack for float rounding when comparing accumulated scores with bounds.
+    Survivors are re-scored in the matrix dtype, and a sum of n_terms
+    products bounded by score_bound can round by up to n_terms machine
+    epsilons of score_bound each way, so two scores that differ by less
+    may tie in the re-scoring.
+    """
+    return 2 * np.finfo(dtype).eps * score_bound * max(n_terms, 1)
+
+
+class InvertedIndexRetriever(SparseRetriever):
+    """
+    Exact top-k retrieval over term -> posting lists.
+
+    The postings of every term are the FAQ rows containing it, in row
+    order, with their weights; each term also keeps its largest weight.
+    Query terms are processed from the largest to the smallest upper bound
+    (query weight x largest weight). Once the k-th best partial score
+    exceeds the summed bounds of the terms left, no unseen FAQ can reach
+    the top k (MaxScore), so the remaining terms only update the FAQs
+    already found, and FAQs that can no longer reach the k-th score are
+    dropped. The survivors are re-scored against their CSR rows, so
+    similarities and tie-breaking are identical to SparseRetriever.search.
+    """
+
+    def __init__(self, faq_vectors, top_k=5, normalized=False):
+        super().__init__(faq_vectors, top_k=top_k, normalized=normalized)
+        self._build_postings()
+
+    def _build_postings(self):
+        """Build row-ordered posting lists and the largest weight per term"""
+        csc = self.matrix.tocsc()
+        csc.sort_indices()
+        self.postings_indptr = csc.indptr
+        self.postings_rows = csc.indices
+        self.postings_weights = csc.data
+        self.max_weights = np.zeros(csc.shape[1])
+        non_empty = np.diff(csc.indptr) > 0
+        self.max_weights[non_empty] = np.maximum.reduceat(csc.data, csc.indptr[:-1][non_empty])
+
+    def candidates(self, query_vector, k):
+        """
+        Return the sorted rows that can still be in the top k of
+        query_vector after MaxScore pruning
+        """
+        query_vector = query_vector.tocsr()
+        terms = query_vector.indices
+        weights = query_vector.data
+        upper_bounds = weights * self.max_weights[terms]
+        order = np.argsort(-upper_bounds, kind='stable')
+        remaining = upper_bounds.sum()
+        slack = rounding_slack(self.matrix.dtype, remaining, len(terms))
+
+        rows = np.empty(0, dtype=self.postings_rows.dtype)
+        scores = np.empty(0)
+        accepting_new = True
+        for term, weight, bound in zip(terms[order], weights[order], upper_bounds[order]):
+            remaining -= bound
+            start, end = self.postings_indptr[term], self.postings_indptr[term + 1]
+            if start == end:
+                # Vocabulary term no FAQ contains, e.g. after FAQStore.remove
+                continue
+            term_rows = self.postings_rows[start:end]
+            term_scores = weight * self.postings_weights[start:end]
+
+            if len(rows) == 0:
+                rows, scores = term_rows, term_scores
+            elif accepting_new:
+                # Merge the term's postings into the accumulated scores
+                rows, inverse = np.unique(np.concatenate((rows, term_rows)), return_inverse=True)
+                scores = np.bincount(inverse, np.concatenate((scores, term_scores)), len(rows))
+            else:
+                # Only look up the rows already found
+                positions = np.searchsorted(term_rows, rows)
+                positions[positions == len(term_rows)] = 0
+                hits = term_rows[positions] == rows
+                scores[hits] += term_scores[positions[hits]]
+
+            if len(rows) >= k:
+                threshold = scores[np.argpartition(-scores, k - 1)[k - 1]] - slack
+                accepting_new = accepting_new and threshold <= remaining
+                keep = scores + remaining >= threshold
+                rows, scores = rows[keep], scores[keep]
+        return rows
+
+    def search(self, query_vector, k=None):
+        """
+        Return (indices, similarities) of the top k FAQ rows, best first,
+        scoring only FAQs that share a term with the query
+        """
+        if k is None:
+            k = self.top_k
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        rows = self.candidates(query_vector, k)
+        similarities = self.matrix[rows] @ self.dense_query(query_vector)
+        selected = select_top_k(similarities, k)
+        top_indices = rows[selected].astype(np.intp)
+        top_scores = similarities[selected]
+
+        if len(top_indices) < k:
+            # Fill the remaining slots with zero-similarity FAQs in index order
+            padding = _first_indices_not_in(rows, k - len(top_indices), self.n_faqs)
+            top_indices = np.concatenate((top_indices, padding))
+            top_scores = np.concatenate((top_scores, np.zeros(len(padding))))
+        return top_indices, top_scores
+
+    def search_batch(self, query_vectors, k=None):
+        """search() for every row of a query matrix"""
+        query_vectors = query_vectors.tocsr()
+        return [self.search(query_vectors[row], k) for row in range(query_vectors.shape[0])]
@@ -0,0 +1,202 @@
+"""
+Keyword index for FAQ Chatbot
+Maps FAQ keywords and noun phrases, extracted once at build time, to the
+FAQs containing them, and blends keyword overlap with the TF-IDF cosine.
+"""
+
+import sys
+
+import numpy as np
+
+from response_cache import LRUCache
+from retrieval import select_top_k
+
+# Longest keyword phrase, in words, looked up in a query
+MAX_PHRASE_WORDS = 4
+
+# Query words considered for keyword lookup; bounds the per-request cost
+MAX_QUERY_WORDS = 32
+
+# TF-IDF candidates re-scored with keywords, on top of the keyword hits
+HYBRID_CANDIDATES = 50
+
+
+class KeywordIndex:
+    """
+    Keyword -> FAQ rows index built from per-FAQ keyword lists.
+
+    Keywords are normalized with preprocess_text, so a query is matched
+    by looking up its preprocessed word n-grams: no tagging happens per
+    request, and the looked-up keywords are cached per preprocessed
+    question. Each keyword is weighted by its inverse document frequency
+    and an FAQ's keyword score is the weighted Dice overlap between its
+    keywords and the query's, between 0 and 1.
+
+    The postings are stored like a CSC matrix: the FAQ rows of keyword i
+    are rows[indptr[i]:indptr[i + 1]], in ascending order. index_store.py
+    saves and memory-maps these arrays, and replace_rows() splices edited
+    FAQs in without extracting keywords for the others.
+    """
+
+    def __init__(self, faq_keywords, cache_size=10000):
+        """faq_keywords is one iterable of normalized keywords per FAQ row"""
+        keywords, columns = [], {}
+        incidence = _incidence_matrix(faq_keywords, keywords, columns)
+        self._set_postings(keywords, incidence.tocsc(), columns, cache_size)
+
+    @classmethod
+    def from_postings(cls, keywords, indptr, rows, n_faqs, cache_size=10000):
+        """Build the index from saved postings: keywords in column order and their CSC arrays"""
+        from scipy import sparse
+
+        index = cls.__new__(cls)
+        postings = sparse.csc_matrix(
+            (np.ones(len(rows), dtype=np.int8), rows, indptr), shape=(n_faqs, len(keywords)), copy=False
+        )
+        index._set_postings(list(keywords), postings, None, cache_size)
+        return index
+
+    def _set_postings(self, keywords, postings, columns, cache_size):
+        """Store the postings of a CSC FAQ x keyword matrix and derive the weights"""
+        postings.sort_indices()
+        self.keywords = keywords
+        self.columns = columns if columns is not None else {
+            keyword: column for column, keyword in enumerate(keywords)
+        }
+        self.n_faqs = postings.shape[0]
+        self.indptr = postings.indptr
+        self.rows = postings.indices
+        self.df = np.diff(self.indptr)
+
+        # Keywords of removed FAQs keep a column with no rows and no weight
+        self.keyword_weights = np.zeros(len(keywords))
+        present = self.df > 0
+        self.keyword_weights[present] = np.log1p(self.n_faqs / self.df[present])
+        self.faq_weights = np.bincount(
+            self.rows, np.repeat(self.keyword_weights, self.df), minlength=self.n_faqs
+        )
+        self.phrase_words = min(
+            max((keyword.count(' ') + 1 for keyword in keywords), default=1), MAX_PHRASE_WORDS
+        )
+        self.cache_size = cache_size
+        self._query_cache = LRUCache(maxsize=cache_size)
+        self._index_nbytes = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.df))
+
+    @property
+    def nbytes(self):
+        """Approximate bytes held by the postings, weights and query cache"""
+        if self._index_nbytes is None:
+            total = sys.getsizeof(self.keywords) + sys.getsizeof(self.columns)
+            total += sum(sys.getsizeof(keyword) for keyword in self.keywords)
+            for array in (self.indptr, self.rows, self.df, self.keyword_weights, self.faq_weights):
+                total += array.nbytes
+            self._index_nbytes = total
+        return self._index_nbytes + self._query_cache.nbytes()
+
+    def replace_rows(self, start, stop, faq_keywords):
+        """
+        Return a new KeywordIndex with FAQ rows start:stop replaced by one
+        row per keyword iterable in faq_keywords, e.g. (n, n, [keywords])
+        appends a FAQ and (i, i + 1, []) removes FAQ i. The other FAQs'
+        postings are copied, not extracted again.
+        """
+        from scipy import sparse
+
+        keywords, columns = list(self.keywords), dict(self.columns)
+        new_rows = _incidence_matrix(faq_keywords, keywords, columns)
+        current = sparse.csc_matrix(
+            (np.ones(len(self.rows), dtype=np.int8), self.rows, self.indptr),
+            shape=(self.n_faqs, len(self.keywords))
+        ).tocsr()
+        current.resize(self.n_faqs, len(keywords))
+        incidence = sparse.vstack([current[:start], new_rows, current[stop:]], format='csc')
+
+        index = KeywordIndex.__new__(KeywordIndex)
+        index._set_postings(keywords, incidence, columns, self.cache_size)
+        return index
+
+    def postings(self, keyword):
+        """FAQ rows containing keyword, ascending"""
+        column = self.columns[keyword]
+        return self.rows[self.indptr[column]:self.indptr[column + 1]]
+
+    def query_keywords(self, processed_question):
+        """Return the indexed keywords among the word n-grams of a preprocessed question"""
+        keywords = self._query_cache.get(processed_question)
+        if keywords is None:
+            words = processed_question.split()[:MAX_QUERY_WORDS]
+            found = set()
+            for size in range(1, self.phrase_words + 1):
+                for start in range(len(words) - size + 1):
+                    column = self.columns.get(' '.join(words[start:start + size]))
+                    if column is not None and self.df[column]:
+                        found.add(self.keywords[column])
+            keywords = tuple(sorted(found))
+            self._query_cache.put(processed_question, keywords)
+        return keywords
+
+    def score(self, processed_question):
+        """
+        Return (rows, scores) of the FAQs sharing a keyword with the
+        question, rows sorted ascending
+        """
+        keywords = self.query_keywords(processed_question)
+        if not keywords:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+
+        columns = np.array([self.columns[keyword] for keyword in keywords])
+        rows = np.concatenate([self.postings(keyword) for keyword in keywords])
+        overlap = np.repeat(self.keyword_weights[columns], self.df[columns])
+        rows, inverse = np.unique(rows, return_inverse=True)
+        overlap = np.bincount(inverse, overlap, len(rows))
+
+        query_weight = self.keyword_weights[columns].sum()
+        return rows, 2 * overlap / (query_weight + self.faq_weights[rows])
+
+
+def _incidence_matrix(faq_keywords, keywords, columns):
+    """
+    CSR FAQ x keyword matrix of ones for per-FAQ keyword iterables,
+    appending keywords not in columns to keywords and columns
+    """
+    from scipy import sparse
+
+    row_indices, column_indices = [], []
+    n_rows = 0
+    for row, faq in enumerate(faq_keywords):
+        for keyword in set(faq):
+            if keyword:
+                column = columns.get(keyword)
+                if column is None:
+                    column = columns[keyword] = len(keywords)
+                    keywords.append(keyword)
+                row_indices.append(row)
+                column_indices.append(column)
+        n_rows = row + 1
+    return sparse.csr_matrix(
+        (np.ones(len(row_indices), dtype=np.int8), (row_indices, column_indices)),
+        shape=(n_rows, len(keywords))
+    )
+
+
+def hybrid_search(retriever, keyword_index, query_vector, processed_question, k, keyword_weight):
+    """
+    Return (indices, scores) of the top k FAQs by
+    (1 - keyword_weight) * cosine + keyword_weight * keyword score.
+    Candidates are the TF-IDF top matches plus every keyword hit; their
+    cosines are computed exactly.
+    """
+    keyword_rows, keyword_scores = keyword_index.score(processed_question)
+    cosine_rows, _ = retriever.search(query_vector, k=max(k, HYBRID_CANDIDATES))
+
+    candidates = np.union1d(cosine_rows, keyword_rows)
+    cosines = retriever.matrix[candidates] @ retriever.dense_query(query_vector)
+    keyword_part = np.zeros(len(candidates))
+    keyword_part[np.searchsorted(candidates, keyword_rows)] = keyword_scores
+
+    scores = (1 - keyword_weight) * cosines + keyword_weight * keyword_part
+    selected = select_top_k(scores, k)
+    return candidates[selected], scores[selected]
@@ -0,0 +1,189 @@
+"""
+Metrics for FAQ Chatbot
+Lightweight counters and histograms rendered in the Prometheus text format.
+
+Instrumentation is on by default; set FAQ_METRICS=0 to turn it off. When
+off, start_timer() returns None and every record call returns right away,
+so the hot path only pays for a few attribute lookups.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram buckets for stage latencies, in seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Histogram buckets for match confidence (cosine similarity)
+CONFIDENCE_BUCKETS = (0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+def _format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    type_name = 'counter'
+
+    def __init__(self, registry, name, documentation, label_names=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """Add amount to the counter for the given label values"""
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+            for labels, value in items
+        ]
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and optional labels"""
+
+    type_name = 'histogram'
+
+    def __init__(self, registry, name, documentation, buckets, label_names=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = tuple(label_names)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record one observation for the given label values"""
+        if not self.registry.enabled:
+            return
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bucket] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *label_values):
+        state = self._values.get(label_values)
+        return state[2] if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((labels, [list(state[0]), state[1], state[2]])
+                           for labels, state in self._values.items())
+        lines = []
+        for labels, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, labels, [('le', le)])} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them for a /metrics endpoint"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, label_names=()):
+        metric = Counter(self, name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, buckets, label_names=()):
+        metric = Histogram(self, name, documentation, buckets, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """
+        Add a callable returning (name, type, documentation, value) tuples
+        that are read at render time, e.g. counters kept elsewhere
+        """
+        self._collectors.append(collector)
+
+    def start_timer(self):
+        """Return a start time for observe_stage(), or None when disabled"""
+        return time.perf_counter() if self.enabled else None
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        for collector in self._collectors:
+            for name, type_name, documentation, value in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry(
+    enabled=os.environ.get('FAQ_METRICS', '1').lower() not in ('0', 'false', 'no', 'off')
+)
+
+STAGE_LATENCY = METRICS.histogram(
+    'faq_stage_latency_seconds',
+    'Latency of each request stage in seconds',
+    LATENCY_BUCKETS,
+    ('stage',)
+)
+
+REQUESTS = METRICS.counter(
+    'faq_requests_total',
+    'HTTP requests by endpoint and outcome',
+    ('endpoint', 'outcome')
+)
+
+RESPONSES = METRICS.counter(
+    'faq_responses_total',
+    'Chatbot responses by match outcome',
+    ('outcome',)
+)
+
+MATCH_CONFIDENCE = METRICS.histogram(
+    'faq_match_confidence',
+    'Similarity of the best matching FAQ per response',
+    CONFIDENCE_BUCKETS
+)
+
+
+def observe_stage(stage, start):
+    """Record the time since start (from METRICS.start_timer()) for stage"""
+    if start is None:
+        return
+    STAGE_LATENCY.observe(time.perf_counter() - start, stage)
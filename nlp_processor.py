@@ -1,156 +1,815 @@
-"""
-NLP Processor for FAQ Chatbot
-Handles text preprocessing, tokenization, and similarity matching
-"""
-
-import re
-import nltk
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from textblob import TextBlob
-import string
-
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-
-class NLPProcessor:
-    def __init__(self):
-        """Initialize the NLP processor with stopwords and punctuation"""
-        self.stop_words = set(stopwords.words('english'))
-        self.punctuation = string.punctuation
-        self.vectorizer = TfidfVectorizer(
-            lowercase=True,
-            stop_words='english',
-            ngram_range=(1, 2),
-            max_features=1000
-        )
-        self.faq_vectors = None
-        self.faq_questions = None
-        
-    def preprocess_text(self, text):
-        """
-        Preprocess text by:
-        1. Converting to lowercase
-        2. Removing punctuation
-        3. Tokenizing
-        4. Removing stopwords
-        5. Lemmatizing
-        """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove punctuation
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords and short words
-        tokens = [token for token in tokens if token not in self.stop_words and len(token) > 2]
-        
-        # Join tokens back into text
-        processed_text = ' '.join(tokens)
-        
-        return processed_text
-    
-    def extract_keywords(self, text):
-        """Extract important keywords from text using TextBlob"""
-        blob = TextBlob(text)
-        # Get noun phrases and important words
-        keywords = []
-        
-        # Add noun phrases
-        keywords.extend(blob.noun_phrases)
-        
-        # Add important words (nouns, adjectives, verbs)
-        for word, tag in blob.tags:
-            if tag.startswith(('NN', 'JJ', 'VB')) and len(word) > 2:
-                keywords.append(word.lower())
-        
-        return list(set(keywords))
-    
-    def train_vectorizer(self, faq_questions):
-        """
-        Train the TF-IDF vectorizer on FAQ questions
-        """
-        self.faq_questions = faq_questions
-        
-        # Preprocess all questions
-        processed_questions = [self.preprocess_text(q) for q in faq_questions]
-        
-        # Fit and transform the vectorizer
-        self.faq_vectors = self.vectorizer.fit_transform(processed_questions)
-        
-        return self.faq_vectors
-    
-    def find_best_match(self, user_question, threshold=0.1):
-        """
-        Find the best matching FAQ question using cosine similarity
-        Returns (best_match_index, similarity_score, processed_question)
-        """
-        if self.faq_vectors is None:
-            raise ValueError("Vectorizer must be trained first. Call train_vectorizer()")
-        
-        # Preprocess user question
-        processed_question = self.preprocess_text(user_question)
-        
-        # Transform user question
-        user_vector = self.vectorizer.transform([processed_question])
-        
-        # Calculate cosine similarity
-        similarities = cosine_similarity(user_vector, self.faq_vectors).flatten()
-        
-        # Find the best match
-        best_match_index = np.argmax(similarities)
-        best_similarity = similarities[best_match_index]
-        
-        # Return results
-        return {
-            'index': best_match_index,
-            'similarity': best_similarity,
-            'question': self.faq_questions[best_match_index],
-            'processed_question': processed_question,
-            'threshold': threshold,
-            'is_match': best_similarity >= threshold
-        }
-    
-    def get_similarity_analysis(self, user_question):
-        """
-        Get detailed similarity analysis for debugging
-        """
-        if self.faq_vectors is None:
-            return None
-        
-        processed_question = self.preprocess_text(user_question)
-        user_vector = self.vectorizer.transform([processed_question])
-        similarities = cosine_similarity(user_vector, self.faq_vectors).flatten()
-        
-        # Get top 5 matches
-        top_indices = np.argsort(similarities)[::-1][:5]
-        
-        analysis = {
-            'user_question': user_question,
-            'processed_question': processed_question,
-            'top_matches': []
-        }
-        
-        for idx in top_indices:
-            analysis['top_matches'].append({
-                'index': idx,
-                'question': self.faq_questions[idx],
-                'similarity': similarities[idx]
-            })
-        
-        return analysis 
\ No newline at end of file
+"""
+NLP Processor for FAQ Chatbot
+Handles text preprocessing, tokenization, and similarity matching
+"""
+
+import re
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+import string
+
+# nltk, scikit-learn, scipy and TextBlob are imported on first use so that
+# importing this module stays fast and never touches the network
+from tokenization import get_tokenizer
+from response_cache import LRUCache, dict_nbytes
+from metrics import METRICS, observe_stage
+
+class NLTKDataMissingError(LookupError):
+    """Raised when required NLTK data is not installed"""
+
+def require_nltk_data(resource, package):
+    """
+    Check that an NLTK data package is installed. Nothing is downloaded
+    here; a missing package raises NLTKDataMissingError explaining how to
+    install it.
+    """
+    import nltk
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        raise missing_nltk_data(package) from None
+
+def missing_nltk_data(package):
+    """NLTKDataMissingError for a package, with the command that installs it"""
+    return NLTKDataMissingError(
+        f"NLTK data package '{package}' is not installed. Run 'python download_nltk_data.py' "
+        f"(or nltk.download('{package}')) on a machine with network access."
+    )
+
+def require_textblob_corpora():
+    """Check the NLTK data TextBlob needs for the noun phrases and tags of extract_keywords"""
+    from textblob.download_corpora import MIN_CORPORA
+    
+    for package in MIN_CORPORA:
+        # WordNet is only used for lemmatizing, which keyword extraction skips
+        if package == 'wordnet':
+            continue
+        if package.startswith('punkt'):
+            category = 'tokenizers'
+        elif 'tagger' in package:
+            category = 'taggers'
+        else:
+            category = 'corpora'
+        require_nltk_data(f'{category}/{package}', package)
+
+# English stopwords, loaded once per process
+_stop_words = None
+
+def load_stop_words():
+    """Return the NLTK English stopwords as a frozenset"""
+    global _stop_words
+    if _stop_words is None:
+        require_nltk_data('corpora/stopwords', 'stopwords')
+        from nltk.corpus import stopwords
+        _stop_words = frozenset(stopwords.words('english'))
+    return _stop_words
+
+# Characters removed before tokenizing
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# Questions per task when preprocessing a corpus in worker processes
+PREPROCESS_CHUNK_SIZE = 5000
+
+# NLPProcessor of a preprocessing worker process, set by _init_preprocess_worker
+_worker_processor = None
+
+def _init_preprocess_worker(tokenizer, keyword_extractor=None):
+    global _worker_processor
+    _worker_processor = NLPProcessor(tokenizer=tokenizer, keyword_extractor=keyword_extractor)
+
+def _preprocess_chunk(texts):
+    return [_worker_processor.preprocess_text(text) for text in texts]
+
+def _keywords_chunk(texts):
+    return [_worker_processor.normalized_keywords(text) for text in texts]
+
+# Everything matching reads for one version of the FAQ index. Each change
+# builds a new FAQIndex and publishes it by replacing NLPProcessor.index,
+# so a request that grabbed the index never sees a half-updated one.
+# Readers take no lock: threads serving requests share one index and keep
+# matching against the one they grabbed while a reload builds the next.
+# keywords is the KeywordIndex of hybrid scoring and spelling the
+# SpellingCorrector of the vocabulary, None when they are off.
+FAQIndex = namedtuple('FAQIndex', ['version', 'vectorizer', 'retriever', 'questions', 'answers',
+                                   'keywords', 'spelling'], defaults=(None, None))
+
+class NLPProcessor:
+    def __init__(self, top_k=5, tokenizer='regex', retrieval='exact', retrieval_options=None,
+                 n_jobs=1, preprocess_cache_size=10000, token_cache_size=100000, compact=False,
+                 scoring='tfidf', keyword_weight=0.3, keyword_extractor=None,
+                 spelling_correction=False, max_edit_distance=2):
+        """
+        Initialize the NLP processor with stopwords and punctuation.
+        top_k is the default number of matches returned by the retrieval engine.
+        tokenizer is a name from tokenization.TOKENIZERS ('regex', 'nltk')
+        or an object with a tokenize(text) method.
+        retrieval is 'exact', 'inverted', 'approximate' or 'sharded' (see retrieval.make_retriever);
+        retrieval_options are passed to the retrieval engine.
+        n_jobs is the number of processes preprocessing the FAQ corpus when
+        training (-1 or None: one per CPU).
+        preprocess_cache_size bounds the LRU memo of raw text -> preprocessed
+        text and token_cache_size the memo of token -> interned kept token,
+        which evicts the tokens cached first once full; 0 disables either.
+        compact stores the FAQ matrix as float32 with 32-bit indices and the
+        vocabulary as sorted terms instead of a dict (see compact_index.py).
+        scoring is 'tfidf' (cosine similarity only) or 'hybrid', which blends
+        in keyword_weight times the overlap between the question and the FAQ
+        keywords extracted at build time (see keyword_index.py).
+        keyword_extractor is a picklable function text -> keywords used at
+        build time instead of extract_keywords().
+        spelling_correction replaces query words missing from the vocabulary
+        with the closest vocabulary word within max_edit_distance edits
+        before vectorizing (see spelling.py); spelling_stats() counts how
+        often it fires.
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        self.stop_words = load_stop_words()
+        self.punctuation = string.punctuation
+        self.tokenizer = get_tokenizer(tokenizer)
+        # Unfitted vectorizer; each trained index gets its own fitted clone
+        self._vectorizer_template = TfidfVectorizer(
+            lowercase=True,
+            stop_words='english',
+            ngram_range=(1, 2),
+            max_features=1000
+        )
+        self.index = None
+        # Serializes publishing so versions stay unique and increasing
+        self._publish_lock = threading.Lock()
+        self.top_k = top_k
+        self.retrieval = retrieval
+        self.retrieval_options = dict(retrieval_options or {})
+        self.n_jobs = n_jobs
+        self.compact = compact
+        if scoring not in ('tfidf', 'hybrid'):
+            raise ValueError(f"Unknown scoring '{scoring}', expected 'tfidf' or 'hybrid'")
+        self.scoring = scoring
+        self.keyword_weight = keyword_weight
+        self.keyword_extractor = keyword_extractor
+        if scoring == 'hybrid' and keyword_extractor is None:
+            require_textblob_corpora()
+        # FAQ question -> normalized keywords of the current index, so
+        # rebuilds only extract keywords for new questions
+        self._faq_keywords = {}
+        self.spelling_correction = spelling_correction
+        self.max_edit_distance = max_edit_distance
+        self.spelling_lookups = 0
+        self.spelling_corrections = 0
+        self.spelling_corrected_questions = 0
+        # Guards the spelling counters, which threaded servers update concurrently
+        self._spelling_lock = threading.Lock()
+        
+        # Memos shared by matching and index builds; see preprocess_stats()
+        self.preprocess_cache = LRUCache(maxsize=preprocess_cache_size)
+        self.token_cache_size = token_cache_size
+        # Insertion-ordered so the oldest token is evicted in O(1); hits
+        # only read it, so they take no lock and don't reorder it
+        self._token_cache = OrderedDict()
+        self.token_misses = 0
+        self.token_evictions = 0
+        self._token_lock = threading.Lock()
+    
+    @property
+    def vectorizer(self):
+        """Fitted vectorizer of the current index, or the unfitted one before training"""
+        index = self.index
+        return index.vectorizer if index is not None else self._vectorizer_template
+    
+    @property
+    def faq_vectors(self):
+        """Normalized CSR matrix of the current index"""
+        index = self.index
+        return index.retriever.matrix if index is not None else None
+    
+    @property
+    def faq_questions(self):
+        """FAQ questions of the current index"""
+        index = self.index
+        return index.questions if index is not None else None
+    
+    @property
+    def retriever(self):
+        """Retrieval engine of the current index"""
+        index = self.index
+        return index.retriever if index is not None else None
+    
+    @property
+    def index_version(self):
+        """Version of the current index, incremented on every publish"""
+        index = self.index
+        return index.version if index is not None else 0
+        
+    def preprocess_text(self, text):
+        """
+        Preprocess text by:
+        1. Converting to lowercase
+        2. Removing punctuation
+        3. Tokenizing
+        4. Removing stopwords
+        5. Lemmatizing
+        Results are memoized per raw text in preprocess_cache.
+        """
+        cache = self.preprocess_cache
+        if cache.maxsize:
+            processed_text = cache.get(text)
+            if processed_text is None:
+                processed_text = self._preprocess_uncached(text)
+                cache.put(text, processed_text)
+            return processed_text
+        return self._preprocess_uncached(text)
+    
+    def _preprocess_uncached(self, text):
+        # Convert to lowercase
+        text = text.lower()
+        
+        # Remove punctuation
+        text = PUNCTUATION_PATTERN.sub('', text)
+        
+        # Tokenize
+        tokens = self.tokenizer.tokenize(text)
+        
+        # Remove stopwords and short words; each distinct token is checked
+        # once and kept tokens are interned, so repeats share one string
+        lookup = self._token_cache.get
+        filtered = [lookup(token) for token in tokens]
+        if None in filtered:
+            filtered = [self._filter_token(token) if cached is None else cached
+                        for token, cached in zip(tokens, filtered)]
+        tokens = [token for token in filtered if token]
+        
+        # Join tokens back into text
+        processed_text = ' '.join(tokens)
+        
+        return processed_text
+    
+    def _filter_token(self, token):
+        """
+        Return the interned token if it is kept, or '' if it is dropped,
+        and remember the result, evicting the oldest token when the token
+        cache is full
+        """
+        kept = sys.intern(token) if len(token) > 2 and token not in self.stop_words else ''
+        with self._token_lock:
+            self.token_misses += 1
+            if self.token_cache_size:
+                cache = self._token_cache
+                cache[token] = kept
+                while len(cache) > self.token_cache_size:
+                    cache.popitem(last=False)
+                    self.token_evictions += 1
+        return kept
+    
+    def memo_nbytes(self):
+        """Estimated bytes held by the preprocess memo and the token cache"""
+        return self.preprocess_cache.nbytes() + dict_nbytes(self._token_cache)
+    
+    def preprocess_stats(self):
+        """Return the preprocess memo counters and the token cache size"""
+        with self._token_lock:
+            token_cache = {
+                'size': len(self._token_cache),
+                'maxsize': self.token_cache_size,
+                'misses': self.token_misses,
+                'evictions': self.token_evictions
+            }
+        return {
+            'memo': self.preprocess_cache.stats(),
+            'token_cache': token_cache
+        }
+    
+    def spelling_stats(self):
+        """
+        Return how many out-of-vocabulary query words were looked up and
+        corrected, and how many questions had a word corrected
+        """
+        with self._spelling_lock:
+            return {
+                'enabled': self.spelling_correction,
+                'lookups': self.spelling_lookups,
+                'corrections': self.spelling_corrections,
+                'corrected_questions': self.spelling_corrected_questions
+            }
+    
+    def correct_spelling(self, processed_question, index=None):
+        """
+        Replace the words of a preprocessed question that are missing from
+        the index vocabulary with their closest vocabulary word
+        """
+        if index is None:
+            index = self.index
+        corrector = index.spelling if index is not None else None
+        if corrector is None:
+            return processed_question
+        
+        words = processed_question.split()
+        lookups = corrected = 0
+        for position, word in enumerate(words):
+            if word in corrector.words or word in corrector.ignore:
+                continue
+            lookups += 1
+            correction = corrector.correct(word)
+            if correction is not None and correction != word:
+                words[position] = correction
+                corrected += 1
+        if lookups:
+            with self._spelling_lock:
+                self.spelling_lookups += lookups
+                self.spelling_corrections += corrected
+                self.spelling_corrected_questions += corrected > 0
+        if not corrected:
+            return processed_question
+        return ' '.join(words)
+    
+    def extract_keywords(self, text):
+        """Extract important keywords from text using TextBlob"""
+        from textblob import TextBlob
+        from textblob.exceptions import MissingCorpusError
+        
+        blob = TextBlob(text)
+        # Get noun phrases and important words
+        keywords = []
+        
+        try:
+            # Add noun phrases
+            keywords.extend(blob.noun_phrases)
+            
+            # Add important words (nouns, adjectives, verbs)
+            for word, tag in blob.tags:
+                if tag.startswith(('NN', 'JJ', 'VB')) and len(word) > 2:
+                    keywords.append(word.lower())
+        except (MissingCorpusError, LookupError) as error:
+            raise NLTKDataMissingError(
+                f"TextBlob corpora are not installed ({error.__class__.__name__}). "
+                f"Run 'python download_nltk_data.py' on a machine with network access."
+            ) from error
+        
+        return list(set(keywords))
+    
+    def normalized_keywords(self, text):
+        """
+        Extract the keywords of text and preprocess them like questions, so
+        they can be looked up among the words of a preprocessed question
+        """
+        extract = self.keyword_extractor or self.extract_keywords
+        return tuple(sorted({
+            keyword for keyword in map(self.preprocess_text, extract(text)) if keyword
+        }))
+    
+    def extract_faq_keywords(self, faq_questions, n_jobs=None, chunk_size=PREPROCESS_CHUNK_SIZE):
+        """
+        normalized_keywords() of every FAQ question, in order. Questions
+        seen by the previous build are reused; new ones are extracted in
+        n_jobs worker processes like preprocess_corpus().
+        """
+        from parallel import iter_chunks, map_chunks, resolve_n_jobs
+        
+        known = self._faq_keywords
+        missing = list(dict.fromkeys(q for q in faq_questions if q not in known))
+        n_jobs = resolve_n_jobs(self.n_jobs if n_jobs is None else n_jobs)
+        if n_jobs == 1 or len(missing) <= chunk_size:
+            extracted = [self.normalized_keywords(q) for q in missing]
+        else:
+            extracted = []
+            for chunk in map_chunks(_keywords_chunk, iter_chunks(missing, chunk_size), n_jobs,
+                                    initializer=_init_preprocess_worker,
+                                    initargs=(self.tokenizer, self.keyword_extractor)):
+                extracted.extend(chunk)
+        
+        current = {q: known[q] for q in faq_questions if q in known}
+        current.update(zip(missing, extracted))
+        self._faq_keywords = current
+        return [current[q] for q in faq_questions]
+    
+    def preprocess_corpus(self, texts, n_jobs=None, chunk_size=PREPROCESS_CHUNK_SIZE):
+        """
+        preprocess_text() every text, fanning chunks out to n_jobs worker
+        processes (self.n_jobs by default). Results are in input order and
+        identical to the serial path; corpora of a single chunk are
+        processed here, as starting workers would cost more than it saves.
+        """
+        from parallel import iter_chunks, map_chunks, resolve_n_jobs
+        
+        texts = list(texts)
+        n_jobs = resolve_n_jobs(self.n_jobs if n_jobs is None else n_jobs)
+        if n_jobs == 1 or len(texts) <= chunk_size:
+            return [self.preprocess_text(text) for text in texts]
+        
+        processed = []
+        for chunk in map_chunks(_preprocess_chunk, iter_chunks(texts, chunk_size), n_jobs,
+                                initializer=_init_preprocess_worker, initargs=(self.tokenizer,)):
+            processed.extend(chunk)
+        return processed
+    
+    def train_vectorizer(self, faq_questions, faq_answers=None, n_jobs=None):
+        """
+        Train the TF-IDF vectorizer on FAQ questions.
+        faq_answers, if given, are kept in the index alongside the questions.
+        n_jobs overrides the processor's worker count for preprocessing.
+        """
+        # Preprocess all questions
+        processed_questions = self.preprocess_corpus(faq_questions, n_jobs)
+        
+        # Fit and transform a fresh vectorizer
+        from sklearn.base import clone
+        
+        vectorizer = clone(self._vectorizer_template)
+        faq_vectors = vectorizer.fit_transform(processed_questions)
+        
+        self.publish_index(vectorizer, faq_vectors, faq_questions, faq_answers,
+                           processed_questions=processed_questions)
+        
+        return self.faq_vectors
+    
+    def vectorize_questions(self, questions, vectorizer=None):
+        """
+        Transform questions with an already fitted vectorizer (the current
+        index's by default) without refitting it
+        """
+        if vectorizer is None:
+            vectorizer = self.vectorizer
+        return vectorizer.transform([self.preprocess_text(q) for q in questions])
+    
+    def publish_index(self, vectorizer, faq_vectors, faq_questions, faq_answers=None,
+                      normalized=False, processed_questions=None, keywords=None, spelling=None):
+        """
+        Build a new FAQIndex and make it the current one in a single assignment.
+        processed_questions, the preprocessed FAQ questions, saves
+        preprocessing them again for spelling correction, and keywords, a
+        KeywordIndex of faq_questions loaded from disk or spliced by
+        FAQStore, saves extracting keywords for hybrid scoring. Likewise
+        spelling, a SpellingCorrector restored from disk or spliced by
+        FAQStore, saves preprocessing the questions at all.
+        The index is built without holding any lock; only numbering and
+        assigning it are serialized, so concurrent reloads get distinct
+        versions and matching is never blocked.
+        """
+        # Keep the FAQ matrix in the retrieval engine's normalized CSR layout
+        from retrieval import make_retriever
+        
+        if self.compact:
+            from compact_index import SortedVocabulary, compact_matrix
+            
+            faq_vectors = compact_matrix(faq_vectors)
+            if not isinstance(vectorizer.vocabulary_, SortedVocabulary):
+                vectorizer.vocabulary_ = SortedVocabulary(vectorizer.vocabulary_)
+        
+        retriever = make_retriever(self.retrieval, faq_vectors, top_k=self.top_k,
+                                   normalized=normalized, **self.retrieval_options)
+        
+        if self.scoring != 'hybrid':
+            keywords = None
+        elif keywords is None:
+            from keyword_index import KeywordIndex
+            
+            keywords = KeywordIndex(self.extract_faq_keywords(faq_questions))
+        
+        if not self.spelling_correction:
+            spelling = None
+        elif spelling is None:
+            if processed_questions is None:
+                processed_questions = self.preprocess_corpus(faq_questions)
+            spelling = self.build_spelling_corrector(vectorizer, processed_questions)
+        
+        questions = tuple(faq_questions)
+        answers = tuple(faq_answers) if faq_answers is not None else None
+        with self._publish_lock:
+            previous = self.index
+            index = FAQIndex(
+                version=self.index_version + 1,
+                vectorizer=vectorizer,
+                retriever=retriever,
+                questions=questions,
+                answers=answers,
+                keywords=keywords,
+                spelling=spelling
+            )
+            self.index = index
+        
+        # Stop the replaced retriever's workers (sharded retrieval); matches
+        # still running against it fall back to scoring in this process
+        close = getattr(previous.retriever, 'close', None) if previous is not None else None
+        if close is not None and previous.retriever is not retriever:
+            close()
+        return index
+    
+    def splice_keywords(self, index, start, stop, faq_questions):
+        """
+        KeywordIndex of index with FAQ rows start:stop replaced by the
+        keywords of faq_questions, or None without hybrid scoring.
+        Only faq_questions are sent to the keyword extractor.
+        """
+        if index.keywords is None:
+            return None
+        return index.keywords.replace_rows(
+            start, stop, [self.normalized_keywords(question) for question in faq_questions]
+        )
+    
+    def splice_spelling(self, index, faq_questions):
+        """
+        SpellingCorrector of index that also ignores the words of
+        faq_questions missing from its vocabulary, or None without spelling
+        correction. Only faq_questions are preprocessed; words of removed
+        FAQs stay ignored until the next refresh.
+        """
+        corrector = index.spelling
+        if corrector is None:
+            return None
+        new_words = {word for question in self.preprocess_corpus(faq_questions) for word in question.split()}
+        new_words.difference_update(corrector.words, corrector.ignore)
+        if not new_words:
+            return corrector
+        return corrector.with_ignore(corrector.ignore | new_words)
+    
+    def build_spelling_corrector(self, vectorizer, processed_questions=None, ignore=None):
+        """
+        SpellingCorrector of the single words in a fitted vectorizer's
+        vocabulary, weighted so that words in more FAQs win ties. Stop
+        words and FAQ words left out of the vocabulary (max_features) are
+        correct spellings too, so they are ignored rather than corrected;
+        ignore, the ignored words saved with an index, replaces collecting
+        them from processed_questions.
+        """
+        from spelling import SpellingCorrector
+        
+        idf = vectorizer.idf_
+        words = {
+            term: -float(idf[column]) for term, column in vectorizer.vocabulary_.items() if ' ' not in term
+        }
+        if ignore is None:
+            ignore = set(vectorizer.get_stop_words() or ())
+            for question in processed_questions:
+                ignore.update(question.split())
+            ignore.difference_update(words)
+        return SpellingCorrector(words, max_edit_distance=self.max_edit_distance, ignore=ignore)
+    
+    def index_config(self):
+        """Settings that determine the contents of a saved index"""
+        return {
+            'tokenizer': getattr(self.tokenizer, 'name', type(self.tokenizer).__name__),
+            'compact': self.compact,
+            'spelling_correction': self.spelling_correction,
+            # Saved keyword postings depend on the extractor
+            'keywords': None if self.scoring != 'hybrid' else getattr(
+                self.keyword_extractor, '__qualname__', 'extract_keywords'
+            ),
+            'vectorizer': {
+                'lowercase': self._vectorizer_template.lowercase,
+                'stop_words': self._vectorizer_template.stop_words,
+                'ngram_range': list(self._vectorizer_template.ngram_range),
+                'max_features': self._vectorizer_template.max_features
+            }
+        }
+    
+    def load_index(self, index_dir, faq_questions, faq_answers=None, mmap=True, expected_hash=None):
+        """
+        Load a saved index (see index_store.py) instead of training.
+        With mmap=True the FAQ matrix stays a read-only memory map, so
+        processes loading the same index share its pages. expected_hash,
+        if given, must match the saved content hash.
+        """
+        from index_store import resolve_index_dir
+        from sklearn.base import clone
+        
+        # Read all files from the version current now; if a save replaces
+        # and deletes it mid-read, read the new version instead
+        for attempt in range(2):
+            version_dir = resolve_index_dir(index_dir)
+            try:
+                vocabulary, idf, faq_matrix, postings, ignore = self._read_index(version_dir, mmap, expected_hash)
+                break
+            except FileNotFoundError:
+                if attempt or resolve_index_dir(index_dir) == version_dir:
+                    raise
+        index_dir = version_dir
+        
+        if faq_matrix.shape[0] != len(faq_questions):
+            raise ValueError(
+                f"Index in {index_dir} has {faq_matrix.shape[0]} FAQs, expected {len(faq_questions)}"
+            )
+        
+        # Restore the fitted vectorizer state
+        vectorizer = clone(self._vectorizer_template)
+        vectorizer.vocabulary_ = vocabulary
+        vectorizer.idf_ = idf
+        
+        # Keyword postings saved with the index spare extracting them again
+        keywords = None
+        if postings is not None:
+            from keyword_index import KeywordIndex
+            
+            keywords = KeywordIndex.from_postings(*postings, n_faqs=faq_matrix.shape[0])
+        
+        # So do the words spelling correction ignores
+        spelling = None
+        if ignore is not None:
+            spelling = self.build_spelling_corrector(vectorizer, ignore=ignore)
+        
+        self.publish_index(vectorizer, faq_matrix, faq_questions, faq_answers, normalized=True,
+                           keywords=keywords, spelling=spelling)
+        
+        return self.faq_vectors
+    
+    def _read_index(self, index_dir, mmap, expected_hash):
+        """Read the files of a saved index version this processor uses"""
+        from index_store import load_index, load_keyword_postings, load_spelling_ignore
+        
+        _, vocabulary, idf, faq_matrix = load_index(index_dir, mmap=mmap, expected_hash=expected_hash)
+        postings = load_keyword_postings(index_dir, mmap=mmap) if self.scoring == 'hybrid' else None
+        ignore = load_spelling_ignore(index_dir) if self.spelling_correction else None
+        return vocabulary, idf, faq_matrix, postings, ignore
+    
+    def match(self, user_question, threshold=0.1, top_k=None):
+        """
+        Match a user question against the FAQ questions in a single pass.
+        The question is preprocessed, vectorized and scored once; the best
+        match, the top-k matches and the debug info are returned together.
+        top_k defaults to the processor's top_k.
+        """
+        if self.faq_vectors is None:
+            raise ValueError("Vectorizer must be trained first. Call train_vectorizer()")
+        
+        # Preprocess user question
+        start = METRICS.start_timer()
+        processed_question = self.preprocess_text(user_question)
+        observe_stage('preprocess', start)
+        
+        return self.match_preprocessed(processed_question, threshold, top_k, user_question)
+    
+    def match_preprocessed(self, processed_question, threshold=0.1, top_k=None, user_question=None,
+                           index=None):
+        """
+        Same as match() for a question that already went through preprocess_text().
+        index is the FAQIndex to match against, the current one by default.
+        """
+        # Read one consistent index for the whole match
+        if index is None:
+            index = self.index
+        if index is None:
+            raise ValueError("Vectorizer must be trained first. Call train_vectorizer()")
+        
+        if top_k is None:
+            top_k = self.top_k
+        if user_question is None:
+            user_question = processed_question
+        
+        if index.spelling is not None:
+            start = METRICS.start_timer()
+            processed_question = self.correct_spelling(processed_question, index)
+            observe_stage('spelling', start)
+        
+        # Transform user question
+        start = METRICS.start_timer()
+        user_vector = index.vectorizer.transform([processed_question])
+        observe_stage('transform', start)
+        
+        # Score against every FAQ and select the top matches
+        start = METRICS.start_timer()
+        top_indices, top_similarities = self._search(index, user_vector, processed_question,
+                                                     max(top_k, 1))
+        observe_stage('score', start)
+        
+        start = METRICS.start_timer()
+        match_result = self._build_match(
+            index, user_question, processed_question, top_indices, top_similarities, threshold, top_k
+        )
+        observe_stage('build_match', start)
+        
+        return match_result
+    
+    def find_best_matches(self, user_questions, threshold=0.1, top_k=None):
+        """
+        Match a batch of user questions in one pass.
+        All questions are vectorized in a single transform call and scored
+        with one sparse matrix-matrix product.
+        Returns a list of match results in the same format as match()
+        """
+        if self.faq_vectors is None:
+            raise ValueError("Vectorizer must be trained first. Call train_vectorizer()")
+        
+        user_questions = list(user_questions)
+        
+        # Preprocess all user questions
+        start = METRICS.start_timer()
+        processed_questions = [self.preprocess_text(q) for q in user_questions]
+        observe_stage('batch_preprocess', start)
+        
+        return self.find_best_matches_preprocessed(
+            processed_questions, threshold, top_k, user_questions
+        )
+    
+    def find_best_matches_preprocessed(self, processed_questions, threshold=0.1, top_k=None,
+                                       user_questions=None, index=None):
+        """
+        Same as find_best_matches() for questions that already went through preprocess_text().
+        index is the FAQIndex to match against, the current one by default.
+        """
+        # Read one consistent index for the whole batch
+        if index is None:
+            index = self.index
+        if index is None:
+            raise ValueError("Vectorizer must be trained first. Call train_vectorizer()")
+        
+        if top_k is None:
+            top_k = self.top_k
+        
+        processed_questions = list(processed_questions)
+        if not processed_questions:
+            return []
+        if user_questions is None:
+            user_questions = processed_questions
+        
+        if index.spelling is not None:
+            start = METRICS.start_timer()
+            processed_questions = [self.correct_spelling(q, index) for q in processed_questions]
+            observe_stage('batch_spelling', start)
+        
+        # Transform all user questions at once
+        start = METRICS.start_timer()
+        user_vectors = index.vectorizer.transform(processed_questions)
+        observe_stage('batch_transform', start)
+        
+        # Score the whole batch and select the top matches per question
+        start = METRICS.start_timer()
+        if index.keywords is None:
+            batch_results = index.retriever.search_batch(user_vectors, k=max(top_k, 1))
+        else:
+            batch_results = [
+                self._search(index, user_vectors[row], processed, max(top_k, 1))
+                for row, processed in enumerate(processed_questions)
+            ]
+        observe_stage('batch_score', start)
+        
+        return [
+            self._build_match(index, question, processed, top_indices, top_similarities, threshold, top_k)
+            for question, processed, (top_indices, top_similarities)
+            in zip(user_questions, processed_questions, batch_results)
+        ]
+    
+    def _search(self, index, user_vector, processed_question, k):
+        """Return (indices, scores) of the top k FAQs of index for one question"""
+        if index.keywords is None:
+            return index.retriever.search(user_vector, k=k)
+        
+        from keyword_index import hybrid_search
+        
+        return hybrid_search(index.retriever, index.keywords, user_vector, processed_question,
+                             k, self.keyword_weight)
+    
+    def _build_match(self, index, user_question, processed_question, top_indices,
+                     top_similarities, threshold, top_k):
+        """
+        Build a match result from the top indices and similarities retrieved
+        from index. Numbers are converted to Python int and float once here,
+        so results serialize without per-field casts.
+        """
+        top_indices = top_indices.tolist()
+        top_similarities = top_similarities.tolist()
+        
+        # The first of the top matches is the best match
+        best_match_index = top_indices[0]
+        best_similarity = top_similarities[0]
+        
+        top_matches = []
+        for idx, similarity in zip(top_indices[:top_k], top_similarities[:top_k]):
+            top_matches.append({
+                'index': idx,
+                'question': index.questions[idx],
+                'similarity': similarity
+            })
+        
+        return {
+            'index': best_match_index,
+            'similarity': best_similarity,
+            'question': index.questions[best_match_index],
+            'answer': index.answers[best_match_index] if index.answers is not None else None,
+            'index_version': index.version,
+            'user_question': user_question,
+            'processed_question': processed_question,
+            'threshold': threshold,
+            'is_match': best_similarity >= threshold,
+            'top_matches': top_matches
+        }
+    
+    def find_best_match(self, user_question, threshold=0.1):
+        """
+        Find the best matching FAQ question using cosine similarity
+        Returns (best_match_index, similarity_score, processed_question)
+        """
+        return self.match(user_question, threshold=threshold, top_k=0)
+    
+    def get_similarity_analysis(self, user_question, top_k=None):
+        """
+        Get detailed similarity analysis for debugging
+        """
+        if self.faq_vectors is None:
+            return None
+        
+        match_result = self.match(user_question, top_k=top_k)
+        
+        return {
+            'user_question': user_question,
+            'processed_question': match_result['processed_question'],
+            'top_matches': match_result['top_matches']
+        }
\ No newline at end of file
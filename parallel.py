@@ -0,0 +1,59 @@
+"""
+Chunked parallel map for FAQ Chatbot
+Runs a function over chunks of a stream in a process pool, keeping only a
+bounded number of chunks in flight and yielding results in input order.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+def iter_chunks(iterable, chunk_size):
+    """Yield lists of up to chunk_size items from iterable"""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def resolve_n_jobs(n_jobs):
+    """Number of worker processes for n_jobs; None or -1 means one per CPU"""
+    if n_jobs is None or n_jobs == -1:
+        return os.cpu_count() or 1
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be >= 1, -1 or None")
+    return n_jobs
+
+
+def map_chunks(func, chunks, n_jobs=1, initializer=None, initargs=(), max_pending=None):
+    """
+    Yield func(chunk) for every chunk, in order.
+    With n_jobs > 1 the chunks are processed by a pool of worker processes,
+    each set up by initializer(*initargs); at most max_pending chunks
+    (default 2 per worker) are submitted ahead of the one being yielded, so
+    memory stays bounded however long the stream is. With n_jobs=1 everything
+    runs in this process.
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    max_pending = max_pending or 2 * n_jobs
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
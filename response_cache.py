@@ -0,0 +1,145 @@
+"""
+Response cache for FAQ Chatbot
+Bounded LRU cache with optional TTL and hit/miss/eviction counters
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+# Entries sampled to measure the average entry size of a cache
+SAMPLE_SIZE = 32
+
+# Bytes per entry of the containers themselves, measured with tracemalloc:
+# an OrderedDict slot and link plus the (value, expires_at) tuple, and a
+# dict slot
+LRU_ENTRY_OVERHEAD = 150
+DICT_ENTRY_OVERHEAD = 40
+
+
+def object_nbytes(obj, seen):
+    """
+    Bytes of obj and the dicts, lists, tuples and sets it holds, counting
+    objects whose id is in seen only once
+    """
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(object_nbytes(key, seen) + object_nbytes(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(object_nbytes(item, seen) for item in obj)
+    return size
+
+
+def sampled_nbytes(sample, count, entry_overhead=DICT_ENTRY_OVERHEAD):
+    """
+    Estimate the bytes of count cache entries from a sample of their
+    (key, value) pairs. Objects shared between the sampled entries, such
+    as FAQ questions, are counted once per sample.
+    """
+    if not sample or not count:
+        return 0
+    seen = set()
+    sampled = sum(object_nbytes(key, seen) + object_nbytes(value, seen) for key, value in sample)
+    return int(count * (sampled / len(sample) + entry_overhead))
+
+
+def dict_nbytes(cache, sample_size=SAMPLE_SIZE):
+    """Estimated bytes held by the entries of a plain dict memo"""
+    try:
+        sample = list(islice(cache.items(), sample_size))
+    except RuntimeError:
+        # Resized by another thread while sampling
+        sample = []
+    return sys.getsizeof(cache) + sampled_nbytes(sample, len(cache))
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache.
+    maxsize bounds the number of entries (0 disables caching) and ttl,
+    in seconds, expires entries that have not been refreshed in time.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, timer=time.monotonic):
+        """Create an empty cache"""
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be a positive number of seconds")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and self._timer() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        if self.maxsize == 0:
+            return
+        expires_at = self._timer() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def sample(self, n=SAMPLE_SIZE):
+        """Return up to n (key, value) pairs, most recently used first"""
+        with self._lock:
+            return [(key, value) for key, (value, _) in islice(reversed(self._entries.items()), n)]
+
+    def nbytes(self, sample_size=SAMPLE_SIZE):
+        """Estimated bytes held by the entries: their count times the average size of a sample"""
+        return sampled_nbytes(self.sample(sample_size), len(self), LRU_ENTRY_OVERHEAD)
+
+    def clear(self):
+        """Remove every entry; the counters are kept"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return the cache counters and hit rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,162 @@
+"""
+Retrieval engine for FAQ Chatbot
+Scores queries against a pre-normalized sparse FAQ matrix and selects the top matches
+"""
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+
+def select_top_k(scores, k):
+    """
+    Return the indices of the k highest scores, best first.
+    Uses partial selection so only the selected scores are sorted.
+    Ties are broken by the lower index, like np.argmax.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    if k >= n:
+        candidates = np.arange(n)
+        order = np.lexsort((candidates, -scores))
+        return candidates[order]
+
+    kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+
+    # Everything strictly above the k-th score is selected; the remaining
+    # slots go to the lowest indices tied with the k-th score
+    above = np.flatnonzero(scores > kth_score)
+    above = above[np.lexsort((above, -scores[above]))]
+    ties = np.flatnonzero(scores == kth_score)[:k - len(above)]
+    return np.concatenate((above, ties))
+
+
+class SparseRetriever:
+    """
+    Exact cosine retrieval over a CSR matrix of L2-normalized rows.
+    With every row normalized up front, cosine similarity reduces to a
+    sparse matrix-vector product against the query vector.
+    """
+
+    def __init__(self, faq_vectors, top_k=5, normalized=False):
+        """
+        Store the FAQ vectors as a row-normalized CSR matrix.
+        Pass normalized=True for rows that are already L2-normalized, such
+        as a read-only memory-mapped index, to use them without a copy.
+        """
+        matrix = sparse.csr_matrix(faq_vectors)
+        if not normalized:
+            # TF-IDF rows are already normalized; this is a no-op for them
+            matrix = normalize(matrix, norm='l2', copy=False)
+        self.matrix = matrix
+        self.top_k = top_k
+
+    @property
+    def n_faqs(self):
+        """Number of FAQ rows in the index"""
+        return self.matrix.shape[0]
+
+    def dense_query(self, query_vector):
+        """
+        Return a (1 x n_features) query vector as a flat dense array in the
+        FAQ matrix's dtype, so a float32 matrix is not upcast per query
+        """
+        if sparse.issparse(query_vector):
+            query_vector = query_vector.toarray()
+        return np.asarray(query_vector, dtype=self.matrix.dtype).ravel()
+
+    def score(self, query_vector):
+        """
+        Return the cosine similarity of a single (1 x n_features)
+        L2-normalized query vector to every FAQ row
+        """
+        return self.matrix @ self.dense_query(query_vector)
+
+    def search(self, query_vector, k=None):
+        """
+        Score a query vector and return (indices, similarities) of the
+        top k FAQ rows, best first
+        """
+        if k is None:
+            k = self.top_k
+        similarities = self.score(query_vector)
+        top_indices = select_top_k(similarities, k)
+        return top_indices, similarities[top_indices]
+
+    def search_batch(self, query_vectors, k=None):
+        """
+        Score a (n_queries x n_features) matrix of L2-normalized query
+        vectors with one sparse matrix-matrix product.
+        Returns a list of (indices, similarities) per query, best first,
+        identical in ranking to calling search() on each query.
+        """
+        if k is None:
+            k = self.top_k
+        # Only the non-zero similarities are materialized per query
+        query_vectors = sparse.csr_matrix(query_vectors, dtype=self.matrix.dtype)
+        similarities = sparse.csr_matrix(query_vectors @ self.matrix.T)
+        similarities.eliminate_zeros()
+        similarities.sort_indices()
+
+        results = []
+        for row in range(similarities.shape[0]):
+            start, end = similarities.indptr[row], similarities.indptr[row + 1]
+            columns = similarities.indices[start:end]
+            scores = similarities.data[start:end]
+
+            # Columns are sorted, so ties still resolve by the lower FAQ index
+            selected = select_top_k(scores, k)
+            top_indices = columns[selected]
+            top_scores = scores[selected]
+
+            if len(top_indices) < k:
+                # Fill the remaining slots with zero-similarity FAQs in index order
+                padding = _first_indices_not_in(columns, k - len(top_indices), self.n_faqs)
+                top_indices = np.concatenate((top_indices, padding))
+                top_scores = np.concatenate((top_scores, np.zeros(len(padding))))
+
+            results.append((top_indices, top_scores))
+        return results
+
+
+def make_retriever(name, faq_vectors, top_k=5, normalized=False, **options):
+    """
+    Build the retrieval engine called name over faq_vectors.
+    'exact' scores every FAQ row (SparseRetriever); 'inverted' gives the
+    same results scoring only FAQs that share a term with the query
+    (inverted_index.InvertedIndexRetriever); 'approximate' only re-ranks
+    candidates from an impact-ordered inverted index
+    (ann_index.ApproximateRetriever); 'sharded' gives the same results
+    scoring row shards in parallel processes
+    (sharded_index.ShardedRetriever). options are passed through.
+    """
+    if name == 'exact':
+        return SparseRetriever(faq_vectors, top_k=top_k, normalized=normalized, **options)
+    if name == 'inverted':
+        from inverted_index import InvertedIndexRetriever
+        return InvertedIndexRetriever(faq_vectors, top_k=top_k, normalized=normalized, **options)
+    if name == 'approximate':
+        from ann_index import ApproximateRetriever
+        return ApproximateRetriever(faq_vectors, top_k=top_k, normalized=normalized, **options)
+    if name == 'sharded':
+        from sharded_index import ShardedRetriever
+        return ShardedRetriever(faq_vectors, top_k=top_k, normalized=normalized, **options)
+    raise ValueError(
+        f"Unknown retrieval mode '{name}', expected 'exact', 'inverted', 'approximate' or 'sharded'"
+    )
+
+
+def _first_indices_not_in(excluded, count, n):
+    """Return up to count of the smallest indices in range(n) not in the sorted excluded array"""
+    indices = []
+    position = 0
+    candidate = 0
+    while len(indices) < count and candidate < n:
+        if position < len(excluded) and excluded[position] == candidate:
+            position += 1
+        else:
+            indices.append(candidate)
+        candidate += 1
+    return np.array(indices, dtype=np.intp)
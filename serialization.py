@@ -0,0 +1,33 @@
+"""
+JSON serialization for FAQ Chatbot responses
+Encodes response payloads to compact UTF-8 JSON with orjson when it is
+installed, falling back to the standard library json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def numpy_default(obj):
+    """Convert numpy scalars and arrays that reach the encoder to Python types"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Serialize obj to compact UTF-8 encoded JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=numpy_default)
+    return json.dumps(
+        obj, default=numpy_default, ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def backend():
+    """Name of the JSON library used by dumps()"""
+    return 'orjson' if orjson is not None else 'json'
@@ -0,0 +1,279 @@
+"""
+Sharded retrieval for FAQ Chatbot
+Partitions the FAQ matrix into row shards scored in parallel by worker
+processes, which memory-map the matrix instead of receiving a copy, and
+merges the per-shard top-k into the global top-k.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from scipy import sparse
+
+from parallel import resolve_n_jobs
+from retrieval import SparseRetriever
+
+# tmpfs directory for the shared matrix files; the system temp dir is used without it
+SHARED_MEMORY_DIR = '/dev/shm'
+
+MATRIX_ARRAYS = ('data', 'indices', 'indptr')
+
+# Row shards of the current worker process, set by _init_shard_worker
+_worker_shards = None
+
+
+def shard_bounds(n_rows, n_shards):
+    """Split range(n_rows) into n_shards contiguous (start, end) row ranges of near-equal size"""
+    edges = [n_rows * shard // n_shards for shard in range(n_shards + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def row_slice(matrix, start, end):
+    """
+    Rows start:end of a CSR matrix as a CSR matrix sharing its data and
+    indices arrays; only the row pointers are copied
+    """
+    indptr = matrix.indptr[start:end + 1]
+    first, last = indptr[0], indptr[-1]
+    return sparse.csr_matrix(
+        (matrix.data[first:last], matrix.indices[first:last], indptr - first),
+        shape=(end - start, matrix.shape[1]),
+        copy=False
+    )
+
+
+def mapped_file(array):
+    """
+    Return the .npy file array is memory-mapped from as a whole, as for a
+    persisted index loaded by index_store, or None
+    """
+    address = array.__array_interface__['data'][0]
+    base = array
+    while isinstance(base, np.ndarray):
+        if isinstance(base, np.memmap) and base.filename and base.filename.endswith('.npy'):
+            if (base.__array_interface__['data'][0] == address and base.nbytes == array.nbytes
+                    and array.flags.c_contiguous
+                    and os.path.getsize(base.filename) == base.offset + base.nbytes):
+                return base.filename
+            return None
+        base = base.base
+    return None
+
+
+def share_array(array, directory, name):
+    """
+    Return the path of a .npy file in directory holding array that other
+    processes can memory-map. The file array is mapped from, if any, is
+    hard-linked instead of copied when it still holds the same data: a
+    persisted index directory is swapped out on rebuild (see index_store),
+    so workers must never open its paths themselves.
+    """
+    path = os.path.join(directory, f"{name}.npy")
+    source = mapped_file(array)
+    if source is not None:
+        try:
+            os.link(source, path)
+        except OSError:
+            pass
+        else:
+            linked = np.load(path, mmap_mode='r')
+            if linked.dtype == array.dtype and np.array_equal(linked, array):
+                return path
+            del linked
+            os.remove(path)
+    np.save(path, np.ascontiguousarray(array))
+    return path
+
+
+def shared_directory(matrix):
+    """
+    Create the private directory for a matrix's shared files: next to the
+    persisted index it is mapped from, so its files can be hard-linked, or
+    in SHARED_MEMORY_DIR (the system temp dir without it)
+    """
+    for name in MATRIX_ARRAYS:
+        source = mapped_file(getattr(matrix, name))
+        if source is not None:
+            try:
+                return tempfile.mkdtemp(prefix='.faq-shards-', dir=os.path.dirname(os.path.dirname(source)))
+            except OSError:
+                break
+    base_dir = SHARED_MEMORY_DIR if os.access(SHARED_MEMORY_DIR, os.W_OK) else None
+    return tempfile.mkdtemp(prefix='faq-shards-', dir=base_dir)
+
+
+def load_shared_matrix(paths, shape):
+    """Memory-map a CSR matrix from the .npy files of share_array"""
+    data, indices, indptr = (np.load(paths[name], mmap_mode='r') for name in MATRIX_ARRAYS)
+    return sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
+
+
+def merge_top_k(results, k):
+    """
+    Merge per-shard (indices, scores) into the global top k, best first,
+    breaking ties by the lower index like select_top_k
+    """
+    indices = np.concatenate([shard_indices for shard_indices, _ in results])
+    scores = np.concatenate([shard_scores for _, shard_scores in results])
+    order = np.lexsort((indices, -scores))[:k]
+    return indices[order], scores[order]
+
+
+def _init_shard_worker(paths, shape, bounds):
+    global _worker_shards
+    matrix = load_shared_matrix(paths, shape)
+    _worker_shards = {
+        shard: (start, SparseRetriever(row_slice(matrix, start, end), normalized=True))
+        for shard, (start, end) in enumerate(bounds)
+    }
+
+
+def _search_shard(shard, query_vector, k):
+    start, retriever = _worker_shards[shard]
+    indices, scores = retriever.search(query_vector, k)
+    return indices + start, scores
+
+
+def _search_shard_batch(shard, query_vectors, k):
+    start, retriever = _worker_shards[shard]
+    return [(indices + start, scores) for indices, scores in retriever.search_batch(query_vectors, k)]
+
+
+def _release(resources):
+    """Stop the worker pool and delete the shared matrix files"""
+    pool = resources.pop('pool', None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+    directory = resources.pop('directory', None)
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class ShardedRetriever(SparseRetriever):
+    """
+    Exact cosine retrieval over n_shards row shards of the FAQ matrix.
+
+    Shards share the global vocabulary and IDF, as they are row ranges of
+    one TF-IDF matrix. The matrix is written once to memory-mapped files
+    in SHARED_MEMORY_DIR (or hard-linked from a persisted index) so the
+    worker processes share its pages with this one. This process scores
+    the first shard while one worker per remaining shard scores the others;
+    each returns its top k, and the merged result is identical to
+    SparseRetriever's, as every row's similarity is computed the same way.
+    The pool starts on the first search and is replaced if a worker dies.
+    It stops with close() or when the retriever is garbage collected;
+    searches still running on a closed retriever score the whole matrix
+    in this process.
+    """
+
+    def __init__(self, faq_vectors, top_k=5, normalized=False, n_shards=None):
+        """n_shards defaults to one per CPU; one shard scores in this process only"""
+        super().__init__(faq_vectors, top_k=top_k, normalized=normalized)
+        self.n_shards = max(min(resolve_n_jobs(n_shards), self.n_faqs), 1)
+        self.bounds = shard_bounds(self.n_faqs, self.n_shards)
+
+        self._resources = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._finalizer = weakref.finalize(self, _release, self._resources)
+        if self.n_shards > 1:
+            self._share_matrix()
+        start, end = self.bounds[0]
+        self._local_shard = SparseRetriever(row_slice(self.matrix, start, end), normalized=True)
+
+    def _share_matrix(self):
+        """Back the matrix with files the workers can memory-map"""
+        directory = shared_directory(self.matrix)
+        self._resources['directory'] = directory
+        self.paths = {
+            name: share_array(getattr(self.matrix, name), directory, name) for name in MATRIX_ARRAYS
+        }
+        self.matrix = load_shared_matrix(self.paths, self.matrix.shape)
+
+    def _pool(self):
+        """Return the worker pool, starting it on first use, or None once closed"""
+        pool = self._resources.get('pool')
+        if pool is None:
+            with self._lock:
+                pool = self._resources.get('pool')
+                if pool is None and not self._closed:
+                    pool = ProcessPoolExecutor(
+                        max_workers=self.n_shards - 1,
+                        initializer=_init_shard_worker,
+                        initargs=(self.paths, self.matrix.shape, self.bounds)
+                    )
+                    self._resources['pool'] = pool
+        return pool
+
+    def _drop_pool(self, pool):
+        """Forget a broken pool so the next search starts a new one"""
+        with self._lock:
+            if self._resources.get('pool') is pool:
+                del self._resources['pool']
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _search_shards(self, function, queries, k, search_local):
+        """
+        Run function(shard, queries, k) for the worker shards while
+        search_local() scores the first one, and return the per-shard
+        results in shard order. A broken pool is replaced and the worker
+        shards retried once. Returns None if the retriever was closed.
+        """
+        local = None
+        for attempt in range(2):
+            pool = self._pool()
+            if pool is None:
+                return None
+            try:
+                futures = [pool.submit(function, shard, queries, k) for shard in range(1, self.n_shards)]
+                if local is None:
+                    local = search_local()
+                return [local] + [future.result() for future in futures]
+            except BrokenProcessPool:
+                self._drop_pool(pool)
+                if attempt:
+                    raise
+            except (CancelledError, RuntimeError):
+                # close() shut the pool down during the search
+                if not self._closed:
+                    raise
+                return None
+
+    def close(self):
+        """Stop the worker pool and delete the shared matrix files"""
+        with self._lock:
+            self._closed = True
+        self._finalizer()
+
+    def search(self, query_vector, k=None):
+        if k is None:
+            k = self.top_k
+        if self.n_shards == 1:
+            return self._local_shard.search(query_vector, k)
+
+        query_vector = sparse.csr_matrix(query_vector, dtype=self.matrix.dtype)
+        results = self._search_shards(_search_shard, query_vector, k,
+                                      lambda: self._local_shard.search(query_vector, k))
+        if results is None:
+            # Closed, e.g. replaced by a newer index while this search ran
+            return super().search(query_vector, k)
+        return merge_top_k(results, k)
+
+    def search_batch(self, query_vectors, k=None):
+        if k is None:
+            k = self.top_k
+        if self.n_shards == 1:
+            return self._local_shard.search_batch(query_vectors, k)
+
+        query_vectors = sparse.csr_matrix(query_vectors, dtype=self.matrix.dtype)
+        shard_results = self._search_shards(_search_shard_batch, query_vectors, k,
+                                            lambda: self._local_shard.search_batch(query_vectors, k))
+        if shard_results is None:
+            return super().search_batch(query_vectors, k)
+        return [merge_top_k(results, k) for results in zip(*shard_results)]
@@ -0,0 +1,141 @@
+"""
+Spelling correction for FAQ Chatbot
+Symmetric-delete (SymSpell) dictionary of the index vocabulary that maps
+misspelled query words to the closest vocabulary word in constant time.
+"""
+
+import copy
+import sys
+from itertools import combinations
+
+from response_cache import dict_nbytes
+
+# Maximum edits between a query word and its correction
+MAX_EDIT_DISTANCE = 2
+
+# Only the first PREFIX_LENGTH characters of a word generate deletes, which
+# bounds the dictionary size; longer words are still compared in full
+PREFIX_LENGTH = 7
+
+
+def deletes(word, max_distance):
+    """Every string obtained by deleting up to max_distance characters from word"""
+    results = set()
+    for distance in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), distance):
+            results.add(''.join(char for i, char in enumerate(word) if i not in positions))
+    return results
+
+
+def edit_distance(source, target, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions) between source and target, or max_distance + 1 if it
+    is larger than max_distance
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = source[i - 1] != target[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and source[i - 1] == target[j - 2]
+                    and source[i - 2] == target[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class SpellingCorrector:
+    """
+    SymSpell dictionary built from a vocabulary of words.
+
+    Every word is stored under all strings made by deleting up to
+    max_edit_distance characters from its prefix. A query word generates
+    its own deletes, and the words sharing one are the only candidates
+    whose edit distance is computed, so a lookup costs a few dozen dict
+    probes however large the vocabulary. Among the closest candidates the
+    one with the highest weight wins, then the alphabetically first.
+    Results are memoized per query word.
+    """
+
+    def __init__(self, words, max_edit_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH,
+                 ignore=(), cache_size=100000):
+        """
+        words maps each vocabulary word to a weight, e.g. its document
+        frequency. Words in ignore, such as stop words the vectorizer
+        drops, are never corrected.
+        """
+        self.words = dict(words)
+        self.ignore = frozenset(ignore)
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.cache_size = cache_size
+        self._cache = {}
+
+        self._deletes = {}
+        for word in self.words:
+            prefix = word[:prefix_length]
+            for variant in deletes(prefix, max_edit_distance) | {prefix}:
+                self._deletes.setdefault(variant, []).append(word)
+        self._dictionary_nbytes = None
+
+    def __len__(self):
+        return len(self.words)
+
+    @property
+    def nbytes(self):
+        """Approximate bytes held by the vocabulary, delete dictionary and correction memo"""
+        if self._dictionary_nbytes is None:
+            total = sys.getsizeof(self.words) + sys.getsizeof(self._deletes) + sys.getsizeof(self.ignore)
+            for word, weight in self.words.items():
+                total += sys.getsizeof(word) + sys.getsizeof(weight)
+            for variant, words in self._deletes.items():
+                total += sys.getsizeof(variant) + sys.getsizeof(words)
+            self._dictionary_nbytes = total
+        return self._dictionary_nbytes + dict_nbytes(self._cache)
+
+    def with_ignore(self, ignore):
+        """Copy sharing this vocabulary and delete dictionary that ignores ignore instead"""
+        corrector = copy.copy(self)
+        corrector.ignore = frozenset(ignore)
+        corrector._cache = {}
+        corrector._dictionary_nbytes = None
+        return corrector
+
+    def max_distance(self, word):
+        """Edits allowed for word: one below 5 characters, then up to max_edit_distance"""
+        return min(self.max_edit_distance, len(word) // 5 + 1)
+
+    def correct(self, word):
+        """
+        Return word if it is in the vocabulary or ignored, else its closest
+        vocabulary word, or None if none is within the allowed edits
+        """
+        if word in self.words or word in self.ignore or not word.isalpha():
+            return word
+        if word in self._cache:
+            return self._cache[word]
+
+        max_distance = self.max_distance(word)
+        prefix = word[:self.prefix_length]
+        candidates = set()
+        for variant in deletes(prefix, max_distance) | {prefix}:
+            candidates.update(self._deletes.get(variant, ()))
+
+        best, best_key = None, None
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                key = (distance, -self.words[candidate], candidate)
+                if best_key is None or key < best_key:
+                    best, best_key = candidate, key
+
+        if len(self._cache) < self.cache_size:
+            self._cache[word] = best
+        return best
@@ -1,158 +1,1433 @@
-"""
-Test script for FAQ Chatbot
-Verifies that all components work correctly
-"""
-
-from chatbot import FAQChatbot
-from nlp_processor import NLPProcessor
-from faq_data import get_faqs, get_questions, get_answers
-
-def test_faq_data():
-    """Test FAQ data loading"""
-    print("Testing FAQ data...")
-    
-    faqs = get_faqs()
-    questions = get_questions()
-    answers = get_answers()
-    
-    print(f"✓ Loaded {len(faqs)} FAQs")
-    print(f"✓ Loaded {len(questions)} questions")
-    print(f"✓ Loaded {len(answers)} answers")
-    
-    # Test a sample FAQ
-    if faqs:
-        sample_faq = faqs[0]
-        print(f"✓ Sample FAQ: {sample_faq['question'][:50]}...")
-    
-    return True
-
-def test_nlp_processor():
-    """Test NLP processor functionality"""
-    print("\nTesting NLP processor...")
-    
-    try:
-        nlp = NLPProcessor()
-        print("✓ NLP processor initialized")
-        
-        # Test text preprocessing
-        test_text = "What is Python programming language?"
-        processed = nlp.preprocess_text(test_text)
-        print(f"✓ Text preprocessing: '{test_text}' -> '{processed}'")
-        
-        # Test keyword extraction
-        keywords = nlp.extract_keywords(test_text)
-        print(f"✓ Keywords extracted: {keywords}")
-        
-        # Test vectorizer training
-        questions = get_questions()
-        vectors = nlp.train_vectorizer(questions)
-        print(f"✓ Vectorizer trained on {len(questions)} questions")
-        
-        # Test similarity matching
-        match_result = nlp.find_best_match("What is Python?", threshold=0.1)
-        print(f"✓ Similarity matching: {match_result['similarity']:.3f} confidence")
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ NLP processor error: {e}")
-        return False
-
-def test_chatbot():
-    """Test chatbot functionality"""
-    print("\nTesting chatbot...")
-    
-    try:
-        chatbot = FAQChatbot()
-        print("✓ Chatbot initialized")
-        
-        # Test response generation
-        test_questions = [
-            "What is Python?",
-            "How do I install Python?",
-            "What is machine learning?",
-            "How do I create a virtual environment?",
-            "What is Git?",
-            "Random question that shouldn't match"
-        ]
-        
-        for question in test_questions:
-            response = chatbot.get_response(question)
-            print(f"✓ Q: '{question}'")
-            print(f"  A: {response['answer'][:100]}...")
-            print(f"  Confidence: {response['confidence']:.3f}")
-            print(f"  Match: {response['is_match']}")
-            print()
-        
-        # Test statistics
-        stats = chatbot.get_statistics()
-        print(f"✓ Statistics: {stats}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ Chatbot error: {e}")
-        return False
-
-def test_search():
-    """Test search functionality"""
-    print("\nTesting search functionality...")
-    
-    try:
-        chatbot = FAQChatbot()
-        
-        search_queries = ["python", "install", "machine learning", "git"]
-        
-        for query in search_queries:
-            results = chatbot.search_faqs(query)
-            print(f"✓ Search '{query}': {len(results)} results")
-            for result in results[:2]:  # Show first 2 results
-                print(f"  - {result['question'][:50]}... (similarity: {result['similarity']:.3f})")
-            print()
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ Search error: {e}")
-        return False
-
-def main():
-    """Run all tests"""
-    print("🧪 FAQ Chatbot Test Suite")
-    print("=" * 40)
-    
-    tests = [
-        ("FAQ Data", test_faq_data),
-        ("NLP Processor", test_nlp_processor),
-        ("Chatbot", test_chatbot),
-        ("Search", test_search)
-    ]
-    
-    passed = 0
-    total = len(tests)
-    
-    for test_name, test_func in tests:
-        try:
-            if test_func():
-                passed += 1
-                print(f"✅ {test_name} test passed\n")
-            else:
-                print(f"❌ {test_name} test failed\n")
-        except Exception as e:
-            print(f"❌ {test_name} test error: {e}\n")
-    
-    print("=" * 40)
-    print(f"📊 Test Results: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("🎉 All tests passed! The chatbot is ready to run.")
-        print("\nTo start the web application, run:")
-        print("python app.py")
-        print("\nThen open http://localhost:5000 in your browser.")
-    else:
-        print("⚠️  Some tests failed. Please check the errors above.")
-    
-    return passed == total
-
-if __name__ == "__main__":
+"""
+Test script for FAQ Chatbot
+Verifies that all components work correctly
+"""
+
+import os
+import tempfile
+
+# Keep the app's persisted index (and its lock file) out of the working
+# tree; app.py and asgi_app.py read this when imported or started
+os.environ['FAQ_INDEX_PATH'] = os.path.join(tempfile.mkdtemp(prefix='faq-test-'), 'faq_index')
+
+from chatbot import FAQChatbot
+from nlp_processor import NLPProcessor
+from faq_data import get_faqs, get_questions, get_answers
+
+def test_faq_data():
+    """Test FAQ data loading"""
+    print("Testing FAQ data...")
+    
+    faqs = get_faqs()
+    questions = get_questions()
+    answers = get_answers()
+    
+    print(f"✓ Loaded {len(faqs)} FAQs")
+    print(f"✓ Loaded {len(questions)} questions")
+    print(f"✓ Loaded {len(answers)} answers")
+    
+    # Test a sample FAQ
+    if faqs:
+        sample_faq = faqs[0]
+        print(f"✓ Sample FAQ: {sample_faq['question'][:50]}...")
+    
+    return True
+
+def test_nlp_processor():
+    """Test NLP processor functionality"""
+    print("\nTesting NLP processor...")
+    
+    try:
+        nlp = NLPProcessor()
+        print("✓ NLP processor initialized")
+        
+        # Test text preprocessing
+        test_text = "What is Python programming language?"
+        processed = nlp.preprocess_text(test_text)
+        print(f"✓ Text preprocessing: '{test_text}' -> '{processed}'")
+        
+        # Test keyword extraction
+        keywords = nlp.extract_keywords(test_text)
+        print(f"✓ Keywords extracted: {keywords}")
+        
+        # Test vectorizer training
+        questions = get_questions()
+        vectors = nlp.train_vectorizer(questions)
+        print(f"✓ Vectorizer trained on {len(questions)} questions")
+        
+        # Test similarity matching
+        match_result = nlp.find_best_match("What is Python?", threshold=0.1)
+        print(f"✓ Similarity matching: {match_result['similarity']:.3f} confidence")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ NLP processor error: {e}")
+        return False
+
+def test_chatbot():
+    """Test chatbot functionality"""
+    print("\nTesting chatbot...")
+    
+    try:
+        chatbot = FAQChatbot()
+        print("✓ Chatbot initialized")
+        
+        # Test response generation
+        test_questions = [
+            "What is Python?",
+            "How do I install Python?",
+            "What is machine learning?",
+            "How do I create a virtual environment?",
+            "What is Git?",
+            "Random question that shouldn't match"
+        ]
+        
+        for question in test_questions:
+            response = chatbot.get_response(question)
+            print(f"✓ Q: '{question}'")
+            print(f"  A: {response['answer'][:100]}...")
+            print(f"  Confidence: {response['confidence']:.3f}")
+            print(f"  Match: {response['is_match']}")
+            print()
+        
+        # Test statistics
+        stats = chatbot.get_statistics()
+        print(f"✓ Statistics: {stats}")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Chatbot error: {e}")
+        return False
+
+def test_search():
+    """Test search functionality"""
+    print("\nTesting search functionality...")
+    
+    try:
+        chatbot = FAQChatbot()
+        
+        search_queries = ["python", "install", "machine learning", "git"]
+        
+        for query in search_queries:
+            results = chatbot.search_faqs(query)
+            print(f"✓ Search '{query}': {len(results)} results")
+            for result in results[:2]:  # Show first 2 results
+                print(f"  - {result['question'][:50]}... (similarity: {result['similarity']:.3f})")
+            print()
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Search error: {e}")
+        return False
+
+def test_single_pass_match():
+    """Test that match() returns the best hit and top matches together"""
+    print("\nTesting single-pass matching...")
+    
+    nlp = NLPProcessor()
+    nlp.train_vectorizer(get_questions())
+    
+    result = nlp.match("How do I install Python?", threshold=0.1, top_k=3)
+    assert result['is_match']
+    assert len(result['top_matches']) == 3
+    assert result['top_matches'][0]['index'] == result['index']
+    print(f"✓ Best match: {result['question']} ({result['similarity']:.3f})")
+    
+    chatbot = FAQChatbot()
+    response = chatbot.get_response("How do I install Python?")
+    assert response['debug_info']['top_matches']
+    print(f"✓ Debug info has {len(response['debug_info']['top_matches'])} top matches")
+    
+    return True
+
+def test_retrieval_engine():
+    """Test top-k retrieval against exact cosine similarity"""
+    print("\nTesting retrieval engine...")
+    
+    import numpy as np
+    from sklearn.metrics.pairwise import cosine_similarity
+    from retrieval import select_top_k
+    
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.0])
+    assert list(select_top_k(scores, 3)) == [1, 3, 2]
+    assert list(select_top_k(scores, 10)) == [1, 3, 2, 0, 4]
+    print("✓ Partial top-k selection keeps ties in index order")
+    
+    nlp = NLPProcessor(top_k=4)
+    nlp.train_vectorizer(get_questions())
+    
+    question = "What is a loop in Python programming?"
+    user_vector = nlp.vectorizer.transform([nlp.preprocess_text(question)])
+    expected = cosine_similarity(user_vector, nlp.faq_vectors).ravel()
+    indices, similarities = nlp.retriever.search(user_vector)
+    
+    assert len(indices) == 4
+    assert np.allclose(similarities, np.sort(expected)[::-1][:4])
+    print(f"✓ Retrieved top {len(indices)} matches: {list(indices)}")
+    
+    return True
+
+def test_batch_matching():
+    """Test that batched matching agrees with one-at-a-time matching"""
+    print("\nTesting batch matching...")
+    
+    chatbot = FAQChatbot()
+    nlp = chatbot.nlp_processor
+    
+    questions = [
+        "What is Python?",
+        "How do I commit changes in Git?",
+        "Random question that shouldn't match",
+        "what is a database"
+    ]
+    
+    batch_results = nlp.find_best_matches(questions, threshold=0.15)
+    for question, batch_result in zip(questions, batch_results):
+        single_result = nlp.match(question, threshold=0.15)
+        assert batch_result['index'] == single_result['index']
+        assert [m['index'] for m in batch_result['top_matches']] == \
+            [m['index'] for m in single_result['top_matches']]
+        assert abs(batch_result['similarity'] - single_result['similarity']) < 1e-9
+    print(f"✓ Batch of {len(questions)} questions matches single-query results")
+    
+    responses = chatbot.get_responses(["What is Git?", "   ", "What is an API?"])
+    assert responses[0]['is_match'] and responses[2]['is_match']
+    assert responses[1]['debug_info'] is None
+    print("✓ Empty questions in a batch get the empty response")
+    
+    from app import app
+    client = app.test_client()
+    reply = client.post('/chat/batch', json={'messages': ["What is Git?", "What is an API?"]})
+    data = reply.get_json()
+    assert data['success'] and len(data['responses']) == 2
+    print("✓ /chat/batch returned 2 responses")
+    
+    for messages in (["What is Git?", None], ["What is Git?", 42], ["What is Git?", "  "], [{"text": "Git"}]):
+        reply = client.post('/chat/batch', json={'messages': messages})
+        assert reply.status_code == 400 and not reply.get_json()['success']
+        assert f"Message {len(messages) - 1} " in reply.get_json()['message']
+    reply = client.post('/chat', json={'message': 42})
+    assert reply.status_code == 400 and not reply.get_json()['success']
+    print("✓ Non-string and empty messages rejected with 400 and their position")
+    
+    return True
+
+def test_persisted_index():
+    """Test saving, memory-mapping and rebuilding the FAQ index"""
+    print("\nTesting persisted index...")
+    
+    import os
+    import tempfile
+    from index_store import load_or_build_index, read_manifest
+    
+    questions = get_questions()
+    index_dir = os.path.join(tempfile.mkdtemp(), 'faq_index')
+    
+    assert load_or_build_index(NLPProcessor(), questions, index_dir)
+    print("✓ Index built on first load")
+    
+    nlp = NLPProcessor()
+    assert not load_or_build_index(nlp, questions, index_dir)
+    assert not nlp.faq_vectors.data.flags.writeable
+    print("✓ Index memory-mapped read-only without retraining")
+    
+    trained = NLPProcessor()
+    trained.train_vectorizer(questions)
+    question = "How do I create a virtual environment?"
+    loaded_result = nlp.match(question)
+    trained_result = trained.match(question)
+    assert loaded_result['index'] == trained_result['index']
+    assert abs(loaded_result['similarity'] - trained_result['similarity']) < 1e-9
+    print("✓ Loaded index matches a freshly trained one")
+    
+    old_hash = read_manifest(index_dir)['content_hash']
+    assert load_or_build_index(NLPProcessor(), questions + ["What is a compiler?"], index_dir)
+    assert read_manifest(index_dir)['content_hash'] != old_hash
+    print("✓ Index rebuilt when the FAQ questions change")
+    
+    # Workers cold-starting together rebuild once and all load the index
+    import threading
+    index_dir = os.path.join(tempfile.mkdtemp(), 'faq_index')
+    errors, rebuilds = [], []
+    
+    def cold_start():
+        try:
+            nlp = NLPProcessor()
+            rebuilds.append(load_or_build_index(nlp, questions, index_dir))
+            assert nlp.faq_vectors.shape[0] == len(questions)
+        except Exception as error:
+            errors.append(error)
+    
+    workers = [threading.Thread(target=cold_start) for _ in range(4)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    assert not errors, errors
+    assert rebuilds.count(True) == 1
+    print("✓ Concurrent cold starts rebuild the index once")
+    
+    # Saves repoint a symlink in one step, so readers never find the index missing
+    import shutil
+    from index_store import save_index
+    parent = tempfile.mkdtemp()
+    index_dir = os.path.join(parent, 'faq_index')
+    staging = os.path.join(tempfile.mkdtemp(), 'faq_index')
+    save_index(trained, staging)
+    # A plain index directory, as older saves left it, is migrated
+    shutil.copytree(os.path.realpath(staging), index_dir)
+    save_index(trained, index_dir)
+    assert os.path.islink(index_dir)
+    stop = threading.Event()
+    
+    def keep_saving():
+        while not stop.is_set():
+            save_index(trained, index_dir)
+    
+    saver = threading.Thread(target=keep_saving)
+    saver.start()
+    try:
+        for _ in range(50):
+            assert not load_or_build_index(NLPProcessor(), questions, index_dir)
+    finally:
+        stop.set()
+        saver.join()
+    current = os.path.basename(os.path.realpath(index_dir))
+    assert set(os.listdir(parent)) == {'faq_index', 'faq_index.lock', current}
+    print("✓ Loads during concurrent saves always find a complete index")
+    
+    try:
+        NLPProcessor().load_index(index_dir, questions, expected_hash='0' * 64)
+        assert False, "Expected a content hash mismatch"
+    except ValueError:
+        pass
+    print("✓ Loaded content hash verified")
+    
+    return True
+
+def test_tokenizers():
+    """Test that the regex tokenizer matches the NLTK pipeline output"""
+    print("\nTesting tokenizers...")
+    
+    regex_nlp = NLPProcessor(tokenizer='regex')
+    nltk_nlp = NLPProcessor(tokenizer='nltk')
+    
+    texts = get_questions() + ["I cannot install it, gonna try again!"]
+    for text in texts:
+        assert regex_nlp.preprocess_text(text) == nltk_nlp.preprocess_text(text)
+    print(f"✓ Regex and NLTK tokenizers agree on {len(texts)} questions")
+    
+    try:
+        NLPProcessor(tokenizer='unknown')
+        assert False, "unknown tokenizer should raise"
+    except ValueError:
+        print("✓ Unknown tokenizer names are rejected")
+    
+    # Missing punkt and TextBlob corpora are reported with the download command
+    import tempfile
+    import nltk
+    from nlp_processor import NLTKDataMissingError
+    data_path = nltk.data.path[:]
+    nltk.data.path[:] = [tempfile.mkdtemp()]
+    try:
+        for options in ({'tokenizer': 'nltk'}, {'scoring': 'hybrid'}):
+            try:
+                NLPProcessor(**options)
+                assert False, "Expected NLTKDataMissingError"
+            except NLTKDataMissingError as error:
+                assert 'download_nltk_data.py' in str(error)
+    finally:
+        nltk.data.path[:] = data_path
+    print("✓ Missing tokenizer and keyword corpora raise NLTKDataMissingError")
+    
+    return True
+
+def test_response_cache():
+    """Test the LRU response cache and its invalidation"""
+    print("\nTesting response cache...")
+    
+    from response_cache import LRUCache
+    
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1
+    assert cache.stats()['evictions'] == 1
+    print("✓ Least recently used entry evicted")
+    
+    now = [0.0]
+    cache = LRUCache(maxsize=10, ttl=5, timer=lambda: now[0])
+    cache.put('a', 1)
+    now[0] = 6.0
+    assert cache.get('a') is None and cache.stats()['expirations'] == 1
+    print("✓ Entries expire after the TTL")
+    
+    chatbot = FAQChatbot()
+    first = chatbot.get_response("What is Python?")
+    second = chatbot.get_response("what is python")
+    assert second is first
+    stats = chatbot.cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    print(f"✓ Near-identical phrasings share a cache entry: {stats}")
+    
+    chatbot.similarity_threshold = 0.5
+    third = chatbot.get_response("What is Python?")
+    assert third is not first
+    assert third['debug_info']['similarity_threshold'] == 0.5
+    print("✓ Cache invalidated when the threshold changes")
+    
+    chatbot.nlp_processor.train_vectorizer(chatbot.questions)
+    assert chatbot.get_response("What is Python?") is not third
+    print("✓ Cache invalidated when the FAQ index changes")
+    
+    return True
+
+def test_faq_store():
+    """Test incremental FAQ add, update and remove"""
+    print("\nTesting FAQ store...")
+    
+    from faq_store import FAQStore
+    
+    chatbot = FAQChatbot()
+    store = FAQStore(chatbot, refresh_after_edits=10)
+    n_faqs = len(chatbot.faqs)
+    
+    faq_id = store.add("How do I install Git?", "Download Git from git-scm.com.")
+    response = chatbot.get_response("How do I install Git?")
+    assert response['answer'] == "Download Git from git-scm.com."
+    assert chatbot.nlp_processor.faq_vectors.shape[0] == n_faqs + 1
+    print("✓ Added FAQ is matched without refitting")
+    
+    store.update(faq_id, answer="Use your package manager or git-scm.com.")
+    response = chatbot.get_response("How do I install Git?")
+    assert response['answer'] == "Use your package manager or git-scm.com."
+    print("✓ Updated answer is served")
+    
+    store.remove(0)
+    response = chatbot.get_response("What is Python?")
+    assert response['matched_question'] != "What is Python?"
+    assert len(chatbot.faqs) == n_faqs and store.stale_edits == 3
+    print("✓ Removed FAQ is no longer matched")
+    
+    store.refresh()
+    assert store.stale_edits == 0
+    assert chatbot.get_response("How do I install Git?")['is_match']
+    print("✓ Vectorizer refit on refresh")
+    
+    return True
+
+def test_async_app():
+    """Test the ASGI app's /chat contract, backpressure and shutdown"""
+    print("\nTesting async app...")
+    
+    import asyncio
+    import json
+    import os
+    import time
+    from asgi_app import AsyncChatApp
+    
+    async def post(app, payload):
+        messages = []
+        
+        async def receive():
+            return {'type': 'http.request', 'body': json.dumps(payload).encode('utf-8')}
+        
+        async def send(message):
+            messages.append(message)
+        
+        await app({'type': 'http', 'method': 'POST', 'path': '/chat'}, receive, send)
+        return messages[0]['status'], json.loads(messages[1]['body'])
+    
+    async def run():
+        app = AsyncChatApp(workers=1, max_pending=1, request_timeout=30)
+        await app.startup()
+        try:
+            status, data = await post(app, {'message': 'What is Python?'})
+            assert status == 200 and data['success'] and data['is_match']
+            assert set(data) == {'success', 'response', 'confidence', 'matched_question',
+                                 'is_match', 'debug_info'}
+            print(f"✓ /chat answered: {data['matched_question']}")
+            
+            status, data = await post(app, {'message': 'What is Python?', 'verbosity': 'slim'})
+            assert status == 200 and 'debug_info' not in data
+            print("✓ Slim payload without debug_info")
+            
+            status, data = await post(app, {'message': None})
+            assert status == 400 and not data['success']
+            print("✓ Non-string message rejected with 400")
+            
+            results = await asyncio.gather(*[
+                post(app, {'message': 'What is Git?'}) for _ in range(3)
+            ])
+            statuses = sorted(status for status, _ in results)
+            assert statuses[0] == 200 and 503 in statuses
+            print(f"✓ Requests beyond max_pending rejected: {statuses}")
+            
+            status, data = await post(app, {'message': 'What is Python?', 'collection': 'no-such-tenant'})
+            assert status == 404 and not data['success']
+            print("✓ Unknown collection rejected with 404")
+            
+            # A timed-out job keeps its slot until the busy worker gets to it
+            busy = app.pool.submit(time.sleep, 1.0)
+            app.request_timeout = 0.2
+            status, _ = await post(app, {'message': 'What is Git?'})
+            assert status == 504 and app._pending == 1
+            status, data = await post(app, {'message': 'What is Git?'})
+            assert status == 503 and 'busy' in data['message']
+            await asyncio.wrap_future(busy)
+            while app._pending:
+                await asyncio.sleep(0.01)
+            print("✓ Timed-out jobs count against max_pending until they finish")
+            
+            # A dead worker breaks the pool; it is replaced instead of failing forever
+            app.request_timeout = 30
+            broken = app.pool
+            try:
+                await asyncio.wrap_future(broken.submit(os._exit, 1))
+            except Exception:
+                pass
+            status, data = await post(app, {'message': 'What is Python?'})
+            assert status == 503 and app.pool is not broken
+            status, data = await post(app, {'message': 'What is Python?'})
+            assert status == 200 and data['is_match']
+            print("✓ Broken worker pool replaced")
+        finally:
+            await app.shutdown()
+        
+        status, _ = await post(app, {'message': 'What is Python?'})
+        assert status == 503
+        print("✓ Requests after shutdown rejected")
+    
+    asyncio.run(run())
+    return True
+
+def test_metrics():
+    """Test stage instrumentation and the /metrics endpoint"""
+    print("\nTesting metrics...")
+    
+    from metrics import MetricsRegistry, METRICS, RESPONSES
+    
+    registry = MetricsRegistry(enabled=False)
+    counter = registry.counter('test_total', 'Test counter')
+    counter.inc()
+    assert registry.start_timer() is None and counter.value() == 0
+    print("✓ Disabled registry records nothing")
+    
+    from app import app
+    client = app.test_client()
+    matches_before = RESPONSES.value('match')
+    client.post('/chat', json={'message': 'What is Git?'})
+    text = client.get('/metrics').get_data(as_text=True)
+    
+    if METRICS.enabled:
+        assert RESPONSES.value('match') == matches_before + 1
+        for stage in ('preprocess', 'transform', 'score', 'serialize'):
+            assert f'faq_stage_latency_seconds_count{{stage="{stage}"}}' in text
+        assert 'faq_requests_total{endpoint="/chat",outcome="success"}' in text
+        assert 'faq_match_confidence_bucket{le="+Inf"}' in text
+    assert 'faq_response_cache_hits_total' in text
+    print(f"✓ /metrics exposed {len(text.splitlines())} lines")
+    
+    return True
+
+def test_lazy_startup():
+    """Test that importing the app loads no heavy libraries or chatbot"""
+    print("\nTesting lazy startup...")
+    
+    import subprocess
+    import sys
+    
+    code = (
+        "import sys, app; "
+        "print(app.chatbot is None, [m for m in ('sklearn', 'scipy', 'nltk', 'textblob', 'numpy') "
+        "if m in sys.modules])"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "True []", output.stdout
+    print("✓ Importing app builds no chatbot and loads no heavy libraries")
+    
+    import app
+    assert app.warm_up() is app.get_chatbot() is not None
+    print("✓ warm_up() builds the chatbot once")
+    
+    import time
+    app.chatbot = None
+    app._warm_up_failed_at = time.monotonic()
+    assert app.warm_up() is None
+    app._warm_up_failed_at -= app.WARM_UP_RETRY_SECONDS
+    assert app.warm_up() is not None and app._warm_up_failed_at is None
+    print("✓ A failed warm-up is retried after WARM_UP_RETRY_SECONDS")
+    
+    return True
+
+def test_faq_collections():
+    """Test lazily loaded FAQ collections with LRU eviction under a memory budget"""
+    print("\nTesting FAQ collections...")
+    
+    import json
+    import os
+    import tempfile
+    from faq_collections import CollectionManager, UnknownCollectionError, estimate_memory
+    
+    gardening = [
+        {"question": "When do I plant tomatoes?", "answer": "After the last frost."},
+        {"question": "How often do I water cactus?", "answer": "Every two to three weeks."}
+    ]
+    
+    with tempfile.TemporaryDirectory() as collections_dir:
+        with open(os.path.join(collections_dir, 'cooking.json'), 'w', encoding='utf-8') as f:
+            json.dump([
+                {"question": "How long do I boil an egg?", "answer": "About nine minutes."},
+                {"question": "How do I bake bread?", "answer": "Knead, proof, then bake at 220C."}
+            ], f)
+        
+        manager = CollectionManager(collections_dir=collections_dir, memory_budget=10 ** 9)
+        manager.register('gardening', gardening)
+        assert manager.names() == ['cooking', 'default', 'gardening']
+        assert manager.loaded() == []
+        
+        cooking = manager.get('cooking')
+        assert cooking.get_response("how to boil an egg")['answer'] == "About nine minutes."
+        assert manager.get('cooking') is cooking and manager.loads == 1
+        assert manager.get().get_response("What is Python?")['is_match']
+        print("✓ Collections load on first use with their own index")
+        
+        for name in ('missing', '../etc/passwd'):
+            try:
+                manager.get(name)
+                assert False, "Expected UnknownCollectionError"
+            except UnknownCollectionError:
+                pass
+        for i in range(100):
+            try:
+                manager.get(f'tenant-{i}')
+            except UnknownCollectionError:
+                pass
+        assert set(manager._load_locks) == {'cooking', 'default'}
+        print("✓ Unknown and invalid collection names rejected")
+        
+        # Room for the two small collections, not the bundled one as well
+        small = estimate_memory(manager.get('gardening')) + estimate_memory(cooking)
+        manager = CollectionManager(collections_dir=collections_dir, memory_budget=small)
+        manager.register('gardening', gardening)
+        manager.get('cooking')
+        manager.get('gardening')
+        manager.get('cooking')
+        assert manager.loaded() == ['gardening', 'cooking'] and manager.evictions == 0
+        
+        # The bundled collection does not fit next to them: gardening goes first
+        manager.get('default')
+        assert 'gardening' not in manager.loaded() and manager.loaded()[-1] == 'default'
+        assert manager.evictions >= 1 and set(manager._load_locks) == set(manager.loaded())
+        print(f"✓ LRU eviction under the memory budget: loaded {manager.loaded()}")
+        
+        # Caches filled by traffic count towards the budget
+        manager = CollectionManager(collections_dir=collections_dir, memory_budget=small)
+        manager.register('gardening', gardening)
+        manager.get('gardening')
+        cooking = manager.get('cooking')
+        empty_size = estimate_memory(cooking)
+        for i in range(500):
+            cooking.get_response(f"how long do I boil egg number {i}")
+        grown_size = estimate_memory(cooking)
+        assert grown_size > empty_size + 500 * 500
+        manager.refresh_sizes(keep='cooking')
+        assert manager.loaded() == ['cooking'] and manager.memory_usage() == grown_size
+        print(f"✓ Estimate grows with the caches ({empty_size:,} -> {grown_size:,} bytes) and triggers eviction")
+    
+    from app import app
+    client = app.test_client()
+    data = client.post('/chat', json={'message': 'What is Python?', 'collection': 'default'}).get_json()
+    assert data['success'] and data['is_match']
+    response = client.post('/chat', json={'message': 'What is Python?', 'collection': 'no-such-tenant'})
+    assert response.status_code == 404 and not response.get_json()['success']
+    assert 'default' in client.get('/collections').get_json()['loaded']
+    print("✓ /chat routes messages by collection")
+    
+    return True
+
+def test_streaming_ingest():
+    """Test building the index from JSONL and CSV files in chunks"""
+    print("\nTesting streaming ingestion...")
+    
+    import csv
+    import json
+    import os
+    import tempfile
+    import numpy as np
+    from scipy import sparse
+    from faq_ingest import CountSpool, ingest_faqs, iter_faq_file
+    
+    expected = NLPProcessor()
+    expected.train_vectorizer(get_questions(), get_answers())
+    
+    chunks = [sparse.csr_matrix(np.array([[0, 2, 0], [1, 0, 3]])), sparse.csr_matrix(np.array([[0, 0, 0]])),
+              sparse.csr_matrix(np.array([[4, 0, 1]]))]
+    with CountSpool(3) as count_spool:
+        for chunk in chunks:
+            count_spool.append(chunk)
+        stacked = count_spool.to_csr()
+    assert stacked.dtype == np.float64 and np.array_equal(stacked.toarray(), sparse.vstack(chunks).toarray())
+    print("✓ Count chunks spooled to disk and read back as one matrix")
+    
+    with tempfile.TemporaryDirectory() as data_dir:
+        jsonl_path = os.path.join(data_dir, 'faqs.jsonl')
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            for faq in get_faqs():
+                f.write(json.dumps(faq) + '\n')
+        csv_path = os.path.join(data_dir, 'faqs.csv')
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['question', 'answer'])
+            writer.writeheader()
+            writer.writerows(get_faqs())
+        
+        for path, n_jobs in [(jsonl_path, 1), (csv_path, 2)]:
+            assert list(iter_faq_file(path)) == get_faqs()
+            
+            progress = []
+            nlp = NLPProcessor()
+            stats = ingest_faqs(nlp, iter_faq_file(path), chunk_size=5, n_jobs=n_jobs,
+                                progress=lambda stage, rows, seconds: progress.append((stage, rows)))
+            assert stats['rows'] == len(get_faqs())
+            assert progress[-1] == ('vectorize', len(get_faqs()))
+            assert nlp.vectorizer.vocabulary_ == expected.vectorizer.vocabulary_
+            assert np.array_equal(nlp.vectorizer.idf_, expected.vectorizer.idf_)
+            assert np.allclose(nlp.faq_vectors.toarray(), expected.faq_vectors.toarray())
+            assert nlp.match("How do I install Python?")['answer'] == get_answers()[1]
+            print(f"✓ {os.path.basename(path)} ingested with n_jobs={n_jobs}: {stats['rows']} rows "
+                  f"({stats['rows_per_second']:.0f} rows/s)")
+        
+        # The CLI never falls back to the served index directory
+        import io
+        from contextlib import redirect_stderr
+        import faq_ingest
+        try:
+            with redirect_stderr(io.StringIO()):
+                faq_ingest.main([jsonl_path])
+            assert False, "Expected index_dir to be required"
+        except SystemExit:
+            pass
+        print("✓ faq_ingest.py requires an index directory")
+    
+    return True
+
+def test_parallel_build():
+    """Test that parallel corpus preprocessing matches the serial path"""
+    print("\nTesting parallel index build...")
+    
+    import numpy as np
+    
+    questions = get_questions() * 20
+    nlp = NLPProcessor()
+    serial = [nlp.preprocess_text(question) for question in questions]
+    assert nlp.preprocess_corpus(questions, n_jobs=2, chunk_size=7) == serial
+    print(f"✓ {len(questions)} questions preprocessed in 2 workers, in order")
+    
+    # Large enough to span several chunks of the default size
+    questions = get_questions() * 700
+    expected = NLPProcessor().train_vectorizer(questions)
+    faq_vectors = NLPProcessor(n_jobs=2).train_vectorizer(questions)
+    assert np.array_equal(faq_vectors.toarray(), expected.toarray())
+    print("✓ train_vectorizer(n_jobs=2) builds the serial index")
+    
+    return True
+
+def test_preprocess_memo():
+    """Test the preprocess memo and token cache"""
+    print("\nTesting preprocess memo...")
+    
+    nlp = NLPProcessor(preprocess_cache_size=2, token_cache_size=3)
+    plain = NLPProcessor(preprocess_cache_size=0, token_cache_size=0)
+    texts = ["What is Python?", "How do I install Python?", "What is Python?", "Python data science"]
+    for text in texts:
+        assert nlp.preprocess_text(text) == plain.preprocess_text(text)
+    
+    stats = nlp.preprocess_stats()
+    assert stats['memo']['hits'] == 1 and stats['memo']['misses'] == 3
+    assert stats['memo']['evictions'] == 1
+    assert stats['token_cache']['size'] == 3 and stats['token_cache']['evictions'] > 0
+    assert list(nlp._token_cache)[-1] == 'science'
+    print(f"✓ Memo hits/misses/evictions: {stats['memo']['hits']}/{stats['memo']['misses']}/{stats['memo']['evictions']}")
+    
+    assert nlp.preprocess_text("python python java") == "python python java"
+    assert plain.preprocess_stats()['memo']['size'] == 0
+    print("✓ Bounded memo and token cache give the same output as no memo")
+    
+    nlp = NLPProcessor()
+    nlp.train_vectorizer(get_questions())
+    misses = nlp.preprocess_stats()['memo']['misses']
+    nlp.find_best_match(get_questions()[0])
+    assert nlp.preprocess_stats()['memo']['misses'] == misses
+    print("✓ Matching an FAQ question reuses the memo filled by the index build")
+    
+    import threading
+    nlp = NLPProcessor(preprocess_cache_size=0, token_cache_size=50)
+    
+    def preprocess(thread):
+        for i in range(0, 2000, 4):
+            nlp.preprocess_text(' '.join(f"word{thread}x{j}" for j in range(i, i + 4)))
+    
+    threads = [threading.Thread(target=preprocess, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = nlp.preprocess_stats()['token_cache']
+    assert stats['size'] == 50 and stats['misses'] == 8000 and stats['evictions'] == 7950
+    print(f"✓ Token cache counters consistent under concurrent misses: {stats}")
+    
+    return True
+
+def test_compact_index():
+    """Test float32 storage and the sorted vocabulary against the default index"""
+    print("\nTesting compact index...")
+    
+    import os
+    import tempfile
+    import numpy as np
+    from compact_index import SortedVocabulary, index_nbytes
+    from index_store import load_or_build_index
+    
+    vocabulary = {"zeta": 0, "alpha": 1, "été": 2, "beta gamma": 3}
+    sorted_vocabulary = SortedVocabulary(vocabulary)
+    assert dict(sorted_vocabulary.items()) == vocabulary
+    assert "missing" not in sorted_vocabulary and sorted_vocabulary.get("été") == 2
+    print("✓ Sorted vocabulary maps every term to its column")
+    
+    default = NLPProcessor()
+    default.train_vectorizer(get_questions())
+    compact = NLPProcessor(compact=True)
+    compact.train_vectorizer(get_questions())
+    assert compact.faq_vectors.dtype == np.float32 and compact.faq_vectors.indices.dtype == np.int32
+    assert isinstance(compact.vectorizer.vocabulary_, SortedVocabulary)
+    assert dict(compact.vectorizer.vocabulary_.items()) == default.vectorizer.vocabulary_
+    
+    queries = get_questions() + ["how to learn python", "git branches", "what is an api", "sql database"]
+    for query in queries:
+        expected = default.match(query, threshold=0.0)
+        result = compact.match(query, threshold=0.0)
+        assert result['index'] == expected['index']
+        assert abs(result['similarity'] - expected['similarity']) < 1e-6
+    print(f"✓ Top-1 unchanged for {len(queries)} queries")
+    
+    sizes, default_sizes = index_nbytes(compact), index_nbytes(default)
+    assert sizes['bytes_per_faq'] < default_sizes['bytes_per_faq']
+    print(f"✓ {sizes['bytes_per_faq']:.0f} bytes/FAQ vs {default_sizes['bytes_per_faq']:.0f}")
+    
+    index_dir = os.path.join(tempfile.mkdtemp(), 'faq_index')
+    load_or_build_index(NLPProcessor(compact=True), get_questions(), index_dir)
+    loaded = NLPProcessor(compact=True)
+    assert not load_or_build_index(loaded, get_questions(), index_dir)
+    assert loaded.faq_vectors.dtype == np.float32
+    assert loaded.match("What is Git?")['index'] == default.match("What is Git?")['index']
+    print("✓ Compact index saved and memory-mapped as float32")
+    
+    # Inverted-index pruning keeps FAQs that tie after float32 rounding:
+    # 0.6006 * 0.8325008 is 6.8e-9 below 0.5 in float64 but 0.5 in float32
+    from scipy import sparse
+    from inverted_index import InvertedIndexRetriever
+    from retrieval import SparseRetriever
+    matrix = sparse.csr_matrix(np.array([[0, 0.8325008], [0.5, 0]], dtype=np.float32))
+    query_vector = sparse.csr_matrix(np.array([[1.0, np.float32(0.6006)]]))
+    expected = SparseRetriever(matrix, normalized=True).search(query_vector, k=1)
+    assert expected[0].tolist() == [0]
+    result = InvertedIndexRetriever(matrix, normalized=True).search(query_vector, k=1)
+    assert np.array_equal(result[0], expected[0]) and np.array_equal(result[1], expected[1])
+    
+    inverted = NLPProcessor(compact=True, retrieval='inverted')
+    inverted.train_vectorizer(get_questions())
+    exact = SparseRetriever(inverted.faq_vectors, normalized=True)
+    query_vectors = inverted.vectorizer.transform([inverted.preprocess_text(query) for query in queries])
+    for k in (1, 3, 10):
+        for row in range(query_vectors.shape[0]):
+            indices, scores = inverted.retriever.search(query_vectors[row], k=k)
+            exact_indices, exact_scores = exact.search(query_vectors[row], k=k)
+            assert np.array_equal(indices, exact_indices) and np.array_equal(scores, exact_scores)
+    print("✓ Compact inverted index returns the same top k as the float32 full scan")
+    
+    return True
+
+def test_keyword_index():
+    """Test the keyword index and hybrid keyword + TF-IDF scoring"""
+    print("\nTesting keyword index...")
+    
+    from keyword_index import KeywordIndex
+    
+    index = KeywordIndex([("python",), ("python", "virtual environment"), ()])
+    assert index.n_faqs == 3 and len(index) == 2
+    assert index.query_keywords("create virtual environment python") == ("python", "virtual environment")
+    rows, scores = index.score("create virtual environment python")
+    assert list(rows) == [0, 1] and abs(scores[1] - 1.0) < 1e-12 and scores[0] < 1.0
+    print("✓ Keyword phrases looked up among query n-grams")
+    
+    def word_keywords(text):
+        # Stands in for the TextBlob extractor, which needs tagger corpora
+        return text.rstrip('?').split()
+    
+    tfidf = NLPProcessor()
+    tfidf.train_vectorizer(get_questions(), get_answers())
+    hybrid = NLPProcessor(scoring='hybrid', keyword_extractor=word_keywords)
+    hybrid.train_vectorizer(get_questions(), get_answers())
+    assert hybrid.index.keywords is not None and tfidf.index.keywords is None
+    
+    for question in get_questions():
+        assert hybrid.match(question)['question'] == question
+    batch = hybrid.find_best_matches(["What is Git?", "learn python programming"])
+    assert [result['index'] for result in batch] == [
+        hybrid.match("What is Git?")['index'], hybrid.match("learn python programming")['index']
+    ]
+    result = hybrid.match("what is git", threshold=0.0)
+    similarities = [match['similarity'] for match in result['top_matches']]
+    assert similarities == sorted(similarities, reverse=True) and similarities[0] <= 1.0 + 1e-9
+    print("✓ Hybrid scoring matches every FAQ question to itself")
+    
+    questions = get_questions()
+    hybrid.train_vectorizer(questions + ["What is a keyword index?"])
+    assert len(hybrid._faq_keywords) == len(questions) + 1
+    assert hybrid.match("keyword index")['question'] == "What is a keyword index?"
+    print("✓ Rebuild reuses the keywords of unchanged questions")
+    
+    import os
+    import tempfile
+    import numpy as np
+    from faq_store import FAQStore
+    from index_store import load_or_build_index
+    
+    extracted = []
+    
+    def counting_keywords(text):
+        extracted.append(text)
+        return word_keywords(text)
+    
+    index_dir = os.path.join(tempfile.mkdtemp(), 'faq_index')
+    load_or_build_index(NLPProcessor(scoring='hybrid', keyword_extractor=counting_keywords),
+                        questions, index_dir, get_answers())
+    extracted.clear()
+    chatbot = FAQChatbot(index_path=index_dir,
+                         nlp_options={'scoring': 'hybrid', 'keyword_extractor': counting_keywords})
+    loaded = chatbot.nlp_processor
+    assert extracted == [] and not loaded.index.keywords.rows.flags.writeable
+    trained = NLPProcessor(scoring='hybrid', keyword_extractor=word_keywords)
+    trained.train_vectorizer(questions)
+    for query in questions + ["learn python programming", "git branch"]:
+        result, expected = loaded.match(query), trained.match(query)
+        assert result['index'] == expected['index'] and abs(result['similarity'] - expected['similarity']) < 1e-9
+    print("✓ Keyword postings saved with the index and memory-mapped on load")
+    
+    store = FAQStore(chatbot)
+    faq_id = store.add("What is a keyword index?", "Keywords mapped to FAQs.")
+    store.update(0, question="What is the Python language?")
+    store.remove(2)
+    assert extracted == ["What is a keyword index?", "What is the Python language?"]
+    expected = NLPProcessor(scoring='hybrid', keyword_extractor=word_keywords)
+    expected.train_vectorizer(chatbot.questions)
+    for query in ("keyword index", "python language", "git branch"):
+        rows, scores = loaded.index.keywords.score(loaded.preprocess_text(query))
+        expected_rows, expected_scores = expected.index.keywords.score(expected.preprocess_text(query))
+        assert np.array_equal(rows, expected_rows) and np.allclose(scores, expected_scores)
+    assert chatbot.get_response("keyword index")['matched_question'] == "What is a keyword index?"
+    print("✓ FAQStore edits extract keywords for the edited questions only")
+    
+    return True
+
+def test_response_serialization():
+    """Test native match types, slim payloads and the fast JSON path"""
+    print("\nTesting response serialization...")
+    
+    import json
+    import serialization
+    from app import app
+    from chatbot import format_response
+    
+    chatbot = FAQChatbot()
+    response = chatbot.get_response("How do I learn Python?")
+    top_match = response['debug_info']['top_matches'][0]
+    assert type(response['confidence']) is float and type(response['is_match']) is bool
+    assert type(top_match['index']) is int and type(top_match['similarity']) is float
+    print("✓ Matching returns Python int, float and bool")
+    
+    full = format_response(response)
+    slim = format_response(response, 'slim')
+    assert 'debug_info' not in slim and slim == {k: v for k, v in full.items() if k != 'debug_info'}
+    assert json.loads(serialization.dumps(full)) == json.loads(json.dumps(full))
+    assert len(serialization.dumps(slim)) < len(serialization.dumps(full))
+    print(f"✓ Slim payload {len(serialization.dumps(slim))} bytes vs full "
+          f"{len(serialization.dumps(full))} ({serialization.backend()})")
+    
+    import numpy as np
+    assert json.loads(serialization.dumps({'index': np.int64(3), 'scores': np.arange(2.0)})) == {
+        'index': 3, 'scores': [0.0, 1.0]
+    }
+    
+    client = app.test_client()
+    data = client.post('/chat', json={'message': 'What is Git?', 'verbosity': 'slim'}).get_json()
+    assert data['success'] and 'debug_info' not in data
+    data = client.post('/chat/batch', json={'messages': ['What is Git?'], 'verbosity': 'full'}).get_json()
+    assert 'debug_info' in data['responses'][0]
+    data = client.post('/chat', json={'message': 'What is Git?', 'verbosity': 'loud'}).get_json()
+    assert not data['success']
+    print("✓ /chat and /chat/batch honour verbosity")
+    
+    return True
+
+def test_sharded_index():
+    """Test that scatter-gather over row shards gives the unsharded top-k"""
+    print("\nTesting sharded index...")
+    
+    import os
+    import numpy as np
+    from sharded_index import shard_bounds
+    
+    assert shard_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    
+    questions = get_questions() * 4
+    exact = NLPProcessor(top_k=7)
+    exact.train_vectorizer(questions)
+    sharded = NLPProcessor(top_k=7, retrieval='sharded', retrieval_options={'n_shards': 3})
+    sharded.train_vectorizer(questions)
+    retriever = sharded.retriever
+    assert retriever.n_shards == 3
+    
+    queries = get_questions() + ["learn python and git", "database", "zzz unknown words"]
+    vectors = exact.vectorize_questions(queries)
+    for row in range(len(queries)):
+        expected = exact.retriever.search(vectors[row], k=7)
+        result = retriever.search(vectors[row], k=7)
+        assert np.array_equal(result[0], expected[0]) and np.array_equal(result[1], expected[1])
+    for result, expected in zip(retriever.search_batch(vectors, k=7), exact.retriever.search_batch(vectors, k=7)):
+        assert np.array_equal(result[0], expected[0]) and np.array_equal(result[1], expected[1])
+    print(f"✓ Top-k identical to the unsharded index for {len(queries)} queries")
+    
+    assert sharded.match("What is Git?")['top_matches'] == exact.match("What is Git?")['top_matches']
+    
+    # A dead worker breaks the pool; the search starts a new one and retries
+    broken = retriever._pool()
+    try:
+        broken.submit(os._exit, 1).result()
+    except Exception:
+        pass
+    result = retriever.search(vectors[0], k=7)
+    assert np.array_equal(result[0], exact.retriever.search(vectors[0], k=7)[0])
+    assert retriever._resources['pool'] is not broken
+    print("✓ Broken worker pool replaced")
+    
+    # Replacing the index closes the old retriever; searches on it still work
+    directory = retriever._resources['directory']
+    sharded.train_vectorizer(questions)
+    assert not os.path.exists(directory) and sharded.retriever is not retriever
+    result = retriever.search(vectors[0], k=7)
+    assert np.array_equal(result[0], exact.retriever.search(vectors[0], k=7)[0])
+    print("✓ Worker pool and shared matrix files released when the index is replaced")
+    
+    # Workers never open the persisted index, which a rebuild swaps out
+    import tempfile
+    from index_store import save_index
+    index_dir = os.path.join(tempfile.mkdtemp(), 'faq_index')
+    save_index(exact, index_dir)
+    loaded = NLPProcessor(top_k=7, retrieval='sharded', retrieval_options={'n_shards': 3})
+    loaded.load_index(index_dir, questions)
+    paths = loaded.retriever.paths
+    assert all(not path.startswith(index_dir + os.sep) for path in paths.values())
+    assert os.stat(paths['data']).st_ino == os.stat(os.path.join(index_dir, 'data.npy')).st_ino
+    other = NLPProcessor(top_k=7)
+    other.train_vectorizer(list(reversed(get_questions())) * 2)
+    save_index(other, index_dir)
+    for row in range(len(queries)):
+        result = loaded.retriever.search(vectors[row], k=7)
+        expected = exact.retriever.search(vectors[row], k=7)
+        assert np.array_equal(result[0], expected[0]) and np.array_equal(result[1], expected[1])
+    directory = loaded.retriever._resources['directory']
+    loaded.retriever.close()
+    sharded.retriever.close()
+    assert not os.path.exists(directory)
+    print("✓ Persisted index files hard-linked, unaffected by a rebuild before the first search")
+    
+    return True
+
+def test_spelling_correction():
+    """Test symmetric-delete spelling correction before vectorization"""
+    print("\nTesting spelling correction...")
+    
+    from spelling import SpellingCorrector, edit_distance
+    
+    assert edit_distance("pyhton", "python", 2) == 1
+    assert edit_distance("enviroment", "environment", 2) == 1
+    assert edit_distance("abc", "xyz", 2) == 3
+    corrector = SpellingCorrector({"python": 2, "pylon": 1, "environment": 1}, ignore=["the"])
+    assert corrector.correct("pyhton") == "python" and corrector.correct("enviroment") == "environment"
+    assert corrector.correct("the") == "the" and corrector.correct("zebra") is None
+    print("✓ Closest vocabulary word found within the edit distance")
+    
+    plain = FAQChatbot()
+    chatbot = FAQChatbot(nlp_options={'spelling_correction': True})
+    for question, expected in [("pyhton", "What is Python?"),
+                               ("what is machin lerning", "What is machine learning?")]:
+        assert not plain.get_response(question)['is_match']
+        response = chatbot.get_response(question)
+        assert response['matched_question'] == expected
+    for question in get_questions():
+        assert chatbot.get_response(question)['matched_question'] == question
+    batch = chatbot.get_responses(["pyhton", "What is Git?"])
+    assert [response['matched_question'] for response in batch] == ["What is Python?", "What is Git?"]
+    print("✓ Misspelled questions matched, correct ones unchanged")
+    
+    # The batched "pyhton" is answered from the response cache
+    stats = chatbot.nlp_processor.spelling_stats()
+    assert stats['enabled'] and stats['corrections'] == 3 and stats['corrected_questions'] == 2
+    assert plain.nlp_processor.spelling_stats()['corrections'] == 0
+    print(f"✓ Spelling stats: {stats}")
+    
+    import os
+    import tempfile
+    import threading
+    from faq_store import FAQStore
+    from index_store import load_or_build_index
+    
+    nlp = NLPProcessor(spelling_correction=True)
+    nlp.train_vectorizer(get_questions())
+    threads = [threading.Thread(target=lambda: [nlp.correct_spelling("pyhton") for _ in range(2000)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = nlp.spelling_stats()
+    assert stats['lookups'] == stats['corrections'] == stats['corrected_questions'] == 8000
+    print("✓ Spelling counters exact under concurrent corrections")
+    
+    index_dir = os.path.join(tempfile.mkdtemp(), 'faq_index')
+    load_or_build_index(NLPProcessor(spelling_correction=True), get_questions(), index_dir, get_answers())
+    preprocessed = []
+    
+    class CountingProcessor(NLPProcessor):
+        def preprocess_corpus(self, texts):
+            preprocessed.extend(texts)
+            return super().preprocess_corpus(texts)
+    
+    loaded = CountingProcessor(spelling_correction=True)
+    loaded.load_index(index_dir, get_questions(), get_answers())
+    assert preprocessed == [] and loaded.index.spelling.ignore == nlp.index.spelling.ignore
+    assert loaded.index.spelling.words == nlp.index.spelling.words
+    print("✓ Ignored words saved with the index, no preprocessing on load")
+    
+    chatbot = FAQChatbot(index_path=index_dir, nlp_options={'spelling_correction': True})
+    processor = chatbot.nlp_processor
+    processor.preprocess_corpus = lambda texts: preprocessed.extend(texts) or NLPProcessor.preprocess_corpus(
+        processor, texts
+    )
+    dictionary = processor.index.spelling._deletes
+    store = FAQStore(chatbot)
+    store.add("What is Kubernetes?", "A container orchestrator.")
+    store.update(1, answer="Changed answer.")
+    store.remove(2)
+    assert preprocessed == ["What is Kubernetes?"] and processor.index.spelling._deletes is dictionary
+    assert "kubernetes" in processor.index.spelling.ignore
+    assert processor.correct_spelling("kubernetes") == "kubernetes"
+    print("✓ FAQStore edits preprocess the edited questions only")
+    
+    return True
+
+def test_evaluation():
+    """Test batched offline evaluation and the threshold sweep"""
+    print("\nTesting evaluation...")
+    
+    import io
+    import json
+    import os
+    import tempfile
+    from contextlib import redirect_stdout
+    import numpy as np
+    import evaluate
+    
+    sweep = evaluate.threshold_sweep(
+        np.array([0, 1, 2, 3]), np.array([0.9, 0.6, 0.3, 0.1]), np.array([0, 5, 2, -1]), [0.0, 0.2, 0.5]
+    )
+    assert sweep['precision'].tolist() == [0.5, 2 / 3, 0.5]
+    assert sweep['recall'].tolist() == [2 / 3, 2 / 3, 1 / 3]
+    assert sweep['accuracy'].tolist() == [0.5, 0.75, 0.5]
+    assert evaluate.recommend_threshold(sweep) == 0.2
+    print("✓ Precision, recall and accuracy per threshold")
+    
+    nlp = NLPProcessor()
+    nlp.train_vectorizer(get_questions())
+    queries = get_questions() + ["learn python", "git branches", "what is the weather like", "cook pasta"]
+    indices, scores = evaluate.best_matches(nlp, queries)
+    for query, index, score in zip(queries, indices, scores):
+        result = nlp.match(query, threshold=0.0)
+        assert result['index'] == index and abs(result['similarity'] - score) < 1e-12
+    print(f"✓ Batched scoring agrees with match() on {len(queries)} queries")
+    
+    path = os.path.join(tempfile.mkdtemp(), 'labeled.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        for index, question in enumerate(get_questions()):
+            f.write(json.dumps({'query': question.lower(), 'expected': index}) + '\n')
+        f.write(json.dumps({'query': "What is Python?", 'expected': "What is Python?"}) + '\n')
+        f.write(json.dumps({'query': "what is the weather like", 'expected': None}) + '\n')
+    output = path + '.report.json'
+    with redirect_stdout(io.StringIO()) as printed:
+        evaluate.main([path, '--output', output])
+    with open(output, encoding='utf-8') as f:
+        report = json.load(f)
+    assert report['queries'] == len(get_questions()) + 2 and report['expected_matches'] == len(get_questions()) + 1
+    assert report['recommended']['accuracy'] == 1.0 and 'Recommended' in printed.getvalue()
+    print(f"✓ Recommended threshold {report['recommended_threshold']:.2f} from the CLI report")
+    
+    return True
+
+def test_concurrent_reloads():
+    """Test that threads keep getting consistent responses while the index reloads"""
+    print("\n🧪 Testing Concurrent Reloads...")
+    
+    import sys
+    import threading
+    import time
+    
+    # Two FAQ sets with the questions in opposite orders and different
+    # answers, so a response mixing two indexes pairs the wrong answer
+    faqs_a = get_faqs()
+    faqs_b = [{"question": faq["question"], "answer": "B: " + faq["answer"]} for faq in reversed(faqs_a)]
+    valid_pairs = {(faq["question"], faq["answer"]) for faq in faqs_a + faqs_b}
+    # Queries scoring between the two thresholds flip is_match with the threshold
+    thresholds = (0.15, 0.6)
+    queries = [faq["question"].lower() for faq in faqs_a] + [
+        "programming code", "learning python", "https web", "favourite colour"
+    ]
+    
+    chatbot = FAQChatbot(faqs=faqs_a)
+    nlp = chatbot.nlp_processor
+    done = threading.Event()
+    errors = []
+    versions_seen = set()
+    
+    def check(response):
+        threshold = response['debug_info']['similarity_threshold']
+        assert threshold in thresholds
+        assert response['is_match'] == (response['confidence'] >= threshold)
+        if response['is_match']:
+            assert (response['matched_question'], response['answer']) in valid_pairs
+    
+    def serve(worker):
+        try:
+            last_version = 0
+            while not done.is_set():
+                for position, query in enumerate(queries):
+                    if (position + worker) % 5 == 0:
+                        for response in chatbot.get_responses(queries[position:position + 3]):
+                            check(response)
+                    else:
+                        check(chatbot.get_response(query))
+                    result = nlp.match(query, threshold=0.0)
+                    assert (result['question'], result['answer']) in valid_pairs
+                    assert result['index_version'] >= last_version
+                    last_version = result['index_version']
+                    versions_seen.add(last_version)
+        except Exception as error:
+            errors.append(error)
+    
+    def reload():
+        try:
+            for reload_number in range(20):
+                faqs = faqs_b if reload_number % 2 == 0 else faqs_a
+                nlp.train_vectorizer([faq["question"] for faq in faqs], [faq["answer"] for faq in faqs])
+                for threshold in thresholds:
+                    chatbot.similarity_threshold = threshold
+                    time.sleep(0.001)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            done.set()
+    
+    workers = [threading.Thread(target=serve, args=(worker,)) for worker in range(4)]
+    reloader = threading.Thread(target=reload)
+    # Switch threads often so reads and reloads interleave mid-request
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        for thread in workers + [reloader]:
+            thread.start()
+        for thread in workers + [reloader]:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    
+    assert not errors, errors
+    assert nlp.index_version == 21 and chatbot.snapshot().index is nlp.index
+    assert len(versions_seen) > 1
+    print(f"✓ 4 threads served consistent responses across 20 reloads ({len(versions_seen)} versions seen)")
+    
+    # Nothing cached under an earlier snapshot is served after the last reload
+    final_answers = {faq["answer"] for faq in faqs_a}
+    for response in chatbot.get_responses(queries):
+        assert response['debug_info']['similarity_threshold'] == thresholds[-1]
+        assert not response['is_match'] or response['answer'] in final_answers
+    print("✓ Responses after the last reload come from the final snapshot")
+    
+    # Concurrent publishes get distinct, increasing versions
+    questions = get_questions()
+    publishers = [threading.Thread(target=nlp.train_vectorizer, args=(questions,)) for _ in range(4)]
+    for thread in publishers:
+        thread.start()
+    for thread in publishers:
+        thread.join()
+    assert nlp.index_version == 25
+    print("✓ Concurrent reloads publish distinct versions")
+    
+    return True
+
+def test_inverted_index():
+    """Test that inverted-index retrieval returns exactly the full-scan results"""
+    print("\nTesting inverted index...")
+    
+    import numpy as np
+    from inverted_index import InvertedIndexRetriever
+    
+    nlp = NLPProcessor()
+    nlp.train_vectorizer(get_questions())
+    exact = nlp.retriever
+    inverted = InvertedIndexRetriever(exact.matrix, normalized=True)
+    queries = ["How do I learn Python?", "What is machine learning?", "python data science", "xyzzy", ""]
+    query_vectors = nlp.vectorizer.transform([nlp.preprocess_text(q) for q in queries])
+    
+    for k in (1, 3, 10):
+        for i in range(len(queries)):
+            exact_indices, exact_scores = exact.search(query_vectors[i], k=k)
+            indices, scores = inverted.search(query_vectors[i], k=k)
+            assert np.array_equal(indices, exact_indices)
+            assert np.array_equal(scores, exact_scores)
+    print("✓ Top k and similarities identical to the full scan")
+    
+    candidates = inverted.candidates(query_vectors[0], 1)
+    shares_term = np.flatnonzero(exact.score(query_vectors[0]) > 0)
+    assert set(candidates) <= set(shares_term)
+    print(f"✓ Scored {len(candidates)} of {exact.n_faqs} FAQs for the top match")
+    
+    nlp = NLPProcessor(retrieval='inverted')
+    nlp.train_vectorizer(get_questions())
+    assert isinstance(nlp.retriever, InvertedIndexRetriever)
+    assert nlp.match("How do I learn Python?")['index'] == exact.search(query_vectors[0], k=1)[0][0]
+    print("✓ NLPProcessor(retrieval='inverted') matches with the inverted index")
+    
+    # Removing a FAQ leaves its terms in the vocabulary with empty postings
+    from faq_store import FAQStore
+    from retrieval import SparseRetriever
+    chatbot = FAQChatbot(nlp_options={'retrieval': 'inverted'})
+    FAQStore(chatbot).remove(chatbot.questions.index("What is machine learning?"))
+    index = chatbot.nlp_processor.index
+    exact = SparseRetriever(index.retriever.matrix, normalized=True)
+    query_vector = index.vectorizer.transform([chatbot.nlp_processor.preprocess_text("python machine learning")])
+    for k in (1, 5):
+        indices, scores = index.retriever.search(query_vector, k=k)
+        exact_indices, exact_scores = exact.search(query_vector, k=k)
+        assert np.array_equal(indices, exact_indices) and np.array_equal(scores, exact_scores)
+    assert chatbot.get_response("python machine learning")['matched_question'] != "What is machine learning?"
+    print("✓ Terms of a removed FAQ are skipped after FAQStore.remove")
+    
+    return True
+
+def test_approximate_retrieval():
+    """Test the approximate retriever against the exact one"""
+    print("\nTesting approximate retrieval...")
+    
+    import numpy as np
+    from ann_index import ApproximateRetriever
+    
+    nlp = NLPProcessor()
+    questions = get_questions()
+    nlp.train_vectorizer(questions)
+    exact = nlp.retriever
+    queries = ["How do I learn Python?", "What is a database?", "git branches", "unknown words here"]
+    query_vectors = nlp.vectorizer.transform([nlp.preprocess_text(q) for q in queries])
+    
+    # With every posting probed, the candidates hold every FAQ with a shared term
+    approximate = ApproximateRetriever(exact.matrix, normalized=True, probe_depth=len(questions),
+                                       max_query_terms=100)
+    for i in range(len(queries)):
+        exact_indices, exact_scores = exact.search(query_vectors[i], k=3)
+        indices, scores = approximate.search(query_vectors[i], k=3)
+        assert list(indices) == list(exact_indices)
+        assert np.allclose(scores, exact_scores)
+    print("✓ Full-depth probing matches the exact top k")
+    
+    shallow = ApproximateRetriever(exact.matrix, normalized=True, probe_depth=1, max_query_terms=1)
+    candidates = shallow.candidates(query_vectors[0])
+    assert 0 < len(candidates) <= 1
+    indices, scores = shallow.search(query_vectors[0], k=3)
+    assert len(indices) == 3
+    print("✓ Shallow probing limits candidates and falls back to the exact scan")
+    
+    chatbot = FAQChatbot(nlp_options={'retrieval': 'approximate'})
+    assert isinstance(chatbot.nlp_processor.retriever, ApproximateRetriever)
+    response = chatbot.get_response("How do I learn Python?")
+    assert response['matched_question'] == FAQChatbot().get_response("How do I learn Python?")['matched_question']
+    print("✓ FAQChatbot serves from the approximate retriever")
+    
+    return True
+
+def main():
+    """Run all tests"""
+    print("🧪 FAQ Chatbot Test Suite")
+    print("=" * 40)
+    
+    tests = [
+        ("FAQ Data", test_faq_data),
+        ("NLP Processor", test_nlp_processor),
+        ("Chatbot", test_chatbot),
+        ("Search", test_search),
+        ("Single-pass Match", test_single_pass_match),
+        ("Retrieval Engine", test_retrieval_engine),
+        ("Batch Matching", test_batch_matching),
+        ("Persisted Index", test_persisted_index),
+        ("Tokenizers", test_tokenizers),
+        ("Response Cache", test_response_cache),
+        ("FAQ Store", test_faq_store),
+        ("Async App", test_async_app),
+        ("Metrics", test_metrics),
+        ("Lazy Startup", test_lazy_startup),
+        ("Inverted Index", test_inverted_index),
+        ("FAQ Collections", test_faq_collections),
+        ("Streaming Ingest", test_streaming_ingest),
+        ("Parallel Build", test_parallel_build),
+        ("Preprocess Memo", test_preprocess_memo),
+        ("Compact Index", test_compact_index),
+        ("Approximate Retrieval", test_approximate_retrieval),
+        ("Keyword Index", test_keyword_index),
+        ("Response Serialization", test_response_serialization),
+        ("Sharded Index", test_sharded_index),
+        ("Spelling Correction", test_spelling_correction),
+        ("Evaluation", test_evaluation),
+        ("Concurrent Reloads", test_concurrent_reloads)
+    ]
+    
+    passed = 0
+    total = len(tests)
+    
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+                print(f"✅ {test_name} test passed\n")
+            else:
+                print(f"❌ {test_name} test failed\n")
+        except Exception as e:
+            print(f"❌ {test_name} test error: {e}\n")
+    
+    print("=" * 40)
+    print(f"📊 Test Results: {passed}/{total} tests passed")
+    
+    if passed == total:
+        print("🎉 All tests passed! The chatbot is ready to run.")
+        print("\nTo start the web application, run:")
+        print("python app.py")
+        print("\nThen open http://localhost:5000 in your browser.")
+    else:
+        print("⚠️  Some tests failed. Please check the errors above.")
+    
+    return passed == total
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
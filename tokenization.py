@@ -0,0 +1,87 @@
+"""
+Tokenizers for FAQ Chatbot
+Pluggable tokenizers used by NLPProcessor.preprocess_text
+"""
+
+import re
+
+
+class NLTKTokenizer:
+    """Tokenize with NLTK's punkt-based word_tokenize"""
+
+    name = 'nltk'
+
+    def __init__(self):
+        import nltk.tokenize.punkt
+        from nltk.tokenize import word_tokenize
+        from nlp_processor import require_nltk_data
+
+        # NLTK 3.8.2+ reads the punkt_tab tables, earlier versions the punkt pickles
+        package = 'punkt_tab' if hasattr(nltk.tokenize.punkt, 'PunktTokenizer') else 'punkt'
+        require_nltk_data(f'tokenizers/{package}', package)
+        self._word_tokenize = word_tokenize
+
+    def tokenize(self, text):
+        return self._word_tokenize(text)
+
+
+class RegexTokenizer:
+    """
+    Tokenize with a single compiled regex.
+    On the punctuation-free text produced by preprocess_text this gives the
+    same tokens as word_tokenize, including its splitting of the
+    contractions it recognizes without an apostrophe (e.g. "cannot").
+    """
+
+    name = 'regex'
+
+    _TOKEN_PATTERN = re.compile(r'\w+')
+
+    # Contractions word_tokenize splits even without punctuation
+    _CONTRACTIONS = {
+        'cannot': 3,
+        'gimme': 3,
+        'gonna': 3,
+        'gotta': 3,
+        'lemme': 3,
+        'wanna': 3
+    }
+
+    def tokenize(self, text):
+        tokens = self._TOKEN_PATTERN.findall(text)
+        contractions = self._CONTRACTIONS
+        if not any(token.lower() in contractions for token in tokens):
+            return tokens
+
+        split_tokens = []
+        for token in tokens:
+            split_at = contractions.get(token.lower())
+            if split_at:
+                split_tokens.append(token[:split_at])
+                split_tokens.append(token[split_at:])
+            else:
+                split_tokens.append(token)
+        return split_tokens
+
+
+TOKENIZERS = {
+    NLTKTokenizer.name: NLTKTokenizer,
+    RegexTokenizer.name: RegexTokenizer
+}
+
+
+def get_tokenizer(tokenizer):
+    """
+    Return a tokenizer instance from a registered name ('nltk', 'regex')
+    or pass through any object with a tokenize(text) method
+    """
+    if isinstance(tokenizer, str):
+        try:
+            return TOKENIZERS[tokenizer]()
+        except KeyError:
+            raise ValueError(
+                f"Unknown tokenizer '{tokenizer}'. Choose from: {', '.join(sorted(TOKENIZERS))}"
+            )
+    if not hasattr(tokenizer, 'tokenize'):
+        raise TypeError("tokenizer must be a name or an object with a tokenize(text) method")
+    return tokenizer